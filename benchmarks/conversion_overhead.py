@@ -0,0 +1,71 @@
+"""
+Measures the time spent converting the history to provider messages in every
+turn of a growing conversation, with and without the conversion cache. Usage:
+
+    python -m benchmarks.conversion_overhead [--turns 400] [--every 50]
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from typing import Any
+
+from src.domain import ChatMessage
+from src.infrastructure.llm_connection.message_conversion import (
+    ConvertedMessagesCache,
+)
+from src.infrastructure.llm_connection.mistral_client_wrapper import (
+    convert_to_mistral_msg,
+)
+from src.infrastructure.llm_connection.openai_client_wrapper import (
+    convert_to_openai_msg,
+)
+
+DEFAULT_TURNS = 400  # pragma: no mutate
+DEFAULT_EVERY = 50  # pragma: no mutate
+
+CONVERTERS: dict[str, Callable[[ChatMessage], Any]] = {
+    "Mistral": convert_to_mistral_msg,
+    "OpenAI": convert_to_openai_msg,
+}
+
+
+def measure_turns(
+    convert: Callable[[ChatMessage], Any], turns: int, *, cached: bool
+) -> list[float]:
+    """Microseconds spent converting the history in every turn"""
+    cache = ConvertedMessagesCache(convert)
+    messages: list[ChatMessage] = [ChatMessage("system", "Eres un asistente.")]
+    durations = []
+    for turn in range(turns):
+        messages.append(ChatMessage("user", f"Consulta número {turn}"))
+        start = time.perf_counter()
+        if cached:
+            cache.convert(messages)
+        else:
+            [convert(msg) for msg in messages]
+        durations.append((time.perf_counter() - start) * 1_000_000)
+        messages.append(ChatMessage("assistant", f"Respuesta número {turn}"))
+    return durations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=DEFAULT_TURNS)
+    parser.add_argument("--every", type=int, default=DEFAULT_EVERY)
+    args = parser.parse_args()
+
+    for platform, convert in CONVERTERS.items():
+        uncached = measure_turns(convert, args.turns, cached=False)
+        cached = measure_turns(convert, args.turns, cached=True)
+        print(f"{platform}: microseconds per turn")
+        print(f"{'turn':>6} {'messages':>9} {'uncached':>10} {'cached':>10}")
+        for turn in range(0, args.turns, args.every):
+            print(
+                f"{turn + 1:>6} {2 * turn + 2:>9}"
+                f" {uncached[turn]:>10.1f} {cached[turn]:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
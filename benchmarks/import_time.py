@@ -0,0 +1,103 @@
+"""
+Measures the startup imports with `python -X importtime`, to detect regressions
+like a provider SDK imported again at startup. Usage:
+
+    python -m benchmarks.import_time [--runs 5] [--top 15] [--max-ms 400]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Sequence
+
+DEFAULT_MODULE = "src.main"  # pragma: no mutate
+DEFAULT_RUNS = 5  # pragma: no mutate
+DEFAULT_TOP = 15  # pragma: no mutate
+# imported only when they are used, never at startup
+LAZY_MODULES = ("mistralai", "openai", "httpx", "rich.markdown", "dotenv")
+
+
+@dataclass(frozen=True)
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> list[ImportTime]:
+    """Parses the lines written to stderr by `-X importtime`"""
+    import_times = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        module = name.strip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        import_times.append(ImportTime(module, int(self_us), int(cumulative_us), depth))
+    return import_times
+
+
+def measure_imports(module: str) -> list[ImportTime]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(completed.stderr)
+
+
+def get_total_us(import_times: Sequence[ImportTime], module: str) -> int:
+    return next(
+        import_time.cumulative_us
+        for import_time in import_times
+        if import_time.module == module and import_time.depth == 0
+    )
+
+
+def find_lazy_modules(import_times: Sequence[ImportTime]) -> list[str]:
+    return sorted(
+        {
+            import_time.module
+            for import_time in import_times
+            if import_time.module in LAZY_MODULES
+        }
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default=DEFAULT_MODULE)
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP)
+    parser.add_argument(
+        "--max-ms", type=float, help="fail if the median is greater than this"
+    )
+    args = parser.parse_args(argv)
+
+    runs = [measure_imports(args.module) for _ in range(args.runs)]
+    totals_ms = [get_total_us(run, args.module) / 1000 for run in runs]
+    median_ms = statistics.median(totals_ms)
+    print(f"import {args.module}: median {median_ms:.1f} ms in {args.runs} runs")
+    print(f"  runs: {', '.join(f'{total:.1f}' for total in totals_ms)} ms")
+
+    print("\nSlowest imports of the last run (cumulative):")
+    slowest = sorted(runs[-1], key=lambda import_time: -import_time.cumulative_us)
+    for import_time in slowest[: args.top]:
+        print(f"  {import_time.cumulative_us / 1000:8.1f} ms  {import_time.module}")
+
+    failed = False
+    if lazy_modules := find_lazy_modules(runs[-1]):
+        print(f"\nModules that should be imported lazily: {', '.join(lazy_modules)}")
+        failed = True
+    if args.max_ms is not None and median_ms > args.max_ms:
+        print(f"\nThe median exceeds {args.max_ms} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
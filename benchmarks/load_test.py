@@ -0,0 +1,122 @@
+"""
+Sends many concurrent queries, like a `/for`, to a local stub server through
+ClientWrapper, with its retries and optionally the completion cache. Usage:
+
+    python -m benchmarks.load_test [--queries 40] [--concurrency 4]
+        [--latency lognormal:0.3,0.5] [--error-rate 0.1] [--platform OpenAI]
+        [--stream] [--cache]
+"""
+
+import argparse
+import math
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePath
+
+from src.python_modules.FileSystemWrapper.file_manager import FileManager
+
+from benchmarks.stub_server import StubConfig, StubServer, parse_latency
+from src.domain import CompleteMessage, Model, ModelName, Platform
+from src.infrastructure.exceptions import LLMChatException
+from src.infrastructure.llm_connection import ClientWrapper
+from src.infrastructure.llm_connection.completion_cache import (
+    CachingClientWrapper,
+    CompletionCache,
+)
+from src.infrastructure.llm_connection.rate_limiter import (
+    RateLimiter,
+    RunawayGuard,
+)
+from src.infrastructure.llm_connection.retry_policy import Retrier, RetryPolicy
+from src.models.messages_ops import add_user_query_in_place
+from src.protocols import ClientWrapperProtocol
+
+
+def send_query(
+    client_wrapper: ClientWrapperProtocol, model: Model, query: str, stream: bool
+) -> float | None:
+    """Returns the seconds taken by the query, or None if it failed"""
+    messages: list[CompleteMessage] = []
+    add_user_query_in_place(messages, query)
+    start = time.perf_counter()
+    try:
+        client_wrapper.get_simple_response(
+            model, messages, on_delta=(lambda _: None) if stream else None
+        )
+    except LLMChatException:
+        return None
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", default="lognormal:0.3,0.5", type=parse_latency)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float)
+    parser.add_argument("--platform", choices=["Mistral", "OpenAI"], default="Mistral")
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--cache", action="store_true", help="repeat every query")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    model = Model(Platform(args.platform), ModelName("stub-model"))
+    queries = [f"Consulta {i}" for i in range(args.queries)]
+    if args.cache:
+        queries += queries
+    retry_policy = RetryPolicy(base_delay_seconds=0.1, max_delay_seconds=2)
+    retrier = Retrier(retry_policy)
+
+    with StubServer(config) as stub_server, tempfile.TemporaryDirectory() as cache_dir:
+        client_wrapper: ClientWrapperProtocol = ClientWrapper(
+            mistral_api_key="stub",
+            openai_api_key="stub",
+            mistral_base_url=stub_server.mistral_base_url,
+            openai_base_url=stub_server.openai_base_url,
+            # the stub does not need to be protected
+            rate_limiter=RateLimiter({}),
+            runaway_guard=RunawayGuard(
+                len(queries) * retry_policy.max_attempts, math.inf
+            ),
+            retrier=retrier,
+        )
+        if args.cache:
+            cache = CompletionCache(FileManager(), PurePath(cache_dir))
+            client_wrapper = CachingClientWrapper(client_wrapper, cache)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as executor:
+            durations = list(
+                executor.map(
+                    lambda query: send_query(client_wrapper, model, query, args.stream),
+                    queries,
+                )
+            )
+        elapsed = time.perf_counter() - start
+
+    succeeded = sorted(duration for duration in durations if duration is not None)
+    print(f"{len(queries)} queries in {elapsed:.2f} s, {len(succeeded)} succeeded")
+    if len(succeeded) >= 2:
+        percentiles = statistics.quantiles(succeeded, n=100)
+        print(
+            f"latency p50 {percentiles[49]:.3f} s, p95 {percentiles[94]:.3f} s,"
+            f" max {succeeded[-1]:.3f} s"
+        )
+    print(
+        f"stub: {stub_server.requests} requests, {stub_server.errors} errors;"
+        f" retrier: {retrier.attempts} attempts, {retrier.backoff_seconds:.2f} s"
+        " of backoff"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compares the substitution of the placeholders of a large query with one
+str.replace per placeholder against a compiled template. Usage:
+
+    python -m benchmarks.placeholder_substitution [--megabytes 4] [--values 20]
+        [--placeholders 10]
+"""
+
+import argparse
+import time
+
+from src.models.placeholders import CompiledTemplate, Placeholder
+
+DEFAULT_MEGABYTES = 4  # pragma: no mutate
+DEFAULT_VALUES = 20  # pragma: no mutate
+DEFAULT_PLACEHOLDERS = 10  # pragma: no mutate
+PARAGRAPH = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 16
+
+
+def build_text(megabytes: float, placeholders: list[Placeholder]) -> str:
+    """A pasted document with the placeholders spread over it"""
+    paragraphs = max(1, int(megabytes * 1024 * 1024 / len(PARAGRAPH)))
+    return "\n".join(
+        f"{PARAGRAPH} {placeholders[i % len(placeholders)]}." for i in range(paragraphs)
+    )
+
+
+def replace_one_by_one(text: str, substitutions: dict[Placeholder, str]) -> str:
+    for placeholder, replacement in substitutions.items():
+        text = text.replace(placeholder, replacement)
+    return text
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--megabytes", type=float, default=DEFAULT_MEGABYTES)
+    parser.add_argument("--values", type=int, default=DEFAULT_VALUES)
+    parser.add_argument("--placeholders", type=int, default=DEFAULT_PLACEHOLDERS)
+    args = parser.parse_args()
+
+    # same length, so no placeholder is a prefix of another for str.replace
+    placeholders = [Placeholder(f"$0name{i:04}") for i in range(args.placeholders)]
+    text = build_text(args.megabytes, placeholders)
+    substitution_sets = [
+        {placeholder: f"valor {value}" for placeholder in placeholders}
+        for value in range(args.values)
+    ]
+    print(
+        f"{len(text) / 1024 / 1024:.1f} MB, {args.placeholders} placeholders,"
+        f" {args.values} values"
+    )
+
+    start = time.perf_counter()
+    for substitutions in substitution_sets:
+        expected = replace_one_by_one(text, substitutions)
+    replace_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    template = CompiledTemplate(text)
+    compile_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for substitutions in substitution_sets:
+        query = template.render(substitutions)
+    render_seconds = time.perf_counter() - start
+    assert query == expected
+
+    print(f"str.replace per placeholder: {replace_seconds:.3f} s")
+    print(
+        f"compiled template: {compile_seconds + render_seconds:.3f} s"
+        f" ({compile_seconds:.3f} s compiling once)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Local stand-in for the chat completions APIs of Mistral and OpenAI, to test the
+engine under load without spending money. Usage:
+
+    python -m benchmarks.stub_server [--port 8765] [--latency lognormal:0.3,0.5]
+        [--error-rate 0.1] [--error-status 503] [--retry-after 1]
+
+Then point the program at it with MISTRAL_BASE_URL=http://127.0.0.1:8765 or
+OPENAI_BASE_URL=http://127.0.0.1:8765/v1 (the api keys can be any text).
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+DEFAULT_PORT = 8765  # pragma: no mutate
+COMPLETIONS_PATH = "/v1/chat/completions"
+SECONDS_BETWEEN_CHUNKS = 0.01  # pragma: no mutate
+
+LatencyDistribution = Callable[[random.Random], float]
+
+
+def parse_latency(spec: str) -> LatencyDistribution:
+    """
+    Parses `constant:<s>`, `uniform:<min>,<max>`, `exponential:<mean>` or
+    `lognormal:<median>,<sigma>`, all of them in seconds
+    """
+    name, _, raw_params = spec.partition(":")
+    params = [float(param) for param in raw_params.split(",") if param]
+    if name == "constant" and len(params) == 1:
+        return lambda _: params[0]
+    if name == "uniform" and len(params) == 2:
+        return lambda rng: rng.uniform(params[0], params[1])
+    if name == "exponential" and len(params) == 1:
+        return lambda rng: rng.expovariate(1 / params[0])
+    if name == "lognormal" and len(params) == 2:
+        return lambda rng: params[0] * rng.lognormvariate(0, params[1])
+    raise ValueError(f"Invalid latency distribution: {spec}")
+
+
+def no_latency(rng: random.Random) -> float:
+    return 0.0
+
+
+@dataclass
+class StubConfig:
+    latency: LatencyDistribution = no_latency
+    # fraction of the requests answered with error_status
+    error_rate: float = 0.0
+    error_status: int = 503
+    retry_after: float | None = None
+    # answer with a call to the first tool when tools are offered
+    tool_calls: bool = True
+    seed: int | None = None
+
+
+class StubServer:
+    """Serves the chat completions in a background thread until stopped"""
+
+    def __init__(
+        self, config: StubConfig | None = None, host: str = "127.0.0.1", port: int = 0
+    ):
+        self.config = config or StubConfig()
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._create_handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def mistral_base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    @property
+    def openai_base_url(self) -> str:
+        return f"{self.mistral_base_url}/v1"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="stub-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *args: object) -> None:
+        self.stop()
+
+    def _draw(self) -> tuple[float, bool]:
+        """Latency and failure of the next request"""
+        with self._lock:
+            self.requests += 1
+            latency = max(0.0, self.config.latency(self._random))
+            failed = self._random.random() < self.config.error_rate
+            if failed:
+                self.errors += 1
+            return latency, failed
+
+    def _create_handler(self) -> type[BaseHTTPRequestHandler]:
+        stub_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_HEAD(self) -> None:
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if self.path.rstrip("/") != COMPLETIONS_PATH:
+                    self._send_json(404, {"error": {"message": "Not found"}})
+                    return
+                latency, failed = stub_server._draw()
+                time.sleep(latency)
+                if failed:
+                    self._send_error()
+                elif request.get("stream"):
+                    self._send_stream(request)
+                else:
+                    self._send_json(200, create_completion(request, stub_server.config))
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def _send_error(self) -> None:
+                config = stub_server.config
+                headers = {}
+                if config.retry_after is not None:
+                    headers["Retry-After"] = str(config.retry_after)
+                body = {"error": {"message": "Stub failure", "type": "stub_error"}}
+                self._send_json(config.error_status, body, headers)
+
+            def _send_json(
+                self,
+                status: int,
+                body: object,
+                headers: dict[str, str] | None = None,
+            ) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, request: dict[str, Any]) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for chunk in create_chunks(request, stub_server.config):
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    time.sleep(SECONDS_BETWEEN_CHUNKS)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+        return Handler
+
+
+def create_answer(
+    request: dict[str, Any], config: StubConfig
+) -> tuple[str, list[dict[str, Any]] | None]:
+    """The answer repeats the last message, so equal requests get equal answers"""
+    tools = request.get("tools")
+    if config.tool_calls and tools and request.get("tool_choice", "auto") != "none":
+        tool_call = {
+            "index": 0,
+            "id": "call_stub",
+            "type": "function",
+            "function": {"name": tools[0]["function"]["name"], "arguments": "{}"},
+        }
+        return "", [tool_call]
+    messages = request.get("messages") or [{}]
+    return f"Respuesta a: {messages[-1].get('content') or ''}", None
+
+
+def create_completion(request: dict[str, Any], config: StubConfig) -> dict[str, Any]:
+    content, tool_calls = create_answer(request, config)
+    message: dict[str, Any] = {"role": "assistant", "content": content}
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    prompt_tokens = len(json.dumps(request.get("messages"))) // 4
+    completion_tokens = len(content.split())
+    return {
+        "id": "stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model", "stub"),
+        "choices": [
+            {
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if tool_calls else "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def create_chunks(
+    request: dict[str, Any], config: StubConfig
+) -> Iterator[dict[str, Any]]:
+    content, tool_calls = create_answer(request, config)
+    deltas: list[dict[str, Any]] = [{"role": "assistant", "content": ""}]
+    deltas += [{"content": word} for word in content.split(" ")[:1]]
+    deltas += [{"content": f" {word}"} for word in content.split(" ")[1:]]
+    if tool_calls:
+        deltas.append({"tool_calls": tool_calls})
+    for i, delta in enumerate(deltas):
+        is_last = i == len(deltas) - 1
+        yield {
+            "id": "stub",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "delta": delta,
+                    "finish_reason": (
+                        ("tool_calls" if tool_calls else "stop") if is_last else None
+                    ),
+                }
+            ],
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", default="constant:0", type=parse_latency)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--retry-after", type=float)
+    parser.add_argument("--no-tool-calls", action="store_true")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        retry_after=args.retry_after,
+        tool_calls=not args.no_tool_calls,
+        seed=args.seed,
+    )
+    stub_server = StubServer(config, port=args.port)
+    print(f"Mistral: {stub_server.mistral_base_url}")
+    print(f"OpenAI: {stub_server.openai_base_url}")
+    stub_server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub_server.stop()
+        print(f"{stub_server.requests} requests, {stub_server.errors} errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,7 @@ from src.infrastructure.llm_connection import ClientWrapper
 from src.infrastructure.now import TimeManager
 from src.models.shared import define_system_prompt
 from src.models_data import get_models
-from src.protocols import ChatRepositoryProtocol, ClientWrapperProtocol
+from src.protocols import ChatRepositoryProtocol
 from src.setup_logging import configure_logger, format_var
 from src.view import Raw, SimpleView, display_neutral_msg, escape_for_rich
 
@@ -34,7 +34,7 @@ logger = configure_logger(__name__)
 
 
 class Main:
-    _client: ClientWrapperProtocol
+    _client: ClientWrapper
     _repository: ChatRepositoryProtocol
 
     def __init__(self) -> None:
@@ -53,14 +53,15 @@ class Main:
         self._view = SimpleView()
         self._display_model_name()
         self._prompt_generator = SystemPromptGenerator()
-
-    def execute(self) -> None:
         load_dotenv()
         mistral_api_key = os.environ.get("MISTRAL_API_KEY")
         openai_api_key = os.environ.get("OPENAI_API_KEY")
+        # created once, the following executions reuse its connections
         self._client = ClientWrapper(
             mistral_api_key=mistral_api_key, openai_api_key=openai_api_key
         )
+
+    def execute(self) -> None:
         self._messages.clear()
         system_prompt = define_system_prompt(
             self._prompt_generator.create_system_prompt(self._shop_repository.products),
@@ -10,10 +10,11 @@ from .controllers import (
     build_controllers,
 )
 from .protocols import ViewProtocol
-from .serde import convert_digits_to_conversation_id
+from .serde import WIDE_NUMBER_OF_DIGITS, convert_digits_to_conversation_id
 from .strategies import (
     ActionStrategy,
     EstablishSystemPromptAction,
+    SearchConversationsAction,
     ShowModelAction,
 )
 from .view import Raw
@@ -50,12 +51,17 @@ class CommandHandler:
             self._llm_manager,
         )
 
+    def close(self) -> None:
+        """Waits for the pending writes of the repository and releases it"""
+        self._llm_manager.repository.close()
+
     def prompt_to_select_model(self) -> None:
         model = self._controllers.select_model_controler.select_model()
         self._llm_manager.model_manager.model_wrapper.change(model)
 
     def process_action(self, action: Action, remaining_input: str) -> None:
         debug = False
+        use_cache = True
         new_conversation = False
         conversation_to_load = None
 
@@ -75,8 +81,12 @@ class CommandHandler:
             return
         elif action.type == ActionType.DEBUG:
             debug = True
+        elif action.type == ActionType.NO_CACHE:
+            use_cache = False
         elif action.type in (ActionType.LOAD_CONVERSATION, ActionType.LOAD_MESSAGES):
-            conversation_to_load = convert_digits_to_conversation_id(remaining_input)
+            conversation_to_load = convert_digits_to_conversation_id(
+                remaining_input, max_digits=WIDE_NUMBER_OF_DIGITS
+            )
             self._controllers.conversation_loader.load_conversation(
                 action, conversation_to_load
             )
@@ -109,7 +119,9 @@ class CommandHandler:
 
         if new_conversation:
             self._llm_manager.prev_messages.clear()
-        self._controllers.query_answerer.answer_queries(queries, debug)
+        self._controllers.query_answerer.answer_queries(
+            queries, debug, use_cache=use_cache
+        )
 
     def _get_strategy(self, action: Action) -> ActionStrategy | None:
         action_strategy: ActionStrategy | None = None
@@ -121,4 +133,8 @@ class CommandHandler:
             action_strategy = EstablishSystemPromptAction(
                 self._view, self._llm_manager.prev_messages
             )
+        elif action.type == ActionType.SEARCH:
+            action_strategy = SearchConversationsAction(
+                self._view, self._llm_manager.repository
+            )
         return action_strategy
@@ -1,3 +1,5 @@
+from src.python_modules.FileSystemWrapper.file_manager import FileManager
+
 from src.llm_manager import LLM_Manager
 from src.protocols import ViewProtocol
 
@@ -22,7 +24,7 @@ def build_controllers(
         view=view,
         llm_manager=llm_manager,
     )
-    final_query_extractor = FinalQueryExtractor(view=view)
+    final_query_extractor = FinalQueryExtractor(view=view, file_manager=FileManager())
     return Controllers(
         select_model_controler=select_model_controler,
         conversation_loader=conversation_loader,
@@ -16,6 +16,8 @@ class ActionType(Enum):
     LOAD_CONVERSATION = "LOAD_CONVERSATION"
     LOAD_MESSAGES = "LOAD_MESSAGES"
     SYSTEM_PROMPT = "SYSTEM_PROMPT"
+    SEARCH = "SEARCH"
+    NO_CACHE = "NO_CACHE"
 
 
 @dataclass
@@ -39,6 +41,8 @@ command_map = {
     ActionType.CHANGE_MODEL: ("change",),
     ActionType.SHOW_MODEL: ("show",),
     ActionType.SYSTEM_PROMPT: ("sys", "system"),
+    ActionType.SEARCH: ("search",),
+    ActionType.NO_CACHE: ("nocache",),
 }
 
 COMMAND_PREFIX = "/"
@@ -5,7 +5,6 @@ from src.domain import ConversationId, ConversationText
 from src.llm_manager import LLM_Manager
 from src.models.shared import extract_chat_messages
 from src.protocols import ViewProtocol
-from src.serde import deserialize_conversation_text_into_messages
 from src.view import Raw
 
 
@@ -30,13 +29,12 @@ class ConversationLoader:
         self, action: Action, conversation_id: ConversationId
     ) -> None:
         """Load a conversation based in its id"""
-        conversation_text = (
-            self._llm_manager.repository.load_conversation_as_conversation_text(
-                conversation_id
-            )
+        repository = self._llm_manager.repository
+        conversation_text = repository.load_conversation_as_conversation_text(
+            conversation_id
         )
-        self._llm_manager.prev_messages[:] = (
-            deserialize_conversation_text_into_messages(conversation_text)
+        self._llm_manager.prev_messages[:] = repository.load_conversation(
+            conversation_id
         )
         self._display_loaded_conversation(action, conversation_id, conversation_text)
         self._view.display_neutral_msg(Raw("La conversacion ha sido cargada"))
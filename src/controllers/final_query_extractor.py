@@ -1,9 +1,14 @@
 from typing import Final
 
+from src.python_modules.FileSystemWrapper.file_manager_protocol import (
+    FileManagerProtocol,
+)
+
 from src.models.placeholders import (
+    CompiledTemplate,
     Placeholder,
     QueryBuildException,
-    QueryText,
+    QueryExpansion,
     build_queries,
     find_unique_placeholders,
 )
@@ -14,13 +19,17 @@ DELIBERATE_INPUT_TIME = 0.02
 
 
 class FinalQueryExtractor:
-    __slots__ = ("_view",)
+    __slots__ = ("_view", "_file_manager")
     _view: Final[ViewProtocol]
+    _file_manager: Final[FileManagerProtocol]
 
-    def __init__(self, *, view: ViewProtocol):
+    def __init__(self, *, view: ViewProtocol, file_manager: FileManagerProtocol):
         self._view = view
+        # reads the values of `/for @file`
+        self._file_manager = file_manager
 
-    def get_final_queries(self, remaining_input: str) -> list[QueryText] | None:
+    def get_final_queries(self, remaining_input: str) -> QueryExpansion | None:
+        """The queries are built while they are iterated"""
         remaining_input = self._get_extra_lines(remaining_input)
         placeholders = find_unique_placeholders(remaining_input)
         return self._define_final_queries(remaining_input, placeholders)
@@ -36,13 +45,15 @@ class FinalQueryExtractor:
 
     def _define_final_queries(
         self, remaining_input: str, placeholders: list[Placeholder]
-    ) -> list[QueryText] | None:
+    ) -> QueryExpansion | None:
         if not placeholders:
-            return [QueryText(remaining_input)]
+            return QueryExpansion(CompiledTemplate(remaining_input, ()))
 
         user_substitutions = self._view.get_raw_substitutions_from_user(placeholders)
         try:
-            queries = build_queries(remaining_input, user_substitutions)
+            queries = build_queries(
+                remaining_input, user_substitutions, self._file_manager
+            )
         except QueryBuildException as err:
             show_error_msg(ensure_escaped(Raw(str(err))))
             return None
@@ -1,55 +1,209 @@
 from __future__ import annotations
 
-from typing import Final, Sequence
+import time
+from collections.abc import Callable, Collection, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Final
 
 from src.domain import CompleteMessage, QueryResult
 from src.llm_manager import LLM_Manager
 from src.models.placeholders import QueryText
 from src.protocols import ViewProtocol
+from src.settings import (
+    CONCURRENT_QUERIES_LIMIT,
+    SHOW_ANSWERS_AS_COMPLETED,
+    STREAM_RESPONSES,
+)
+from src.setup_logging import configure_logger
 from src.view import Raw
 
+logger = configure_logger(__name__)
+
 
 class QueryAnswerer:
     __slots__ = (
         "_view",
         "_llm_manager",
+        "_concurrency_limit",
+        "_show_as_completed",
+        "_stream_responses",
     )
     _view: Final[ViewProtocol]
     _llm_manager: Final[LLM_Manager]
+    _concurrency_limit: Final[int]
+    _show_as_completed: Final[bool]
+    _stream_responses: Final[bool]
 
     def __init__(
         self,
         *,
         view: ViewProtocol,
         llm_manager: LLM_Manager,
+        concurrency_limit: int = CONCURRENT_QUERIES_LIMIT,
+        show_as_completed: bool = SHOW_ANSWERS_AS_COMPLETED,
+        stream_responses: bool = STREAM_RESPONSES,
     ):
         self._view = view
         self._llm_manager = llm_manager
+        self._concurrency_limit = concurrency_limit
+        self._show_as_completed = show_as_completed
+        self._stream_responses = stream_responses
+
+    def answer_queries(
+        self,
+        queries: Collection[QueryText],
+        debug: bool = False,
+        *,
+        use_cache: bool = True,
+    ) -> None:
+        """
+        If there are multiple queries, the conversation ends after executing them.
+        Every query continues its own copy of the previous messages, both when
+        answered concurrently and one after another. The queries are iterated
+        only once, while they are answered.
+        """
+        total = len(queries)
+        assert total
+        base_messages = list(self._llm_manager.prev_messages)
+        messages: list[CompleteMessage] = []
+        if total > 1 and self._concurrency_limit > 1 and not debug:
+            self._answer_queries_concurrently(queries, total, base_messages, use_cache)
+        else:
+            for i, query in enumerate(queries):
+                messages = self._answer_query(
+                    debug, i + 1, total, query, list(base_messages), use_cache
+                )
+        self._llm_manager.prev_messages[:] = messages if total == 1 else []
+
+    def _answer_queries_concurrently(
+        self,
+        queries: Collection[QueryText],
+        total: int,
+        base_messages: list[CompleteMessage],
+        use_cache: bool,
+    ) -> None:
+        """
+        Sends up to concurrency_limit queries at the same time. A failed query is
+        reported without stopping the others.
+        """
+        with ThreadPoolExecutor(max_workers=self._concurrency_limit) as executor:
+
+            def submit(query: QueryText) -> Future[QueryResult]:
+                return executor.submit(
+                    self._llm_manager.model_manager.get_simple_response,
+                    query,
+                    list(base_messages),
+                    use_cache=use_cache,
+                )
 
-    def answer_queries(self, queries: Sequence[QueryText], debug: bool = False) -> None:
-        """If there are multiple queries, the conversation ends after executing them."""
-        assert queries
-        messages = None
-        for i, query in enumerate(queries):
-            messages = self._answer_query(debug, i + 1, len(queries), query)
-        self._llm_manager.prev_messages[:] = messages or []
+            for future, i, query in self._iterate_futures(queries, submit):
+                self._finish_fan_out_query(future, query, i + 1, total)
+
+    def _iterate_futures(
+        self,
+        queries: Collection[QueryText],
+        submit: Callable[[QueryText], Future[QueryResult]],
+    ) -> Iterator[tuple[Future[QueryResult], int, QueryText]]:
+        """
+        Yields the futures in the order of the queries or as they complete. Only a
+        few queries more than the ones being answered are submitted in advance, so
+        long `/for` sweeps are not built at once.
+        """
+        max_pending = 2 * self._concurrency_limit
+        numbered_queries = enumerate(queries)
+        # in order of submission
+        pending: dict[Future[QueryResult], tuple[int, QueryText]] = {}
+        while True:
+            for i, query in islice(numbered_queries, max_pending - len(pending)):
+                pending[submit(query)] = (i, query)
+            if not pending:
+                return
+            if self._show_as_completed:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = next(iter(done))
+            else:
+                future = next(iter(pending))
+            i, query = pending.pop(future)
+            yield future, i, query
+
+    def _finish_fan_out_query(
+        self, future: Future[QueryResult], query: QueryText, current: int, total: int
+    ) -> None:
+        """Prints and saves the answer, a failure only affects this query"""
+        self._view.display_processing_query_text(current=current, total=total)
+        try:
+            query_result = future.result()
+            self._print_interaction(query, query_result)
+            self._llm_manager.repository.save_messages(query_result.messages)
+        except Exception as err:
+            logger.exception(f"Query {current} of {total} failed")
+            self._view.show_error_msg(
+                Raw(f"Ha fallado la consulta número {current} de {total}: {err}")
+            )
 
     def _answer_query(
-        self, debug: bool, current: int, total: int, query: QueryText
-    ) -> list[CompleteMessage] | None:
+        self,
+        debug: bool,
+        current: int,
+        total: int,
+        query: QueryText,
+        messages: list[CompleteMessage],
+        use_cache: bool = True,
+    ) -> list[CompleteMessage]:
         self._view.display_processing_query_text(current=current, total=total)
-        query_result = self._get_simple_response_from_model(query, debug)
-        self._print_interaction(query, query_result)
+        if self._stream_responses:
+            query_result = self._get_streamed_response_from_model(
+                query, messages, debug, use_cache
+            )
+        else:
+            query_result = self._get_simple_response_from_model(
+                query, messages, debug, use_cache
+            )
+            self._print_interaction(query, query_result)
         self._llm_manager.repository.save_messages(query_result.messages)
-        return query_result.messages if current == 1 else None
+        return query_result.messages
 
     def _get_simple_response_from_model(
-        self, query: QueryText, debug: bool = False
+        self,
+        query: QueryText,
+        messages: list[CompleteMessage],
+        debug: bool = False,
+        use_cache: bool = True,
     ) -> QueryResult:
         return self._llm_manager.model_manager.get_simple_response(
-            query, self._llm_manager.prev_messages, debug=debug
+            query, messages, debug=debug, use_cache=use_cache
         )
 
+    def _get_streamed_response_from_model(
+        self,
+        query: QueryText,
+        messages: list[CompleteMessage],
+        debug: bool = False,
+        use_cache: bool = True,
+    ) -> QueryResult:
+        """Prints the response while it arrives, with its time to first token"""
+        model = self._llm_manager.model_manager.model_wrapper.model
+        assert model
+        self._view.start_streamed_interaction(model.model_name, Raw(query))
+        timer = FirstTokenTimer()
+
+        def on_delta(delta: str) -> None:
+            timer.mark()
+            self._view.print_response_delta(Raw(delta))
+
+        query_result = self._llm_manager.model_manager.get_simple_response(
+            query,
+            messages,
+            debug=debug,
+            on_delta=on_delta,
+            use_cache=use_cache,
+        )
+        logger.info(f"Time to first token: {timer.seconds}")
+        self._view.end_streamed_interaction(timer.seconds)
+        self._show_cache_hit(query_result)
+        return query_result
+
     def _print_interaction(self, query: QueryText, query_result: QueryResult) -> None:
         model = self._llm_manager.model_manager.model_wrapper.model
         assert model
@@ -58,3 +212,20 @@ class QueryAnswerer:
             Raw(query),
             Raw(query_result.content),
         )
+        self._show_cache_hit(query_result)
+
+    def _show_cache_hit(self, query_result: QueryResult) -> None:
+        if query_result.from_cache:
+            self._view.display_neutral_msg(Raw("(respuesta obtenida de la caché)"))
+
+
+class FirstTokenTimer:
+    """Measures the time from its creation to the first call to mark"""
+
+    def __init__(self) -> None:
+        self._start = time.perf_counter()
+        self.seconds: float | None = None
+
+    def mark(self) -> None:
+        if self.seconds is None:
+            self.seconds = time.perf_counter() - self._start
@@ -1,3 +1,4 @@
+from collections.abc import Callable
 from typing import Final, Sequence
 
 from rich import print
@@ -19,7 +20,14 @@ INDEX_OF_DEFAULT_MODEL: Final = 0  # pragma: no mutate
 
 
 class SelectModelController:
-    def __init__(self, models: Sequence[Model]) -> None:
+    def __init__(
+        self,
+        models: Sequence[Model],
+        *,
+        warm_up: Callable[[], None] | None = None,
+    ) -> None:
+        """warm_up is called before waiting for the choice of the user"""
+        self._warm_up = warm_up
         self._model_choice_parser = ModelChoiceParser(models)
         self._models = models
         self._default_model = self._models[INDEX_OF_DEFAULT_MODEL]
@@ -31,6 +39,8 @@ class SelectModelController:
         """
         num_options = len(self._models)
         assert num_options > 0
+        if self._warm_up:
+            self._warm_up()
         chosen_model = None
         while not chosen_model:
 
@@ -43,3 +43,11 @@ class ConversationText:
 class QueryResult:
     content: str
     messages: list[CompleteMessage]
+    from_cache: bool = field(kw_only=True, default=False)
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    conversation_id: ConversationId
+    score: float
+    snippet: str
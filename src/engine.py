@@ -6,6 +6,7 @@ from src.controllers.command_interpreter import (
     CommandNoValid,
 )
 from src.domain import Model
+from src.infrastructure.exceptions import DeferredWriteError
 from src.protocols import ViewProtocol
 from src.view import Raw
 
@@ -27,6 +28,9 @@ class MainEngine:
     def initiate(self) -> None:
         self._command_handler.prompt_to_select_model()
 
+    def close(self) -> None:
+        self._command_handler.close()
+
     def process_raw_query(self, raw_query: str) -> None:
         try:
             action, remaining_input = self._command_interpreter.parse_user_input(
@@ -35,4 +39,8 @@ class MainEngine:
         except CommandNoValid as err:
             self._view.show_error_msg(Raw(str(err)))
             return
-        self._command_handler.process_action(action, remaining_input)
+        try:
+            self._command_handler.process_action(action, remaining_input)
+        except DeferredWriteError as err:
+            # a conversation saved in the background was lost, the program goes on
+            self._view.show_error_msg(Raw(str(err)))
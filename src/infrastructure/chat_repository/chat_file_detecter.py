@@ -9,26 +9,39 @@ from src.python_modules.FileSystemWrapper.file_manager_protocol import (
 from src.serde import NUMBER_OF_DIGITS
 
 CHAT_EXT = "chat"
-CHAT_NAME_PATTERN = re.compile(rf"^(\d{{{NUMBER_OF_DIGITS}}})\.{CHAT_EXT}$")
+
+
+def create_chat_name_pattern(number_of_digits: int) -> re.Pattern[str]:
+    return re.compile(rf"^(\d{{{number_of_digits}}})\.{CHAT_EXT}$")
+
+
+CHAT_NAME_PATTERN = create_chat_name_pattern(NUMBER_OF_DIGITS)
 
 
 class ChatFileDetecter:
     """Clase que identifica y filtra los chat files de un iterable de PathWrappers"""
 
-    def __init__(self, file_manager: FileManagerProtocol):
+    def __init__(
+        self,
+        file_manager: FileManagerProtocol,
+        chat_name_pattern: re.Pattern[str] = CHAT_NAME_PATTERN,
+    ):
         self._file_manager = file_manager
+        self._chat_name_pattern = chat_name_pattern
 
     def filter_chat_files(self, paths: Iterable[PurePath]) -> list[PurePath]:
         return [p for p in paths if self._is_chat_file(p)]
 
     def _is_chat_file(self, path: PurePath) -> bool:
-        assert self._file_manager.path_exists(path)
-        if self._file_manager.path_is_dir(path):
+        # the name is checked first to avoid disk access for the other paths
+        if not match_chat_file_pattern(path.name, self._chat_name_pattern):
             return False
-        return match_chat_file_pattern(path.name)
+        return not self._file_manager.path_is_dir(path)
 
 
-def match_chat_file_pattern(filename: str) -> bool:
+def match_chat_file_pattern(
+    filename: str, chat_name_pattern: re.Pattern[str] = CHAT_NAME_PATTERN
+) -> bool:
     assert "/" not in filename
     assert "\\" not in filename
-    return bool(CHAT_NAME_PATTERN.match(filename))
+    return bool(chat_name_pattern.match(filename))
@@ -0,0 +1,65 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from src.python_modules.FileSystemWrapper.file_manager_protocol import FileStats
+
+from src.domain import CompleteMessage, ConversationId, ConversationText
+
+# Maximum number of characters of the cached conversation texts
+CACHE_MAX_SIZE = 32 * 1024 * 1024  # pragma: no mutate
+
+
+@dataclass
+class CachedConversation:
+    stats: FileStats
+    conversation_text: ConversationText
+    # parsed lazily, the first time the messages are requested
+    messages: list[CompleteMessage] | None = field(default=None)
+
+    @property
+    def size(self) -> int:
+        return len(self.conversation_text.text)
+
+
+class ConversationCache:
+    """
+    LRU cache of the loaded conversations, bounded by the total size of their
+    texts. An entry is only valid while the file keeps the same mtime and size.
+    """
+
+    def __init__(self, max_size: int = CACHE_MAX_SIZE):
+        self._max_size = max_size
+        self._entries: OrderedDict[ConversationId, CachedConversation] = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(
+        self, conversation_id: ConversationId, stats: FileStats
+    ) -> CachedConversation | None:
+        entry = self._entries.get(conversation_id)
+        if entry is None or entry.stats != stats:
+            self.misses += 1
+            self.invalidate(conversation_id)
+            return None
+        self.hits += 1
+        self._entries.move_to_end(conversation_id)
+        return entry
+
+    def put(self, conversation_id: ConversationId, entry: CachedConversation) -> None:
+        self.invalidate(conversation_id)
+        if entry.size > self._max_size:
+            return
+        self._entries[conversation_id] = entry
+        self._size += entry.size
+        while self._size > self._max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.size
+
+    def invalidate(self, conversation_id: ConversationId) -> None:
+        if (entry := self._entries.pop(conversation_id, None)) is not None:
+            self._size -= entry.size
@@ -7,15 +7,16 @@ from src.python_modules.FileSystemWrapper.file_manager_protocol import (
 )
 
 from src.domain import ConversationId
-from src.serde import NUMBER_OF_DIGITS, convert_digits_to_conversation_id
 from src.setup_logging import configure_logger
 
 from .chat_file_detecter import ChatFileDetecter
+from .layout import ChatsLayout
 
 logger = configure_logger(__name__)
 
-TOO_MUCH_CHATS = 10**NUMBER_OF_DIGITS  # pragma: no mutate
-WARNING_THRESHOLD = TOO_MUCH_CHATS * 0.9  # pragma: no mutate
+# Fraction of the available ids after which a warning is logged
+WARNING_THRESHOLD_RATIO = 0.9  # pragma: no mutate
+MAX_CLAIM_ATTEMPTS = 100  # pragma: no mutate
 
 
 class FreeConversationIdProvider:
@@ -28,19 +29,26 @@ class FreeConversationIdProvider:
         self,
         file_manager: FileManagerProtocol,
         chat_detecter: ChatFileDetecter,
-        chats_dir: PurePath,
+        chats_layout: ChatsLayout,
     ):
         self._file_manager = file_manager
         self._chat_detecter = chat_detecter
-        self._chats_dir = chats_dir
+        self._chats_layout = chats_layout
 
     def get_next_free_conversation_id(self) -> ConversationId:
-        max_number = self._find_max_file_number(self._chats_dir)
+        max_number = self.find_max_conversation_number()
         new_number = (max_number + 1) if max_number is not None else 0
-        if new_number > WARNING_THRESHOLD:
-            logger.warning("Warning: running short of chat id numbers")
-        assert 0 <= new_number < TOO_MUCH_CHATS, new_number
-        return convert_digits_to_conversation_id(str(new_number))
+        check_conversation_number(new_number, self._chats_layout.max_conversations)
+        return self._chats_layout.format_conversation_id(new_number)
+
+    def find_max_conversation_number(self) -> int | None:
+        # the directories are sorted, so only the last non-empty one is listed
+        chat_dirs = self._chats_layout.get_chat_dirs(self._file_manager)
+        for chat_dir in reversed(chat_dirs):
+            max_number = self._find_max_file_number(chat_dir)
+            if max_number is not None:
+                return max_number
+        return None
 
     def _find_max_file_number(self, directory_path: PurePath) -> int | None:
         assert self._file_manager.path_is_dir(directory_path)
@@ -50,6 +58,77 @@ class FreeConversationIdProvider:
         return get_max_stem_value(chat_files)
 
 
+class ReservingConversationIdProvider:
+    """
+    Provides the next ConversationId in O(1) using a persisted high-water mark.
+    Every id is claimed by creating its chat file exclusively, so two processes
+    never get the same id. The chats directory is only scanned on first use or
+    when a claim finds that the file already exists.
+    """
+
+    def __init__(
+        self,
+        file_manager: FileManagerProtocol,
+        free_id_provider: FreeConversationIdProvider,
+        chats_layout: ChatsLayout,
+        high_water_mark_path: PurePath,
+    ):
+        self._file_manager = file_manager
+        self._free_id_provider = free_id_provider
+        self._chats_layout = chats_layout
+        self._high_water_mark_path = high_water_mark_path
+        self._next_number: int | None = None
+
+    def get_next_free_conversation_id(self) -> ConversationId:
+        if self._next_number is None:
+            self._next_number = self._find_next_number_by_scanning()
+        for _ in range(MAX_CLAIM_ATTEMPTS):
+            number = self._next_number
+            check_conversation_number(number, self._chats_layout.max_conversations)
+            conversation_id = self._chats_layout.format_conversation_id(number)
+            chat_path = self._chats_layout.build_chat_path(conversation_id)
+            self._file_manager.mkdir_if_not_exists(chat_path.parent)
+            if self._file_manager.create_file_exclusively(chat_path):
+                self._next_number = number + 1
+                try:
+                    self._file_manager.write_file(
+                        self._high_water_mark_path, str(number)
+                    )
+                except Exception:
+                    self._file_manager.unlink_path(chat_path)
+                    raise
+                return conversation_id
+            logger.info(f"Id {conversation_id} ya ocupado, se vuelve a escanear")
+            self._next_number = max(number + 1, self._find_next_number_by_scanning())
+        raise RuntimeError("Could not claim a free conversation id")
+
+    def _find_next_number_by_scanning(self) -> int:
+        numbers = [
+            number
+            for number in (
+                self._free_id_provider.find_max_conversation_number(),
+                self._read_high_water_mark(),
+            )
+            if number is not None
+        ]
+        return max(numbers) + 1 if numbers else 0
+
+    def _read_high_water_mark(self) -> int | None:
+        if not self._file_manager.path_exists(self._high_water_mark_path):
+            return None
+        text = self._file_manager.read_file(self._high_water_mark_path).strip()
+        if not text.isdigit():
+            logger.warning(f"Ignoring invalid high-water mark: {text!r}")
+            return None
+        return int(text)
+
+
+def check_conversation_number(number: int, max_conversations: int) -> None:
+    if number > max_conversations * WARNING_THRESHOLD_RATIO:
+        logger.warning("Warning: running short of chat id numbers")
+    assert 0 <= number < max_conversations, number
+
+
 def get_max_stem_value(chat_files: Iterable[PurePath]) -> int | None:
     values = (int(p.stem) for p in chat_files)
     return max(values, default=None)
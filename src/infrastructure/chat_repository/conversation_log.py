@@ -0,0 +1,37 @@
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from enum import Enum
+
+from src.domain import CompleteMessage, ConversationId
+
+
+class SaveMode(Enum):
+    """How ChatRepository persists the messages of every answered query"""
+
+    NEW_FILE_PER_TURN = "NEW_FILE_PER_TURN"
+    APPEND = "APPEND"
+
+
+@dataclass
+class ConversationLog:
+    """Conversation file that is extended with every turn of the session"""
+
+    conversation_id: ConversationId
+    # position of the message count in the file (not used by database storage)
+    count_offset: int = 0
+    saved_messages: list[CompleteMessage] = field(default_factory=list)
+    current_time: str = ""
+
+    def is_continued_by(self, complete_messages: Sequence[CompleteMessage]) -> bool:
+        """Checks if the messages extend the ones already saved in this log"""
+        if len(complete_messages) < len(self.saved_messages):
+            return False
+        return all(
+            saved is new for saved, new in zip(self.saved_messages, complete_messages)
+        )
+
+    def get_unsaved_messages(
+        self, complete_messages: Sequence[CompleteMessage]
+    ) -> Sequence[CompleteMessage]:
+        assert self.is_continued_by(complete_messages)
+        return complete_messages[len(self.saved_messages) :]
@@ -8,16 +8,41 @@ from src.python_modules.FileSystemWrapper.file_manager_protocol import (
 from src.domain import ConversationId
 from src.setup_logging import configure_logger
 
-from .chat_file_detecter import CHAT_EXT, ChatFileDetecter
-from .conversation_id_provider import FreeConversationIdProvider
+from .chat_file_detecter import ChatFileDetecter
+from .conversation_id_provider import (
+    FreeConversationIdProvider,
+    ReservingConversationIdProvider,
+)
+from .layout import (
+    ChatsLayout,
+    FlatChatsLayout,
+    ShardedChatsLayout,
+    StorageLayout,
+)
 
 logger = configure_logger(__name__)
 
 
 class DataLocation:
-    def __init__(self, main_directory: PurePath):
+    def __init__(
+        self,
+        main_directory: PurePath,
+        storage_layout: StorageLayout = StorageLayout.FLAT,
+    ):
         self._data_dir: Final = main_directory / "data"
         self._chats_dir: Final = self.data_dir / "chats"
+        self._sharded_chats_dir: Final = self.data_dir / "sharded_chats"
+        self._last_conversation_id_path: Final = self.data_dir / "last_conversation_id"
+        self._database_path: Final = self.data_dir / "chats.sqlite3"
+        self._metadata_index_path: Final = self.data_dir / "chats_index.jsonl"
+        self._search_index_dir: Final = self.data_dir / "search_index"
+        self._sqlite_search_index_dir: Final = self.data_dir / "sqlite_search_index"
+        self._completion_cache_dir: Final = self.data_dir / "completion_cache"
+        self._chats_layout: Final[ChatsLayout] = (
+            ShardedChatsLayout(self._sharded_chats_dir)
+            if storage_layout is StorageLayout.SHARDED
+            else FlatChatsLayout(self._chats_dir)
+        )
 
     @property
     def data_dir(self) -> PurePath:
@@ -27,6 +52,38 @@ class DataLocation:
     def chats_dir(self) -> PurePath:
         return self._chats_dir
 
+    @property
+    def sharded_chats_dir(self) -> PurePath:
+        return self._sharded_chats_dir
+
+    @property
+    def chats_layout(self) -> ChatsLayout:
+        return self._chats_layout
+
+    @property
+    def last_conversation_id_path(self) -> PurePath:
+        return self._last_conversation_id_path
+
+    @property
+    def database_path(self) -> PurePath:
+        return self._database_path
+
+    @property
+    def metadata_index_path(self) -> PurePath:
+        return self._metadata_index_path
+
+    @property
+    def search_index_dir(self) -> PurePath:
+        return self._search_index_dir
+
+    @property
+    def sqlite_search_index_dir(self) -> PurePath:
+        return self._sqlite_search_index_dir
+
+    @property
+    def completion_cache_dir(self) -> PurePath:
+        return self._completion_cache_dir
+
 
 class ChatRepositoryImplementer:
     """Only access to disk using an object that implements FileManagerProtocol"""
@@ -40,26 +97,33 @@ class ChatRepositoryImplementer:
     ) -> None:
         assert not self.is_initialized
         self._file_manager = file_manager
-        self._chat_detecter = ChatFileDetecter(self._file_manager)
-        self._conversation_id_provider = FreeConversationIdProvider(
-            self._file_manager, self._chat_detecter, data_location.chats_dir
+        self._chats_layout = data_location.chats_layout
+        self._chat_detecter = ChatFileDetecter(
+            self._file_manager, self._chats_layout.chat_name_pattern
+        )
+        self._conversation_id_provider = ReservingConversationIdProvider(
+            self._file_manager,
+            FreeConversationIdProvider(
+                self._file_manager, self._chat_detecter, self._chats_layout
+            ),
+            self._chats_layout,
+            data_location.last_conversation_id_path,
         )
-        self._chats_dir = data_location.chats_dir
         self.is_initialized = True
 
     def get_conversation_ids(self) -> list[ConversationId]:
         assert self.is_initialized
-        children = self._file_manager.get_children(self._chats_dir)
-        paths = self._chat_detecter.filter_chat_files(children)
         ids: list[ConversationId] = []
-        for path in paths:
-            id_as_text = path.name.split(".")[0]
-            ids.append(ConversationId(id_as_text))
+        for chat_dir in self._chats_layout.get_chat_dirs(self._file_manager):
+            children = self._file_manager.get_children(chat_dir)
+            paths = self._chat_detecter.filter_chat_files(children)
+            for path in paths:
+                id_as_text = path.name.split(".")[0]
+                ids.append(ConversationId(id_as_text))
         return ids
 
     def build_chat_path(self, conversation_id: ConversationId) -> PurePath:
-        filename = conversation_id + "." + CHAT_EXT
-        return self._chats_dir / filename
+        return self._chats_layout.build_chat_path(conversation_id)
 
     def get_new_conversation_id(self) -> ConversationId:
         return self._conversation_id_provider.get_next_free_conversation_id()
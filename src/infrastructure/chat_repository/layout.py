@@ -0,0 +1,100 @@
+import re
+from abc import ABC, abstractmethod
+from enum import Enum
+from pathlib import PurePath
+from typing import Final
+
+from src.python_modules.FileSystemWrapper.file_manager_protocol import (
+    FileManagerProtocol,
+)
+
+from src.domain import ConversationId
+from src.serde import NUMBER_OF_DIGITS, WIDE_NUMBER_OF_DIGITS
+
+from .chat_file_detecter import CHAT_EXT, create_chat_name_pattern
+
+# Number of chats stored in every subdirectory of the sharded layout
+SHARD_SIZE = 1000  # pragma: no mutate
+SHARD_DIGITS = WIDE_NUMBER_OF_DIGITS - 3  # pragma: no mutate
+SHARD_NAME_PATTERN = re.compile(rf"^\d{{{SHARD_DIGITS}}}$")
+
+
+class StorageLayout(Enum):
+    """How the chat files are distributed in the data directory"""
+
+    FLAT = "FLAT"
+    SHARDED = "SHARDED"
+
+
+class ChatsLayout(ABC):
+    """Derives the path of every chat file directly from its ConversationId"""
+
+    def __init__(self, chats_dir: PurePath, number_of_digits: int):
+        self._chats_dir: Final = chats_dir
+        self._number_of_digits: Final = number_of_digits
+        self._chat_name_pattern: Final = create_chat_name_pattern(number_of_digits)
+
+    @property
+    def chats_dir(self) -> PurePath:
+        return self._chats_dir
+
+    @property
+    def chat_name_pattern(self) -> re.Pattern[str]:
+        return self._chat_name_pattern
+
+    @property
+    def max_conversations(self) -> int:
+        return int(10**self._number_of_digits)
+
+    def format_conversation_id(self, number: int) -> ConversationId:
+        text = str(number).zfill(self._number_of_digits)
+        if number < 0 or len(text) > self._number_of_digits:
+            raise ValueError(f"Id {number} fuera del rango de este formato")
+        return ConversationId(text)
+
+    def build_chat_path(self, conversation_id: ConversationId) -> PurePath:
+        """Accepts ids with any zero padding, e.g. 0042 and 00000042"""
+        normalized_id = self.format_conversation_id(int(conversation_id))
+        return self._get_chat_dir(normalized_id) / f"{normalized_id}.{CHAT_EXT}"
+
+    @abstractmethod
+    def get_chat_dirs(self, file_manager: FileManagerProtocol) -> list[PurePath]:
+        """Directories containing chat files, sorted by the ids they contain"""
+
+    @abstractmethod
+    def _get_chat_dir(self, conversation_id: ConversationId) -> PurePath: ...
+
+
+class FlatChatsLayout(ChatsLayout):
+    """All the chats in the same directory, with 4 digits ids"""
+
+    def __init__(self, chats_dir: PurePath):
+        super().__init__(chats_dir, NUMBER_OF_DIGITS)
+
+    def get_chat_dirs(self, file_manager: FileManagerProtocol) -> list[PurePath]:
+        return [self.chats_dir]
+
+    def _get_chat_dir(self, conversation_id: ConversationId) -> PurePath:
+        return self.chats_dir
+
+
+class ShardedChatsLayout(ChatsLayout):
+    """
+    Chats with wide ids, stored in subdirectories of SHARD_SIZE files named after
+    the leading digits of the id (00000042.chat is stored in 00000/).
+    """
+
+    def __init__(self, chats_dir: PurePath):
+        super().__init__(chats_dir, WIDE_NUMBER_OF_DIGITS)
+
+    def get_chat_dirs(self, file_manager: FileManagerProtocol) -> list[PurePath]:
+        shards = [
+            path
+            for path in file_manager.get_children(self.chats_dir)
+            if SHARD_NAME_PATTERN.match(path.name)
+        ]
+        return sorted(shards, key=lambda path: path.name)
+
+    def _get_chat_dir(self, conversation_id: ConversationId) -> PurePath:
+        shard = str(int(conversation_id) // SHARD_SIZE).zfill(SHARD_DIGITS)
+        return self.chats_dir / shard
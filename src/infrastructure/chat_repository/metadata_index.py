@@ -0,0 +1,148 @@
+import json
+from collections.abc import Iterable, Sequence
+from dataclasses import asdict, dataclass
+from pathlib import PurePath
+
+from src.python_modules.FileSystemWrapper.file_manager_protocol import (
+    FileManagerProtocol,
+    FileStats,
+)
+
+from src.domain import CompleteMessage, ConversationId, ModelName
+from src.setup_logging import configure_logger
+from src.utils import remove_duplicates
+
+logger = configure_logger(__name__)
+
+# Number of superseded lines that triggers rewriting the index (at least as many
+# as the conversations, so every line is rewritten at most once on average)
+COMPACTION_THRESHOLD = 500  # pragma: no mutate
+
+
+@dataclass(frozen=True)
+class ConversationMetadata:
+    id: ConversationId
+    current_time: str
+    number_of_messages: int
+    models: tuple[ModelName, ...]
+    size: int
+    mtime: float
+
+    def matches_stats(self, stats: FileStats) -> bool:
+        return self.size == stats.size and self.mtime == stats.mtime
+
+
+class MetadataIndex:
+    """
+    Persistent index with the metadata of every conversation. It is stored as JSON
+    lines where a later line replaces the previous ones with the same id, so every
+    update is a single append. The file is only read when the index is queried,
+    and it is rewritten without the superseded lines once they are too many.
+    """
+
+    def __init__(self, file_manager: FileManagerProtocol, index_path: PurePath):
+        self._file_manager = file_manager
+        self._index_path = index_path
+        self._entries: dict[ConversationId, ConversationMetadata] | None = None
+        # lines in the file, only counted once it is loaded
+        self._lines = 0
+
+    def update(self, metadata: ConversationMetadata) -> None:
+        self._file_manager.append_file(self._index_path, serialize_entry(metadata))
+        if self._entries is not None:
+            self._entries[metadata.id] = metadata
+            self._lines += 1
+            self._compact_if_needed(self._entries)
+
+    def get(self, conversation_id: ConversationId) -> ConversationMetadata | None:
+        return self._load().get(conversation_id)
+
+    def get_all(self) -> list[ConversationMetadata]:
+        return sorted(self._load().values(), key=lambda metadata: metadata.id)
+
+    def find_by_time_range(self, start: str, end: str) -> list[ConversationMetadata]:
+        """Conversations with start <= current_time <= end (same format as TimeManager)"""
+        return [
+            metadata
+            for metadata in self.get_all()
+            if start <= metadata.current_time <= end
+        ]
+
+    def find_by_model(self, model_name: ModelName) -> list[ConversationMetadata]:
+        return [
+            metadata for metadata in self.get_all() if model_name in metadata.models
+        ]
+
+    def replace_all(self, entries: Iterable[ConversationMetadata]) -> None:
+        """Rewrites the whole index, discarding the superseded lines"""
+        self._entries = {metadata.id: metadata for metadata in entries}
+        text = "".join(serialize_entry(metadata) for metadata in self.get_all())
+        self._file_manager.write_file(self._index_path, text)
+        self._lines = len(self._entries)
+
+    def _load(self) -> dict[ConversationId, ConversationMetadata]:
+        if self._entries is None:
+            self._entries = {}
+            if self._file_manager.path_exists(self._index_path):
+                text = self._file_manager.read_file(self._index_path)
+                lines = text.splitlines()
+                for line in lines:
+                    if metadata := deserialize_entry(line):
+                        self._entries[metadata.id] = metadata
+                self._lines = len(lines)
+            self._compact_if_needed(self._entries)
+        return self._entries
+
+    def _compact_if_needed(
+        self, entries: dict[ConversationId, ConversationMetadata]
+    ) -> None:
+        superseded_lines = self._lines - len(entries)
+        if superseded_lines > max(COMPACTION_THRESHOLD, len(entries)):
+            logger.info(f"Compacting the index, {superseded_lines} lines superseded")
+            self.replace_all(list(entries.values()))
+
+
+def build_metadata(
+    conversation_id: ConversationId,
+    current_time: str,
+    complete_messages: Sequence[CompleteMessage],
+    stats: FileStats,
+) -> ConversationMetadata:
+    models = remove_duplicates(
+        [
+            complete_message.model.model_name
+            for complete_message in complete_messages
+            if complete_message.model
+        ]
+    )
+    return ConversationMetadata(
+        conversation_id,
+        current_time,
+        len(complete_messages),
+        tuple(models),
+        stats.size,
+        stats.mtime,
+    )
+
+
+def serialize_entry(metadata: ConversationMetadata) -> str:
+    return json.dumps(asdict(metadata)) + "\n"
+
+
+def deserialize_entry(line: str) -> ConversationMetadata | None:
+    if not line.strip():
+        return None
+    try:
+        data = json.loads(line)
+        return ConversationMetadata(
+            ConversationId(data["id"]),
+            data["current_time"],
+            data["number_of_messages"],
+            tuple(ModelName(model_name) for model_name in data["models"]),
+            data["size"],
+            data["mtime"],
+        )
+    except (ValueError, KeyError, TypeError):
+        # a truncated line is repaired by the next rebuild
+        logger.warning(f"Ignoring invalid index entry: {line!r}")
+        return None
@@ -0,0 +1,70 @@
+from pathlib import PurePath
+
+from src.python_modules.FileSystemWrapper.file_manager import FileManager
+from src.python_modules.FileSystemWrapper.file_manager_protocol import (
+    FileManagerProtocol,
+)
+
+from src.domain import ConversationId
+from src.infrastructure.main_path_provider import get_main_directory
+from src.infrastructure.now import TimeManager
+from src.setup_logging import configure_logger
+
+from .chat_file_detecter import ChatFileDetecter
+from .implementer import DataLocation
+from .layout import StorageLayout
+from .repository import ChatRepository
+
+logger = configure_logger(__name__)
+
+
+def migrate_to_sharded_layout(
+    main_directory: PurePath, file_manager: FileManagerProtocol
+) -> int:
+    """
+    Moves every NNNN.chat file of the flat layout to its place in the sharded
+    layout, keeping its number. The ids of the moved chats change (0042 is now
+    00000042), so both indexes are rebuilt at the end. Returns the number of
+    moved files.
+    """
+    flat_location = DataLocation(main_directory, StorageLayout.FLAT)
+    sharded_location = DataLocation(main_directory, StorageLayout.SHARDED)
+    sharded_layout = sharded_location.chats_layout
+    file_manager.mkdir_if_not_exists(sharded_layout.chats_dir)
+
+    chat_detecter = ChatFileDetecter(
+        file_manager, flat_location.chats_layout.chat_name_pattern
+    )
+    children = file_manager.get_children(flat_location.chats_dir)
+    created_dirs: set[PurePath] = set()
+    moved = 0
+    for path in chat_detecter.filter_chat_files(children):
+        new_path = sharded_layout.build_chat_path(ConversationId(path.stem))
+        if new_path.parent not in created_dirs:
+            file_manager.mkdir_if_not_exists(new_path.parent)
+            created_dirs.add(new_path.parent)
+        if file_manager.path_exists(new_path):
+            raise FileExistsError(f"No se puede migrar {path}: {new_path} ya existe")
+        file_manager.rename_path(path, new_path)
+        moved += 1
+    logger.info(f"Migrated {moved} chats to {sharded_layout.chats_dir}")
+    sharded_repository = ChatRepository(
+        main_directory,
+        file_manager=file_manager,
+        time_manager=TimeManager(),
+        storage_layout=StorageLayout.SHARDED,
+    )
+    repaired = sharded_repository.rebuild_metadata_index()
+    sharded_repository.rebuild_search_index()
+    logger.info(f"Rebuilt the indexes, {repaired} metadata entries repaired")
+    return moved
+
+
+def main() -> None:
+    moved = migrate_to_sharded_layout(get_main_directory(), FileManager())
+    print(f"Se han movido {moved} conversaciones al formato por subdirectorios.")
+    print("Activa USE_SHARDED_CHATS_STORAGE en src/settings.py para usarlo.")
+
+
+if __name__ == "__main__":
+    main()
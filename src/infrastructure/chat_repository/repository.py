@@ -1,4 +1,5 @@
 from collections.abc import Sequence
+from contextlib import closing
 from pathlib import PurePath
 from typing import TYPE_CHECKING
 
@@ -6,13 +7,50 @@ from src.python_modules.FileSystemWrapper.file_manager_protocol import (
     FileManagerProtocol,
 )
 
-from src.domain import CompleteMessage, ConversationId, ConversationText
+from src.domain import (
+    CompleteMessage,
+    ConversationId,
+    ConversationText,
+    ModelName,
+    SearchResult,
+)
 from src.protocols import TimeManagerProtocol
-from src.serde import serialize_conversation
-from src.serde.deserialize import deserialize_conversation_text_into_messages
+from src.serde import (
+    ConversationHeader,
+    deserialize_conversation_header,
+    serialize_conversation,
+)
+from src.serde.deserialize import (
+    deserialize_conversation_text_into_messages,
+    deserialize_into_conversation_object,
+)
+from src.serde.serialize import (
+    find_number_of_messages_offset,
+    format_number_of_messages,
+    serialize_messages,
+)
 from src.serde.shared import SCHEMA_VERSION
+from src.setup_logging import configure_logger
 
+from .conversation_cache import (
+    CACHE_MAX_SIZE,
+    CachedConversation,
+    ConversationCache,
+)
+from .conversation_log import ConversationLog, SaveMode
 from .implementer import ChatRepositoryImplementer, DataLocation
+from .layout import StorageLayout
+from .metadata_index import ConversationMetadata, MetadataIndex, build_metadata
+from .search_index import (
+    SEARCH_RESULTS_LIMIT,
+    SearchIndex,
+    rebuild_search_index,
+    search_conversations,
+)
+
+logger = configure_logger(__name__)
+
+HEADER_CHUNK_SIZE = 512
 
 
 class ChatRepository:
@@ -22,49 +60,245 @@ class ChatRepository:
         *,
         file_manager: FileManagerProtocol,
         time_manager: TimeManagerProtocol,
+        save_mode: SaveMode = SaveMode.NEW_FILE_PER_TURN,
+        storage_layout: StorageLayout = StorageLayout.FLAT,
+        cache_max_size: int = CACHE_MAX_SIZE,
     ) -> None:
         self._file_manager = file_manager
         self._time_manager = time_manager
+        self._save_mode = save_mode
+        self._conversation_log: ConversationLog | None = None
         self._implementer = ChatRepositoryImplementer()
-        self._data_location = DataLocation(main_directory)
+        self._data_location = DataLocation(main_directory, storage_layout)
         self._implementer.init(
             self._data_location,
             self._file_manager,
         )
+        self._metadata_index = MetadataIndex(
+            self._file_manager, self._data_location.metadata_index_path
+        )
+        self._search_index = SearchIndex(
+            self._file_manager, self._data_location.search_index_dir
+        )
+        self._cache = ConversationCache(cache_max_size)
         self._setup_file_system()
 
+    @property
+    def cache(self) -> ConversationCache:
+        return self._cache
+
     def get_conversation_ids(self) -> list[ConversationId]:
         return self._implementer.get_conversation_ids()
 
+    def close(self) -> None:
+        """Nothing to release, every file is closed after being used"""
+
     def save_messages(self, complete_messages: Sequence[CompleteMessage]) -> None:
-        conversation_id = self._implementer.get_new_conversation_id()
-        current_time = self._time_manager.get_current_time()
-        conversation = serialize_conversation(
-            complete_messages, conversation_id, current_time
+        if self._save_mode is SaveMode.APPEND:
+            self._append_messages(complete_messages)
+            return
+        conversation_id, current_time, _ = self._save_new_conversation(
+            complete_messages
+        )
+        self._index_conversation(conversation_id, current_time, complete_messages)
+        self._search_index.add_messages(
+            conversation_id, complete_messages, replace=True
         )
-        self._save_conversation(conversation_id, conversation)
 
     def load_conversation(
         self, conversation_id: ConversationId
     ) -> list[CompleteMessage]:
-        conversation = self.load_conversation_as_conversation_text(conversation_id)
-        return deserialize_conversation_text_into_messages(conversation)
+        entry = self._load_cached_conversation(conversation_id)
+        if entry.messages is None:
+            entry.messages = deserialize_conversation_text_into_messages(
+                entry.conversation_text
+            )
+        return list(entry.messages)
 
     def load_conversation_as_conversation_text(
         self, conversation_id: ConversationId
     ) -> ConversationText:
+        conversation_text = self._load_cached_conversation(
+            conversation_id
+        ).conversation_text
+        return ConversationText(
+            conversation_text.text, conversation_text.schema_version
+        )
+
+    def read_conversation_header(
+        self, conversation_id: ConversationId
+    ) -> ConversationHeader:
+        """Reads only the META block at the top of the conversation file"""
         filepath = self._implementer.build_chat_path(conversation_id)
-        return ConversationText(self._file_manager.read_file(filepath), SCHEMA_VERSION)
+        chunks = self._file_manager.read_file_chunks(filepath, HEADER_CHUNK_SIZE)
+        with closing(chunks):
+            return deserialize_conversation_header(chunks)
+
+    def find_conversations_by_time_range(
+        self, start: str, end: str
+    ) -> list[ConversationMetadata]:
+        return self._metadata_index.find_by_time_range(start, end)
+
+    def find_conversations_by_model(
+        self, model_name: ModelName
+    ) -> list[ConversationMetadata]:
+        return self._metadata_index.find_by_model(model_name)
+
+    def search_conversations(
+        self, query: str, limit: int = SEARCH_RESULTS_LIMIT
+    ) -> list[SearchResult]:
+        return search_conversations(self._search_index, self, query, limit)
+
+    def rebuild_search_index(self) -> None:
+        rebuild_search_index(self._search_index, self)
+
+    def rebuild_metadata_index(self) -> int:
+        """
+        Compares the metadata index with the chat files, re-reading only the files
+        whose size or mtime changed, and rewrites it without stale entries.
+        Returns the number of repaired entries.
+        """
+        entries: list[ConversationMetadata] = []
+        repaired = 0
+        for conversation_id in self.get_conversation_ids():
+            filepath = self._implementer.build_chat_path(conversation_id)
+            stats = self._file_manager.get_file_stats(filepath)
+            metadata = self._metadata_index.get(conversation_id)
+            if metadata is None or not metadata.matches_stats(stats):
+                text = self.load_conversation_as_conversation_text(conversation_id)
+                if not text.text.strip():
+                    logger.warning(f"Skipping empty chat file {conversation_id}")
+                    continue
+                conversation = deserialize_into_conversation_object(
+                    text, preserve_model=True, check_model_exists=False
+                )
+                metadata = build_metadata(
+                    conversation_id,
+                    conversation.current_time,
+                    conversation.messages,
+                    stats,
+                )
+                repaired += 1
+            entries.append(metadata)
+        current_ids = {metadata.id for metadata in entries}
+        repaired += sum(
+            metadata.id not in current_ids
+            for metadata in self._metadata_index.get_all()
+        )
+        self._metadata_index.replace_all(entries)
+        return repaired
+
+    def _load_cached_conversation(
+        self, conversation_id: ConversationId
+    ) -> CachedConversation:
+        """Reads the file only when it changed since it was cached"""
+        filepath = self._implementer.build_chat_path(conversation_id)
+        stats = self._file_manager.get_file_stats(filepath)
+        entry = self._cache.get(conversation_id, stats)
+        if entry is None:
+            text = self._file_manager.read_file(filepath)
+            entry = CachedConversation(stats, ConversationText(text, SCHEMA_VERSION))
+            self._cache.put(conversation_id, entry)
+        return entry
 
     def _setup_file_system(self) -> None:
         self._file_manager.mkdir_if_not_exists(self._data_location.data_dir)
         self._file_manager.mkdir_if_not_exists(self._data_location.chats_dir)
+        self._file_manager.mkdir_if_not_exists(self._data_location.search_index_dir)
+        if (chats_dir := self._data_location.chats_layout.chats_dir) != (
+            self._data_location.chats_dir
+        ):
+            self._file_manager.mkdir_if_not_exists(chats_dir)
 
-    def _save_conversation(
-        self, conversation_id: ConversationId, conversation_as_text: str
+    def _append_messages(self, complete_messages: Sequence[CompleteMessage]) -> None:
+        """
+        Extends the conversation log of the session with the new messages, or starts
+        a new log when the messages do not continue it (new or loaded conversation).
+        """
+        log = self._conversation_log
+        if log is None or not log.is_continued_by(complete_messages):
+            self._start_conversation_log(complete_messages)
+            return
+        new_messages = log.get_unsaved_messages(complete_messages)
+        if not new_messages:
+            return
+        filepath = self._implementer.build_chat_path(log.conversation_id)
+        self._cache.invalidate(log.conversation_id)
+        self._file_manager.append_file(filepath, serialize_messages(new_messages))
+        log.saved_messages.extend(new_messages)
+        self._file_manager.patch_file(
+            filepath,
+            log.count_offset,
+            format_number_of_messages(len(log.saved_messages)),
+        )
+        self._index_conversation(
+            log.conversation_id, log.current_time, log.saved_messages
+        )
+        self._search_index.add_messages(
+            log.conversation_id, new_messages, replace=False
+        )
+
+    def _start_conversation_log(
+        self, complete_messages: Sequence[CompleteMessage]
+    ) -> None:
+        conversation_id, current_time, conversation = self._save_new_conversation(
+            complete_messages, fixed_width_count=True
+        )
+        self._conversation_log = ConversationLog(
+            conversation_id,
+            find_number_of_messages_offset(conversation),
+            list(complete_messages),
+            current_time,
+        )
+        self._index_conversation(conversation_id, current_time, complete_messages)
+        self._search_index.add_messages(
+            conversation_id, complete_messages, replace=True
+        )
+
+    def _save_new_conversation(
+        self,
+        complete_messages: Sequence[CompleteMessage],
+        *,
+        fixed_width_count: bool = False,
+    ) -> tuple[ConversationId, str, str]:
+        """Returns the id, the time and the text of the conversation saved"""
+        conversation_id = self._implementer.get_new_conversation_id()
+        # the id may be claimed by creating an empty file, which must not be kept
+        # if the conversation is not saved
+        filepath = self._implementer.build_chat_path(conversation_id)
+        try:
+            current_time = self._time_manager.get_current_time()
+            conversation = serialize_conversation(
+                complete_messages,
+                conversation_id,
+                current_time,
+                fixed_width_count=fixed_width_count,
+            )
+            self._cache.invalidate(conversation_id)
+            self._file_manager.write_file(filepath, conversation)
+        except Exception:
+            self._remove_unsaved_file(filepath)
+            raise
+        return conversation_id, current_time, conversation
+
+    def _remove_unsaved_file(self, filepath: PurePath) -> None:
+        try:
+            if self._file_manager.path_exists(filepath):
+                self._file_manager.unlink_path(filepath)
+        except OSError as err:
+            logger.warning(f"Could not remove {filepath}: {err}")
+
+    def _index_conversation(
+        self,
+        conversation_id: ConversationId,
+        current_time: str,
+        complete_messages: Sequence[CompleteMessage],
     ) -> None:
         filepath = self._implementer.build_chat_path(conversation_id)
-        self._file_manager.write_file(filepath, conversation_as_text)
+        stats = self._file_manager.get_file_stats(filepath)
+        self._metadata_index.update(
+            build_metadata(conversation_id, current_time, complete_messages, stats)
+        )
 
 
 if TYPE_CHECKING:
@@ -0,0 +1,220 @@
+import heapq
+import json
+import math
+import re
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from pathlib import PurePath
+from typing import TYPE_CHECKING, Final
+
+from src.python_modules.FileSystemWrapper.file_manager_protocol import (
+    FileManagerProtocol,
+)
+
+from src.domain import CompleteMessage, ConversationId, SearchResult
+from src.setup_logging import configure_logger
+from src.utils import remove_duplicates
+
+if TYPE_CHECKING:
+    from src.protocols import ChatRepositoryProtocol
+
+logger = configure_logger(__name__)
+
+TOKEN_PATTERN: Final = re.compile(r"\w+")
+SNAPSHOT_FILENAME = "snapshot.json"  # pragma: no mutate
+LOG_FILENAME = "log.jsonl"  # pragma: no mutate
+SEARCH_RESULTS_LIMIT = 10  # pragma: no mutate
+# Number of log entries that triggers writing a new snapshot when loading
+COMPACTION_THRESHOLD = 500  # pragma: no mutate
+SNIPPET_RADIUS = 60  # pragma: no mutate
+# BM25 parameters
+K1 = 1.2  # pragma: no mutate
+B = 0.75  # pragma: no mutate
+
+
+class SearchIndex:
+    """
+    Inverted index (term -> conversation -> frequency) over the message contents.
+    It is persisted in index_dir as a snapshot plus a log of updates appended on
+    every save, so saving does not rewrite the index. The log is replayed when the
+    index is first queried and merged into a new snapshot once it grows too much.
+    """
+
+    def __init__(self, file_manager: FileManagerProtocol, index_dir: PurePath):
+        self._file_manager = file_manager
+        self._snapshot_path = index_dir / SNAPSHOT_FILENAME
+        self._log_path = index_dir / LOG_FILENAME
+        self._is_loaded = False
+        self._postings: dict[str, dict[ConversationId, int]] = {}
+        self._terms: dict[ConversationId, Counter[str]] = {}
+        self._lengths: dict[ConversationId, int] = {}
+        self._total_length = 0
+
+    def has_snapshot(self) -> bool:
+        return self._file_manager.path_exists(self._snapshot_path)
+
+    def add_messages(
+        self,
+        conversation_id: ConversationId,
+        complete_messages: Sequence[CompleteMessage],
+        *,
+        replace: bool,
+    ) -> None:
+        """Indexes the messages, replacing or extending the conversation terms"""
+        terms = count_terms(complete_messages)
+        entry = {"id": conversation_id, "replace": replace, "terms": terms}
+        self._file_manager.append_file(self._log_path, json.dumps(entry) + "\n")
+        if self._is_loaded:
+            self._apply(conversation_id, terms, replace=replace)
+
+    def search(
+        self, query: str, limit: int = SEARCH_RESULTS_LIMIT
+    ) -> list[tuple[ConversationId, float]]:
+        """Returns the best (conversation id, BM25 score) pairs for the query"""
+        self._load()
+        if not self._lengths:
+            return []
+        number_of_conversations = len(self._lengths)
+        average_length = self._total_length / number_of_conversations or 1
+        scores: dict[ConversationId, float] = {}
+        for term in remove_duplicates(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(
+                1
+                + (number_of_conversations - len(postings) + 0.5)
+                / (len(postings) + 0.5)
+            )
+            for conversation_id, frequency in postings.items():
+                length_ratio = self._lengths[conversation_id] / average_length
+                weight = (frequency * (K1 + 1)) / (
+                    frequency + K1 * (1 - B + B * length_ratio)
+                )
+                scores[conversation_id] = scores.get(conversation_id, 0) + idf * weight
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    def replace_all(
+        self, documents: Iterable[tuple[ConversationId, Sequence[CompleteMessage]]]
+    ) -> None:
+        """Rebuilds the index from scratch and writes a new snapshot"""
+        self._clear()
+        for conversation_id, complete_messages in documents:
+            self._apply(conversation_id, count_terms(complete_messages), replace=True)
+        self._is_loaded = True
+        self._write_snapshot()
+
+    def _load(self) -> None:
+        if self._is_loaded:
+            return
+        self._clear()
+        if self.has_snapshot():
+            snapshot = json.loads(self._file_manager.read_file(self._snapshot_path))
+            for term, postings in snapshot["postings"].items():
+                for conversation_id, frequency in postings.items():
+                    self._apply(conversation_id, {term: frequency}, replace=False)
+        log_entries = 0
+        if self._file_manager.path_exists(self._log_path):
+            for line in self._file_manager.read_file(self._log_path).splitlines():
+                try:
+                    entry = json.loads(line)
+                    conversation_id, terms = entry["id"], entry["terms"]
+                    replace = entry["replace"]
+                except (ValueError, KeyError, TypeError):
+                    # a truncated entry, the rest of the log is still replayed
+                    logger.warning(f"Ignoring invalid search index entry: {line!r}")
+                    continue
+                self._apply(conversation_id, terms, replace=replace)
+                log_entries += 1
+        self._is_loaded = True
+        if log_entries > COMPACTION_THRESHOLD:
+            self._write_snapshot()
+
+    def _apply(
+        self, conversation_id: ConversationId, terms: dict[str, int], *, replace: bool
+    ) -> None:
+        if replace and conversation_id in self._terms:
+            for term in self._terms.pop(conversation_id):
+                del self._postings[term][conversation_id]
+            self._total_length -= self._lengths.pop(conversation_id)
+        conversation_terms = self._terms.setdefault(conversation_id, Counter())
+        for term, frequency in terms.items():
+            conversation_terms[term] += frequency
+            self._postings.setdefault(term, {})[conversation_id] = conversation_terms[
+                term
+            ]
+        added_length = sum(terms.values())
+        self._lengths[conversation_id] = (
+            self._lengths.get(conversation_id, 0) + added_length
+        )
+        self._total_length += added_length
+
+    def _clear(self) -> None:
+        self._postings = {}
+        self._terms = {}
+        self._lengths = {}
+        self._total_length = 0
+
+    def _write_snapshot(self) -> None:
+        postings = {term: ids for term, ids in self._postings.items() if ids}
+        self._file_manager.write_file(
+            self._snapshot_path, json.dumps({"postings": postings})
+        )
+        self._file_manager.write_file(self._log_path, "")
+
+
+def tokenize(text: str) -> list[str]:
+    return [token.casefold() for token in TOKEN_PATTERN.findall(text)]
+
+
+def count_terms(complete_messages: Sequence[CompleteMessage]) -> dict[str, int]:
+    terms: Counter[str] = Counter()
+    for complete_message in complete_messages:
+        terms.update(tokenize(complete_message.chat_msg.content))
+    return dict(terms)
+
+
+def create_snippet(complete_messages: Sequence[CompleteMessage], query: str) -> str:
+    """Returns the text around the first appearance of any term of the query"""
+    terms = set(tokenize(query))
+    for complete_message in complete_messages:
+        content = complete_message.chat_msg.content
+        for match in TOKEN_PATTERN.finditer(content):
+            if match.group().casefold() not in terms:
+                continue
+            start = max(0, match.start() - SNIPPET_RADIUS)
+            end = min(len(content), match.end() + SNIPPET_RADIUS)
+            snippet = " ".join(content[start:end].split())
+            prefix = "..." if start > 0 else ""
+            suffix = "..." if end < len(content) else ""
+            return prefix + snippet + suffix
+    return ""
+
+
+def rebuild_search_index(
+    search_index: SearchIndex, repository: "ChatRepositoryProtocol"
+) -> None:
+    """Indexes every stored conversation, one at a time"""
+    search_index.replace_all(
+        (conversation_id, repository.load_conversation(conversation_id))
+        for conversation_id in repository.get_conversation_ids()
+    )
+
+
+def search_conversations(
+    search_index: SearchIndex,
+    repository: "ChatRepositoryProtocol",
+    query: str,
+    limit: int = SEARCH_RESULTS_LIMIT,
+) -> list[SearchResult]:
+    """Ranks the conversations using the index, only the results are loaded"""
+    if not search_index.has_snapshot():
+        rebuild_search_index(search_index, repository)
+    return [
+        SearchResult(
+            conversation_id,
+            score,
+            create_snippet(repository.load_conversation(conversation_id), query),
+        )
+        for conversation_id, score in search_index.search(query, limit)
+    ]
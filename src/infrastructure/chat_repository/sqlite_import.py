@@ -0,0 +1,69 @@
+from dataclasses import replace
+
+from src.python_modules.FileSystemWrapper.file_manager import FileManager
+
+from src.infrastructure.main_path_provider import get_main_directory
+from src.infrastructure.now import TimeManager
+from src.serde import Conversation
+from src.serde.deserialize import deserialize_into_conversation_object
+from src.setup_logging import configure_logger
+
+from .repository import ChatRepository
+from .sqlite_repository import SqliteChatRepository
+
+logger = configure_logger(__name__)
+
+IMPORT_BATCH_SIZE = 500  # pragma: no mutate
+
+
+def import_chat_files(
+    chat_repository: ChatRepository,
+    sqlite_repository: SqliteChatRepository,
+    *,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> int:
+    """
+    Copies the .chat files into the database keeping their ids. Files are read one
+    by one and stored in transactions of batch_size conversations, so memory usage
+    does not depend on the size of the store. Returns the number of imported chats.
+    """
+    batch: list[Conversation] = []
+    imported = 0
+    for conversation_id in chat_repository.get_conversation_ids():
+        conversation_text = chat_repository.load_conversation_as_conversation_text(
+            conversation_id
+        )
+        if not conversation_text.text.strip():
+            # id claimed by a process that did not get to write the conversation
+            logger.warning(f"Skipping empty chat file {conversation_id}")
+            continue
+        conversation = deserialize_into_conversation_object(
+            conversation_text, preserve_model=True, check_model_exists=False
+        )
+        # the file name prevails over the id written inside the file
+        batch.append(replace(conversation, id=conversation_id))
+        if len(batch) >= batch_size:
+            sqlite_repository.import_conversations(batch)
+            imported += len(batch)
+            batch.clear()
+    sqlite_repository.import_conversations(batch)
+    return imported + len(batch)
+
+
+def main() -> None:
+    file_manager = FileManager()
+    time_manager = TimeManager()
+    chat_repository = ChatRepository(
+        get_main_directory(), file_manager=file_manager, time_manager=time_manager
+    )
+    sqlite_repository = SqliteChatRepository(
+        get_main_directory(), file_manager=file_manager, time_manager=time_manager
+    )
+    imported = import_chat_files(chat_repository, sqlite_repository)
+    sqlite_repository.close()
+    print(f"Se han importado {imported} conversaciones a la base de datos.")
+    print("Activa USE_SQLITE_CHATS_STORAGE en src/settings.py para usarla.")
+
+
+if __name__ == "__main__":
+    main()
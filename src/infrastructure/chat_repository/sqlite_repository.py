@@ -0,0 +1,271 @@
+import sqlite3
+import threading
+from collections.abc import Sequence
+from pathlib import PurePath
+from typing import TYPE_CHECKING, Final
+
+from src.python_modules.FileSystemWrapper.file_manager_protocol import (
+    FileManagerProtocol,
+)
+
+from src.domain import (
+    ChatMessage,
+    CompleteMessage,
+    ConversationId,
+    ConversationText,
+    Model,
+    ModelName,
+    Platform,
+    SearchResult,
+)
+from src.infrastructure.exceptions import ConversationNotFound
+from src.protocols import TimeManagerProtocol
+from src.serde import (
+    WIDE_NUMBER_OF_DIGITS,
+    Conversation,
+    ConversationHeader,
+    convert_digits_to_conversation_id,
+    serialize_conversation,
+)
+from src.serde.shared import SCHEMA_VERSION
+
+from .conversation_log import ConversationLog, SaveMode
+from .implementer import DataLocation
+from .search_index import (
+    SEARCH_RESULTS_LIMIT,
+    SearchIndex,
+    rebuild_search_index,
+    search_conversations,
+)
+
+SCHEMA: Final = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id INTEGER PRIMARY KEY,
+    time TEXT NOT NULL,
+    number_of_messages INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    conversation_id INTEGER NOT NULL REFERENCES conversations (id),
+    position INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    platform TEXT,
+    model_name TEXT,
+    PRIMARY KEY (conversation_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS conversations_time ON conversations (time);
+CREATE INDEX IF NOT EXISTS messages_role ON messages (role);
+CREATE INDEX IF NOT EXISTS messages_model_name ON messages (model_name);
+"""
+
+MessageRow = tuple[str, str, str | None, str | None]
+
+
+class SqliteChatRepository:
+    """
+    Stores conversations and messages in a SQLite database (WAL mode) instead of
+    one file per conversation. Each call to save_messages is one transaction.
+    """
+
+    def __init__(
+        self,
+        main_directory: PurePath,
+        *,
+        file_manager: FileManagerProtocol,
+        time_manager: TimeManagerProtocol,
+        save_mode: SaveMode = SaveMode.NEW_FILE_PER_TURN,
+    ) -> None:
+        data_location = DataLocation(main_directory)
+        file_manager.mkdir_if_not_exists(data_location.data_dir)
+        file_manager.mkdir_if_not_exists(data_location.sqlite_search_index_dir)
+        self._search_index = SearchIndex(
+            file_manager, data_location.sqlite_search_index_dir
+        )
+        self._time_manager = time_manager
+        self._save_mode = save_mode
+        self._conversation_log: ConversationLog | None = None
+        # the connection may be used from a background thread, one at a time
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            data_location.database_path, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def get_conversation_ids(self) -> list[ConversationId]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id FROM conversations ORDER BY id"
+            ).fetchall()
+        return [format_conversation_id(number) for (number,) in rows]
+
+    def save_messages(self, complete_messages: Sequence[CompleteMessage]) -> None:
+        log = self._conversation_log
+        if (
+            self._save_mode is SaveMode.APPEND
+            and log is not None
+            and log.is_continued_by(complete_messages)
+        ):
+            new_messages = log.get_unsaved_messages(complete_messages)
+            if not new_messages:
+                return
+            with self._lock, self._connection:
+                self._append_messages(
+                    int(log.conversation_id), len(log.saved_messages), new_messages
+                )
+            log.saved_messages.extend(new_messages)
+            self._search_index.add_messages(
+                log.conversation_id, new_messages, replace=False
+            )
+            return
+
+        current_time = self._time_manager.get_current_time()
+        with self._lock, self._connection:
+            number = self._insert_conversation(None, current_time, complete_messages)
+        conversation_id = format_conversation_id(number)
+        self._search_index.add_messages(
+            conversation_id, complete_messages, replace=True
+        )
+        if self._save_mode is SaveMode.APPEND:
+            self._conversation_log = ConversationLog(
+                conversation_id,
+                saved_messages=list(complete_messages),
+            )
+
+    def load_conversation(
+        self, conversation_id: ConversationId
+    ) -> list[CompleteMessage]:
+        with self._lock:
+            rows = self._select_messages(int(conversation_id))
+        if not rows:
+            # raises ConversationNotFound unless it is an empty conversation
+            self.read_conversation_header(conversation_id)
+        return [build_complete_message(row) for row in rows]
+
+    def load_conversation_as_conversation_text(
+        self, conversation_id: ConversationId
+    ) -> ConversationText:
+        header = self.read_conversation_header(conversation_id)
+        messages = self.load_conversation(conversation_id)
+        text = serialize_conversation(messages, header.id, header.current_time)
+        return ConversationText(text, SCHEMA_VERSION)
+
+    def read_conversation_header(
+        self, conversation_id: ConversationId
+    ) -> ConversationHeader:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT id, time, number_of_messages FROM conversations WHERE id = ?",
+                (int(conversation_id),),
+            ).fetchone()
+        if row is None:
+            raise ConversationNotFound(conversation_id)
+        number, current_time, number_of_messages = row
+        return ConversationHeader(
+            format_conversation_id(number),
+            SCHEMA_VERSION,
+            number_of_messages,
+            current_time,
+        )
+
+    def search_conversations(
+        self, query: str, limit: int = SEARCH_RESULTS_LIMIT
+    ) -> list[SearchResult]:
+        return search_conversations(self._search_index, self, query, limit)
+
+    def rebuild_search_index(self) -> None:
+        rebuild_search_index(self._search_index, self)
+
+    def import_conversations(self, conversations: Sequence[Conversation]) -> None:
+        """Stores already existing conversations keeping their ids, in one transaction"""
+        with self._lock, self._connection:
+            for conversation in conversations:
+                self._insert_conversation(
+                    int(conversation.id),
+                    conversation.current_time,
+                    conversation.messages,
+                )
+        for conversation in conversations:
+            self._search_index.add_messages(
+                format_conversation_id(int(conversation.id)),
+                conversation.messages,
+                replace=True,
+            )
+
+    def _insert_conversation(
+        self,
+        number: int | None,
+        current_time: str,
+        complete_messages: Sequence[CompleteMessage],
+    ) -> int:
+        cursor = self._connection.execute(
+            "INSERT INTO conversations (id, time, number_of_messages) VALUES (?, ?, ?)",
+            (number, current_time, len(complete_messages)),
+        )
+        assert cursor.lastrowid is not None
+        self._insert_messages(cursor.lastrowid, 0, complete_messages)
+        return cursor.lastrowid
+
+    def _append_messages(
+        self, number: int, start: int, complete_messages: Sequence[CompleteMessage]
+    ) -> None:
+        self._insert_messages(number, start, complete_messages)
+        self._connection.execute(
+            "UPDATE conversations SET number_of_messages = ? WHERE id = ?",
+            (start + len(complete_messages), number),
+        )
+
+    def _insert_messages(
+        self, number: int, start: int, complete_messages: Sequence[CompleteMessage]
+    ) -> None:
+        self._connection.executemany(
+            "INSERT INTO messages"
+            " (conversation_id, position, role, content, platform, model_name)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (number, position, *build_message_row(complete_message))
+                for position, complete_message in enumerate(complete_messages, start)
+            ),
+        )
+
+    def _select_messages(self, number: int) -> list[MessageRow]:
+        # range query over the primary key (conversation_id, position)
+        return self._connection.execute(
+            "SELECT role, content, platform, model_name FROM messages"
+            " WHERE conversation_id = ? ORDER BY position",
+            (number,),
+        ).fetchall()
+
+
+def format_conversation_id(number: int) -> ConversationId:
+    return convert_digits_to_conversation_id(
+        str(number), max_digits=WIDE_NUMBER_OF_DIGITS
+    )
+
+
+def build_message_row(complete_message: CompleteMessage) -> MessageRow:
+    message = complete_message.chat_msg
+    model = complete_message.model
+    platform = model.platform.value if model and model.platform else None
+    model_name = model.model_name if model else None
+    return (message.role, message.content, platform, model_name)
+
+
+def build_complete_message(row: MessageRow) -> CompleteMessage:
+    role, content, platform, model_name = row
+    model = None
+    if model_name is not None:
+        model = Model(Platform(platform) if platform else None, ModelName(model_name))
+    return CompleteMessage(ChatMessage(role, content), model)
+
+
+if TYPE_CHECKING:
+    from src.protocols import ChatRepositoryProtocol
+
+    repository: SqliteChatRepository
+    protocol: ChatRepositoryProtocol = repository  # pyright: ignore
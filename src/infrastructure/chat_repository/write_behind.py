@@ -0,0 +1,122 @@
+import queue
+import threading
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+from src.domain import (
+    CompleteMessage,
+    ConversationId,
+    ConversationText,
+    SearchResult,
+)
+from src.infrastructure.exceptions import DeferredWriteError
+from src.protocols import ChatRepositoryProtocol
+from src.serde.shared import ConversationHeader
+from src.setup_logging import configure_logger
+
+logger = configure_logger(__name__)
+
+# When this number of saves is pending, save_messages waits for the worker
+MAX_PENDING_WRITES = 16  # pragma: no mutate
+
+
+class WriteBehindChatRepository:
+    """
+    Wraps a chat repository so that save_messages returns immediately and the
+    writes are done in order by a worker thread. Reads wait for the pending
+    writes. A failed write is logged when it happens and raised as
+    DeferredWriteError by the next read, flush or close, never by save_messages,
+    so the answers still being saved and shown are not interrupted.
+    """
+
+    def __init__(
+        self,
+        repository: ChatRepositoryProtocol,
+        *,
+        max_pending_writes: int = MAX_PENDING_WRITES,
+    ) -> None:
+        self._repository = repository
+        self._pending: queue.Queue[tuple[CompleteMessage, ...] | None] = queue.Queue(
+            max_pending_writes
+        )
+        self._errors: list[Exception] = []
+        self._errors_lock = threading.Lock()
+        self._is_closed = False
+        self._worker = threading.Thread(
+            target=self._write_pending, name="chat-repository-writer", daemon=True
+        )
+        self._worker.start()
+
+    def save_messages(self, complete_messages: Sequence[CompleteMessage]) -> None:
+        """The messages are queued even if an earlier write failed"""
+        assert not self._is_closed
+        # the caller may keep modifying its list after this call
+        self._pending.put(tuple(complete_messages))
+
+    def flush(self) -> None:
+        """Waits until every pending write is done"""
+        self._pending.join()
+        self._raise_deferred_errors()
+
+    def close(self) -> None:
+        """Writes the pending messages, stops the worker and closes the repository"""
+        if self._is_closed:
+            return
+        self._is_closed = True
+        self._pending.put(None)
+        self._worker.join()
+        try:
+            self._raise_deferred_errors()
+        finally:
+            self._repository.close()
+
+    def get_conversation_ids(self) -> list[ConversationId]:
+        self.flush()
+        return self._repository.get_conversation_ids()
+
+    def load_conversation(
+        self, conversation_id: ConversationId
+    ) -> list[CompleteMessage]:
+        self.flush()
+        return self._repository.load_conversation(conversation_id)
+
+    def load_conversation_as_conversation_text(
+        self, conversation_id: ConversationId
+    ) -> ConversationText:
+        self.flush()
+        return self._repository.load_conversation_as_conversation_text(conversation_id)
+
+    def read_conversation_header(
+        self, conversation_id: ConversationId
+    ) -> ConversationHeader:
+        self.flush()
+        return self._repository.read_conversation_header(conversation_id)
+
+    def search_conversations(self, query: str) -> list[SearchResult]:
+        self.flush()
+        return self._repository.search_conversations(query)
+
+    def _write_pending(self) -> None:
+        while True:
+            complete_messages = self._pending.get()
+            try:
+                if complete_messages is None:
+                    return
+                self._repository.save_messages(complete_messages)
+            except Exception as err:
+                logger.exception("Deferred write of a conversation failed")
+                with self._errors_lock:
+                    self._errors.append(err)
+            finally:
+                self._pending.task_done()
+
+    def _raise_deferred_errors(self) -> None:
+        with self._errors_lock:
+            errors, self._errors = self._errors, []
+        if errors:
+            raise DeferredWriteError(len(errors), errors[-1]) from errors[-1]
+
+
+if TYPE_CHECKING:
+    repository: WriteBehindChatRepository
+    protocol: ChatRepositoryProtocol = repository  # pyright: ignore
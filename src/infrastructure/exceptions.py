@@ -15,8 +15,36 @@ class TooManyRequests(LLMChatException):
         super().__init__(f"Too many API requests: {total} in {seconds} seconds")
 
 
-class APIConnectionError(LLMChatException):
+class TransientAPIError(LLMChatException):
+    """Failure of an API call that may succeed if it is repeated"""
+
+    def __init__(self, reason: str, retry_after: float | None = None):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+class APIConnectionError(TransientAPIError):
     def __init__(self, api_name: str):
         super().__init__(
             f"Connection error with the {api_name} API. Please check your internet connection."
         )
+
+
+class APIStatusError(TransientAPIError):
+    def __init__(self, api_name: str, status_code: int, retry_after: float | None):
+        super().__init__(
+            f"The {api_name} API answered with the status {status_code}", retry_after
+        )
+        self.status_code = status_code
+
+
+class ConversationNotFound(LLMChatException):
+    def __init__(self, conversation_id: str):
+        super().__init__(f"Conversation {conversation_id} not found")
+
+
+class DeferredWriteError(LLMChatException):
+    def __init__(self, number_of_failures: int, last_error: Exception):
+        super().__init__(
+            f"{number_of_failures} deferred write(s) of conversations failed, last error: {last_error!r}"
+        )
@@ -1,3 +1,4 @@
+from .async_client_wrapper import AsyncClientWrapper
 from .client_wrapper import ClientWrapper
 
-__all__ = ["ClientWrapper"]
+__all__ = ["AsyncClientWrapper", "ClientWrapper"]
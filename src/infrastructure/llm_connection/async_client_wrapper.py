@@ -0,0 +1,155 @@
+from typing import TYPE_CHECKING, Any
+
+from src.domain import (
+    ChatMessage,
+    CompleteMessage,
+    Model,
+    Platform,
+    QueryResult,
+)
+from src.models.shared import extract_chat_messages
+from src.setup_logging import configure_logger
+
+from .client_wrapper import (
+    DEFAULT_GUARD_MAX_QUERIES,
+    DEFAULT_GUARD_PERIOD_SECONDS,
+    MISTRAL_ENDPOINT,
+    OPENAI_ENDPOINT,
+    build_query_result,
+    check_openai_options,
+    require_client,
+)
+from .rate_limiter import RateLimiter, RunawayGuard, estimate_tokens
+from .retry_policy import Retrier
+
+if TYPE_CHECKING:
+    from .mistral_client_wrapper import AsyncMistralClientWrapper
+    from .openai_client_wrapper import AsyncOpenAIClientWrapper
+
+logger = configure_logger(__name__)
+
+
+class AsyncClientWrapper:
+    """
+    Async version of ClientWrapper, many completions can be awaited at the same
+    time in one event loop. The clients must be closed with `close`.
+    """
+
+    def __init__(
+        self,
+        *,
+        mistral_api_key: str | None = None,
+        openai_api_key: str | None = None,
+        mistral_base_url: str | None = None,
+        openai_base_url: str | None = None,
+        rate_limiter: RateLimiter | None = None,
+        runaway_guard: RunawayGuard | None = None,
+        retrier: Retrier | None = None,
+    ):
+        # without a rate limiter the queries are not paced, `setup_engine` builds
+        # both from the settings
+        self._rate_limiter = rate_limiter or RateLimiter({})
+        self._runaway_guard = runaway_guard or RunawayGuard(
+            DEFAULT_GUARD_MAX_QUERIES, DEFAULT_GUARD_PERIOD_SECONDS
+        )
+        self._retrier = retrier or Retrier()
+        self._mistral_api_key = mistral_api_key
+        self._openai_api_key = openai_api_key
+        self._mistral_base_url = mistral_base_url or MISTRAL_ENDPOINT
+        self._openai_base_url = openai_base_url or OPENAI_ENDPOINT
+        # created on first use, like in ClientWrapper
+        self._mistralai_client_wrapper: "AsyncMistralClientWrapper | None" = None
+        self._openai_client_wrapper: "AsyncOpenAIClientWrapper | None" = None
+
+    async def get_simple_response(
+        self,
+        model: Model,
+        complete_messages: list[CompleteMessage],
+        *,
+        debug: bool = False,
+        tools: list[dict[str, Any]] | None = None,
+        tool_choice: str = "none",
+        random_seed: int | None = None,
+    ) -> QueryResult:
+        """
+        Retrieves a simple response from the LLM client.
+        """
+        messages: list[ChatMessage] = extract_chat_messages(complete_messages)
+        tokens = estimate_tokens(messages)
+
+        async def answer() -> ChatMessage:
+            await self._rate_limiter.acquire_async(model.platform, tokens)
+            # after pacing, so only the requests really sent are counted
+            self._runaway_guard.check()
+            return await self._answer(
+                model,
+                messages,
+                tools=tools,
+                tool_choice=tool_choice,
+                random_seed=random_seed,
+            )
+
+        chat_msg = await self._retrier.call_async(answer)
+        return build_query_result(model, complete_messages, chat_msg, debug=debug)
+
+    async def _answer(
+        self,
+        model: Model,
+        messages: list[ChatMessage],
+        *,
+        tools: list[dict[str, Any]] | None,
+        tool_choice: str,
+        random_seed: int | None,
+    ) -> ChatMessage:
+        if model.platform == Platform.OpenAI:
+            check_openai_options(random_seed)
+            openai_client_wrapper = self._get_openai_client_wrapper()
+            chat_msg = await openai_client_wrapper.answer(model, messages, tools=tools)
+
+        elif model.platform == Platform.Mistral:
+            mistralai_client_wrapper = self._get_mistralai_client_wrapper()
+            chat_msg = await mistralai_client_wrapper.answer(
+                model,
+                messages,
+                tools=tools,
+                tool_choice=tool_choice,
+                random_seed=random_seed,
+            )
+
+        else:
+            raise ValueError(f"Missing platform in model: {model}")
+
+        return chat_msg
+
+    def _get_mistralai_client_wrapper(self) -> "AsyncMistralClientWrapper":
+        if self._mistralai_client_wrapper is None:
+            api_key = require_client(self._mistral_api_key, "Mistral AI", "Mistral")
+            from .mistral_client_wrapper import AsyncMistralClientWrapper
+
+            self._mistralai_client_wrapper = AsyncMistralClientWrapper(
+                api_key, self._mistral_base_url
+            )
+        return self._mistralai_client_wrapper
+
+    def _get_openai_client_wrapper(self) -> "AsyncOpenAIClientWrapper":
+        if self._openai_client_wrapper is None:
+            api_key = require_client(self._openai_api_key, "OpenAI", "OpenAI")
+            from .openai_client_wrapper import AsyncOpenAIClientWrapper
+
+            self._openai_client_wrapper = AsyncOpenAIClientWrapper(
+                api_key, self._openai_base_url
+            )
+        return self._openai_client_wrapper
+
+    async def close(self) -> None:
+        if self._mistralai_client_wrapper:
+            await self._mistralai_client_wrapper.close()
+        if self._openai_client_wrapper:
+            await self._openai_client_wrapper.close()
+
+
+if TYPE_CHECKING:
+    from src.protocols import AsyncClientWrapperProtocol
+
+    client_wrapper: AsyncClientWrapper
+    protocol: AsyncClientWrapperProtocol = client_wrapper  # pyright: ignore
@@ -1,5 +1,6 @@
-import time
-from typing import TYPE_CHECKING, Any, Sequence
+import threading
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any, Sequence, TypeVar
 
 from src.domain import (
     ChatMessage,
@@ -8,45 +9,72 @@ from src.domain import (
     Platform,
     QueryResult,
 )
-from src.infrastructure.exceptions import (
-    ClientNotDefined,
-    LLMChatException,
-    TooManyRequests,
-)
+from src.infrastructure.exceptions import ClientNotDefined, LLMChatException
 from src.models.messages_ops import add_user_query_in_place
 from src.models.shared import extract_chat_messages
 from src.setup_logging import configure_logger
 
-from .mistral_client_wrapper import MistralClientWrapper
-from .openai_client_wrapper import OpenAIClientWrapper
-
-logger = configure_logger(__name__)
+from .rate_limiter import RateLimiter, RunawayGuard, estimate_tokens
+from .retry_policy import Retrier
 
+if TYPE_CHECKING:
+    from .mistral_client_wrapper import MistralClientWrapper
+    from .openai_client_wrapper import OpenAIClientWrapper
 
-prev_times: list[float] = []
+logger = configure_logger(__name__)
 
+ClientT = TypeVar("ClientT")
 
-def prevent_too_many_queries() -> None:
-    # debe fallar si se han hecho 10 consultas en menos de 20 segundos,
-    # para evitar llamadas a la API sin control debido a algun bug
-    prev_times.append(time.time())
-    if len(prev_times) >= 10:
-        if (seconds := (prev_times[-1] - prev_times[0])) < 20:
-            raise TooManyRequests(10, seconds)
-        prev_times.pop(0)
+MISTRAL_ENDPOINT = "https://api.mistral.ai"  # pragma: no mutate
+OPENAI_ENDPOINT = "https://api.openai.com/v1"  # pragma: no mutate
+# hard limit of the wrappers created without a runaway guard (the same one the
+# queries had before the rate limiter)
+DEFAULT_GUARD_MAX_QUERIES = 10  # pragma: no mutate
+DEFAULT_GUARD_PERIOD_SECONDS = 20  # pragma: no mutate
 
 
 class ClientWrapper:
 
     def __init__(
-        self, *, mistral_api_key: str | None = None, openai_api_key: str | None = None
+        self,
+        *,
+        mistral_api_key: str | None = None,
+        openai_api_key: str | None = None,
+        mistral_base_url: str | None = None,
+        openai_base_url: str | None = None,
+        rate_limiter: RateLimiter | None = None,
+        runaway_guard: RunawayGuard | None = None,
+        retrier: Retrier | None = None,
     ):
-        self._mistralai_client_wrapper = None
-        self._openai_client_wrapper = None
-        if mistral_api_key:
-            self._mistralai_client_wrapper = MistralClientWrapper(mistral_api_key)
-        if openai_api_key:
-            self._openai_client_wrapper = OpenAIClientWrapper(openai_api_key)
+        # without a rate limiter the queries are not paced, `setup_engine` builds
+        # both from the settings
+        self._rate_limiter = rate_limiter or RateLimiter({})
+        self._runaway_guard = runaway_guard or RunawayGuard(
+            DEFAULT_GUARD_MAX_QUERIES, DEFAULT_GUARD_PERIOD_SECONDS
+        )
+        self._retrier = retrier or Retrier()
+        self._mistral_api_key = mistral_api_key
+        self._openai_api_key = openai_api_key
+        # other urls serve e.g. compatible local servers
+        self._mistral_base_url = mistral_base_url or MISTRAL_ENDPOINT
+        self._openai_base_url = openai_base_url or OPENAI_ENDPOINT
+        # created on first use, so the SDK of a platform is only imported when
+        # one of its models is used
+        self._mistralai_client_wrapper: "MistralClientWrapper | None" = None
+        self._openai_client_wrapper: "OpenAIClientWrapper | None" = None
+        self._lock = threading.Lock()
+
+    def warm_up(self) -> None:
+        """
+        Opens in the background the connection to OpenAI, if it has api key. The
+        Mistral SDK does not use the shared connection pool, so it is not warmed up.
+        """
+        if not self._openai_api_key:
+            return
+        urls = [self._openai_base_url]
+        threading.Thread(
+            target=warm_up_connections, args=(urls,), name="warm-up", daemon=True
+        ).start()
 
     def get_simple_response_to_query(
         self,
@@ -83,42 +111,144 @@ class ClientWrapper:
         tools: list[dict[str, Any]] | None = None,
         tool_choice: str = "none",
         random_seed: int | None = None,
+        on_delta: Callable[[str], None] | None = None,
+        use_cache: bool = True,
     ) -> QueryResult:
         """
-        Retrieves a simple response from the LLM client.
+        Retrieves a simple response from the LLM client. If on_delta is given, the
+        response is streamed and on_delta receives every piece of its content.
+        use_cache has no effect here, see CachingClientWrapper.
         """
-        prevent_too_many_queries()
         # type annotated here for safety because MistralClient define messages type as list[Any]
         messages: list[ChatMessage] = extract_chat_messages(complete_messages)
+        tokens = estimate_tokens(messages)
+        delta_received = False
 
-        if model.platform == Platform.OpenAI:
-            if random_seed is not None:
-                raise LLMChatException(
-                    "Error: random_seed not currently supported with OpenAI API"
-                )
-            if not self._openai_client_wrapper:
-                raise ClientNotDefined("OpenAI", "OpenAI")
-            chat_msg = self._openai_client_wrapper.answer(model, messages, tools=tools)
+        def on_delta_received(delta: str) -> None:
+            nonlocal delta_received
+            delta_received = True
+            assert on_delta
+            on_delta(delta)
 
-        elif model.platform == Platform.Mistral:
-            if not self._mistralai_client_wrapper:
-                raise ClientNotDefined("Mistral AI", "Mistral")
-            chat_msg = self._mistralai_client_wrapper.answer(
+        def answer() -> ChatMessage:
+            self._rate_limiter.acquire(model.platform, tokens)
+            # after pacing, so only the requests really sent are counted
+            self._runaway_guard.check()
+            return self._answer(
                 model,
                 messages,
                 tools=tools,
                 tool_choice=tool_choice,
                 random_seed=random_seed,
+                on_delta=on_delta_received if on_delta else None,
             )
 
+        # a stream is not repeated once part of the answer has been shown
+        chat_msg = self._retrier.call(answer, can_retry=lambda: not delta_received)
+        return build_query_result(model, complete_messages, chat_msg, debug=debug)
+
+    def _answer(
+        self,
+        model: Model,
+        messages: list[ChatMessage],
+        *,
+        tools: list[dict[str, Any]] | None,
+        tool_choice: str,
+        random_seed: int | None,
+        on_delta: Callable[[str], None] | None,
+    ) -> ChatMessage:
+        if model.platform == Platform.OpenAI:
+            check_openai_options(random_seed)
+            openai_client_wrapper = self._get_openai_client_wrapper()
+            if on_delta:
+                chat_msg = openai_client_wrapper.answer_stream(
+                    model, messages, on_delta=on_delta, tools=tools
+                )
+            else:
+                chat_msg = openai_client_wrapper.answer(model, messages, tools=tools)
+
+        elif model.platform == Platform.Mistral:
+            mistralai_client_wrapper = self._get_mistralai_client_wrapper()
+            if on_delta:
+                chat_msg = mistralai_client_wrapper.answer_stream(
+                    model,
+                    messages,
+                    on_delta=on_delta,
+                    tools=tools,
+                    tool_choice=tool_choice,
+                    random_seed=random_seed,
+                )
+            else:
+                chat_msg = mistralai_client_wrapper.answer(
+                    model,
+                    messages,
+                    tools=tools,
+                    tool_choice=tool_choice,
+                    random_seed=random_seed,
+                )
+
         else:
             raise ValueError(f"Missing platform in model: {model}")
 
-        if debug:
-            print(f"{chat_msg=}")
-            breakpoint()
-        complete_messages.append(CompleteMessage(chat_msg, model))
-        return QueryResult(chat_msg.content, complete_messages)
+        return chat_msg
+
+    def _get_mistralai_client_wrapper(self) -> "MistralClientWrapper":
+        with self._lock:
+            if self._mistralai_client_wrapper is None:
+                api_key = require_client(self._mistral_api_key, "Mistral AI", "Mistral")
+                from .mistral_client_wrapper import MistralClientWrapper
+
+                self._mistralai_client_wrapper = MistralClientWrapper(
+                    api_key, self._mistral_base_url
+                )
+            return self._mistralai_client_wrapper
+
+    def _get_openai_client_wrapper(self) -> "OpenAIClientWrapper":
+        with self._lock:
+            if self._openai_client_wrapper is None:
+                api_key = require_client(self._openai_api_key, "OpenAI", "OpenAI")
+                from .openai_client_wrapper import OpenAIClientWrapper
+
+                self._openai_client_wrapper = OpenAIClientWrapper(
+                    api_key, self._openai_base_url
+                )
+            return self._openai_client_wrapper
+
+
+def warm_up_connections(urls: list[str]) -> None:
+    # httpx is also imported in the background
+    from .http_transport import open_connections
+
+    open_connections(urls)
+
+
+def check_openai_options(random_seed: int | None) -> None:
+    if random_seed is not None:
+        raise LLMChatException(
+            "Error: random_seed not currently supported with OpenAI API"
+        )
+
+
+def require_client(
+    client_wrapper: ClientT | None, client_name: str, api_name: str
+) -> ClientT:
+    if not client_wrapper:
+        raise ClientNotDefined(client_name, api_name)
+    return client_wrapper
+
+
+def build_query_result(
+    model: Model,
+    complete_messages: list[CompleteMessage],
+    chat_msg: ChatMessage,
+    *,
+    debug: bool = False,
+) -> QueryResult:
+    if debug:
+        print(f"{chat_msg=}")
+        breakpoint()
+    complete_messages.append(CompleteMessage(chat_msg, model))
+    return QueryResult(chat_msg.content, complete_messages)
 
 
 if TYPE_CHECKING:
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, replace
+from enum import Enum
+from pathlib import PurePath
+from typing import TYPE_CHECKING, Any
+
+from src.python_modules.FileSystemWrapper.file_manager_protocol import (
+    FileManagerProtocol,
+)
+
+from src.domain import ChatMessage, CompleteMessage, Model, QueryResult
+from src.models.shared import extract_chat_messages
+from src.protocols import ClientWrapperProtocol
+from src.setup_logging import configure_logger
+
+from .client_wrapper import build_query_result
+
+logger = configure_logger(__name__)
+
+# changing it invalidates every stored answer
+CACHE_KEY_VERSION = 1  # pragma: no mutate
+CACHE_ENTRY_EXT = "json"  # pragma: no mutate
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600  # pragma: no mutate
+DEFAULT_MAX_SIZE = 50 * 1024 * 1024  # pragma: no mutate
+
+
+class CompletionCache:
+    """
+    Stores the answers of the models in cache_dir, one JSON file per key. The
+    entries expire after ttl_seconds and the oldest ones are removed when the
+    total size of the entries exceeds max_size bytes.
+    """
+
+    def __init__(
+        self,
+        file_manager: FileManagerProtocol,
+        cache_dir: PurePath,
+        *,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_size: int = DEFAULT_MAX_SIZE,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._file_manager = file_manager
+        self._cache_dir = cache_dir
+        self._ttl_seconds = ttl_seconds
+        self._max_size = max_size
+        self._clock = clock
+        # the concurrent queries of a /for share the cache
+        self._lock = threading.Lock()
+        self._size: int | None = None
+        self._file_manager.mkdir_if_not_exists(cache_dir)
+
+    def get(self, key: str) -> ChatMessage | None:
+        path = self._build_entry_path(key)
+        if not self._file_manager.path_exists(path):
+            return None
+        try:
+            entry = json.loads(self._file_manager.read_file(path))
+            if self._clock() - entry["created"] > self._ttl_seconds:
+                self._remove(path)
+                return None
+            return ChatMessage(
+                entry["role"], entry["content"], tool_calls=entry["tool_calls"]
+            )
+        except (OSError, ValueError, KeyError):
+            logger.warning(f"Ignoring invalid completion cache entry {key}")
+            return None
+
+    def put(self, key: str, chat_msg: ChatMessage) -> None:
+        entry = {
+            "created": self._clock(),
+            "role": chat_msg.role,
+            "content": chat_msg.content,
+            "tool_calls": chat_msg.tool_calls,
+        }
+        text = json.dumps(entry, default=encode_json_value)
+        path = self._build_entry_path(key)
+        # written apart and renamed, a concurrent reader never sees half an entry
+        temporary_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        self._file_manager.write_file(temporary_path, text)
+        with self._lock:
+            size = self._get_size()
+            if self._file_manager.path_exists(path):
+                size -= self._file_manager.get_file_stats(path).size
+            self._file_manager.rename_path(temporary_path, path)
+            self._size = size + self._file_manager.get_file_stats(path).size
+            if self._size > self._max_size:
+                self._evict_oldest_entries()
+
+    def _build_entry_path(self, key: str) -> PurePath:
+        return self._cache_dir / f"{key}.{CACHE_ENTRY_EXT}"
+
+    def _get_entry_paths(self) -> list[PurePath]:
+        return [
+            path
+            for path in self._file_manager.get_children(self._cache_dir)
+            if path.suffix == f".{CACHE_ENTRY_EXT}"
+        ]
+
+    def _get_size(self) -> int:
+        if self._size is None:
+            self._size = sum(
+                self._file_manager.get_file_stats(path).size
+                for path in self._get_entry_paths()
+            )
+        return self._size
+
+    def _evict_oldest_entries(self) -> None:
+        stats = {
+            path: self._file_manager.get_file_stats(path)
+            for path in self._get_entry_paths()
+        }
+        self._size = sum(file_stats.size for file_stats in stats.values())
+        for path in sorted(stats, key=lambda path: stats[path].mtime):
+            if self._size <= self._max_size:
+                break
+            self._file_manager.unlink_path(path)
+            self._size -= stats[path].size
+
+    def _remove(self, path: PurePath) -> None:
+        with self._lock:
+            if self._file_manager.path_exists(path):
+                size = self._file_manager.get_file_stats(path).size
+                self._file_manager.unlink_path(path)
+                if self._size is not None:
+                    self._size -= size
+
+
+class CachingClientWrapper:
+    """
+    Returns the stored answer when the same messages were already sent to the
+    same model with the same options. Queries with use_cache=False are always
+    sent to the model, and their answers are stored.
+    """
+
+    def __init__(self, client_wrapper: ClientWrapperProtocol, cache: CompletionCache):
+        self._client_wrapper = client_wrapper
+        self._cache = cache
+
+    def warm_up(self) -> None:
+        self._client_wrapper.warm_up()
+
+    def get_simple_response(
+        self,
+        model: Model,
+        complete_messages: list[CompleteMessage],
+        *,
+        debug: bool = False,
+        tools: list[dict[str, Any]] | None = None,
+        tool_choice: str = "none",
+        random_seed: int | None = None,
+        on_delta: Callable[[str], None] | None = None,
+        use_cache: bool = True,
+    ) -> QueryResult:
+        key = build_cache_key(
+            model,
+            extract_chat_messages(complete_messages),
+            tools=tools,
+            tool_choice=tool_choice,
+            random_seed=random_seed,
+        )
+        if use_cache and (chat_msg := self._cache.get(key)) is not None:
+            logger.info(f"Completion cache hit: {key}")
+            if on_delta and chat_msg.content:
+                on_delta(chat_msg.content)
+            query_result = build_query_result(
+                model, complete_messages, chat_msg, debug=debug
+            )
+            return replace(query_result, from_cache=True)
+        query_result = self._client_wrapper.get_simple_response(
+            model,
+            complete_messages,
+            debug=debug,
+            tools=tools,
+            tool_choice=tool_choice,
+            random_seed=random_seed,
+            on_delta=on_delta,
+            use_cache=use_cache,
+        )
+        self._cache.put(key, query_result.messages[-1].chat_msg)
+        return query_result
+
+
+def build_cache_key(
+    model: Model,
+    messages: Sequence[ChatMessage],
+    *,
+    tools: list[dict[str, Any]] | None,
+    tool_choice: str,
+    random_seed: int | None,
+) -> str:
+    """Stable hash of everything that determines the answer of the model"""
+    payload = {
+        "version": CACHE_KEY_VERSION,
+        "model": asdict(model),
+        "messages": [asdict(message) for message in messages],
+        "tools": tools,
+        "tool_choice": tool_choice,
+        "random_seed": random_seed,
+    }
+    text = json.dumps(
+        payload, sort_keys=True, ensure_ascii=False, default=encode_json_value
+    )
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def encode_json_value(value: object) -> object:
+    """Encodes the SDK objects (tool calls) and enums found in the messages"""
+    if isinstance(value, Enum):
+        return value.value
+    model_dump = getattr(value, "model_dump", None)
+    if callable(model_dump):
+        return model_dump(mode="json")
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+if TYPE_CHECKING:
+    client_wrapper: CachingClientWrapper
+    protocol: ClientWrapperProtocol = client_wrapper  # pyright: ignore
@@ -0,0 +1,78 @@
+import importlib.util
+import threading
+from collections.abc import Iterable
+
+import httpx
+
+from src.setup_logging import configure_logger
+
+logger = configure_logger(__name__)
+
+HTTP_TIMEOUT_SECONDS = 120  # pragma: no mutate
+MAX_CONNECTIONS = 20  # pragma: no mutate
+# long enough to keep the connections opened by the warm-up while the user
+# chooses the model and writes the first query
+KEEPALIVE_EXPIRY_SECONDS = 120  # pragma: no mutate
+WARM_UP_TIMEOUT_SECONDS = 10  # pragma: no mutate
+
+_shared_transport: "SharedHTTPTransport | None" = None
+_shared_transport_lock = threading.Lock()
+
+
+class SharedHTTPTransport(httpx.HTTPTransport):
+    """
+    Connection pool shared by the HTTP clients created with create_http_client,
+    those of the synchronous OpenAI SDK and of the warm-up. Closing a client
+    does not close the pool, so a client wrapper created later reuses the
+    connections that are still open.
+    """
+
+    def close(self) -> None:
+        pass
+
+    def close_pool(self) -> None:
+        super().close()
+
+
+def get_shared_transport() -> SharedHTTPTransport:
+    global _shared_transport
+    with _shared_transport_lock:
+        if _shared_transport is None:
+            http2 = is_http2_available()
+            logger.info(f"Creating shared HTTP transport, {http2=}")
+            _shared_transport = SharedHTTPTransport(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+                ),
+            )
+        return _shared_transport
+
+
+def create_http_client() -> httpx.Client:
+    """Client with the settings used by the SDKs, on the shared transport"""
+    return httpx.Client(
+        transport=get_shared_transport(),
+        timeout=HTTP_TIMEOUT_SECONDS,
+        follow_redirects=True,
+    )
+
+
+def is_http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (`pip install httpx[http2]`)"""
+    return importlib.util.find_spec("h2") is not None
+
+
+def open_connections(urls: Iterable[str]) -> None:
+    """
+    Opens connections to the APIs that stay in the pool, so the first query
+    does not wait for the TCP and TLS handshakes. Failures are only logged.
+    """
+    with create_http_client() as http_client:
+        for url in urls:
+            try:
+                http_client.head(url, timeout=WARM_UP_TIMEOUT_SECONDS)
+                logger.info(f"Connection to {url} warmed up")
+            except httpx.HTTPError as err:
+                logger.warning(f"Warm-up of {url} failed: {err!r}")
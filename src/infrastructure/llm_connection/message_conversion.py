@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from itertools import compress, count
+from operator import is_not
+from typing import Generic, TypeVar
+
+from src.domain import ChatMessage
+
+T = TypeVar("T")
+
+# enough for the history of several long conversations
+DEFAULT_MAX_MESSAGES = 2048  # pragma: no mutate
+
+
+class ConvertedMessagesCache(Generic[T]):
+    """
+    Keeps the provider messages already converted, so in every turn only the new
+    messages of the conversation are converted. The messages are identified by
+    identity: ChatMessage is frozen, and the cache keeps a reference to every
+    message, so its id is not reused while it is cached.
+
+    The history of the last conversation is compared message by message, so a
+    message replaced anywhere (e.g. a tool output dropped from the context) is
+    converted again. The messages that follow the common prefix are looked up one
+    by one and the least recently used are discarded.
+    """
+
+    def __init__(
+        self,
+        convert: Callable[[ChatMessage], T],
+        max_messages: int = DEFAULT_MAX_MESSAGES,
+    ):
+        self._convert = convert
+        self._max_messages = max_messages
+        self._entries: OrderedDict[int, tuple[ChatMessage, T]] = OrderedDict()
+        self._last_messages: list[ChatMessage] = []
+        self._last_converted: list[T] = []
+        self._lock = threading.Lock()
+        self.conversions = 0
+
+    def convert(self, messages: Sequence[ChatMessage]) -> list[T]:
+        """Returns a new list, the cache keeps its own"""
+        with self._lock:
+            prefix_length = find_common_prefix_length(messages, self._last_messages)
+            converted_messages = self._last_converted[:prefix_length]
+            for msg in messages[prefix_length:]:
+                converted_messages.append(self._get_converted(msg))
+            while len(self._entries) > self._max_messages:
+                self._entries.popitem(last=False)
+            self._last_messages = list(messages)
+            self._last_converted = converted_messages
+            return list(converted_messages)
+
+    def _get_converted(self, msg: ChatMessage) -> T:
+        entry = self._entries.get(id(msg))
+        if entry is not None and entry[0] is msg:
+            self._entries.move_to_end(id(msg))
+        else:
+            entry = msg, self._convert(msg)
+            self._entries[id(msg)] = entry
+            self.conversions += 1
+        return entry[1]
+
+
+def find_common_prefix_length(
+    first: Sequence[ChatMessage], second: Sequence[ChatMessage]
+) -> int:
+    """Number of initial messages that are the same objects in both sequences"""
+    return next(
+        compress(count(), map(is_not, first, second)), min(len(first), len(second))
+    )
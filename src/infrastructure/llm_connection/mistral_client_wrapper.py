@@ -1,19 +1,36 @@
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
 from typing import Any, Sequence, cast
 
+from mistralai.async_client import MistralAsyncClient
 from mistralai.client import MistralClient
-from mistralai.exceptions import MistralConnectionException
+from mistralai.constants import ENDPOINT
+from mistralai.exceptions import MistralAPIException, MistralConnectionException
+from mistralai.models.chat_completion import (
+    ChatCompletionResponse,
+    ChatCompletionStreamResponse,
+)
 from mistralai.models.chat_completion import ChatMessage as MistralChatMessage
+from mistralai.models.chat_completion import ToolCall
 
 from src.domain import ChatMessage, Model, Platform
-from src.infrastructure.exceptions import APIConnectionError
+from src.infrastructure.exceptions import APIConnectionError, APIStatusError
 from src.setup_logging import configure_logger, format_var
 
+from .message_conversion import ConvertedMessagesCache
+from .retry_policy import RETRY_STATUS_CODES, parse_retry_after
+
 logger = configure_logger(__name__)
 
 
 class MistralClientWrapper:
-    def __init__(self, api_key: str | None = None):
-        self._mistralai_client = MistralClient(api_key=api_key)
+    def __init__(self, api_key: str | None = None, endpoint: str = ENDPOINT):
+        # this version of the SDK does not accept an HTTP client, so it keeps
+        # its own connection pool
+        self._mistralai_client = MistralClient(
+            api_key=api_key, endpoint=endpoint, max_retries=0
+        )
+        self._converted_messages = ConvertedMessagesCache(convert_to_mistral_msg)
 
     def answer(
         self,
@@ -26,17 +43,9 @@ class MistralClientWrapper:
     ) -> ChatMessage:
         assert model.platform == Platform.Mistral
 
-        mistral_messages = [
-            MistralChatMessage(
-                role=msg.role,
-                content=msg.content,
-                name=msg.name,
-                tool_calls=cast(Any, msg.tool_calls),
-            )
-            for msg in messages
-        ]
+        mistral_messages = self._converted_messages.convert(messages)
         logger.info(f"{tool_choice=}")
-        try:
+        with translate_mistral_errors():
             chat_response = self._mistralai_client.chat(
                 model=model.model_name,
                 messages=mistral_messages,
@@ -44,17 +53,122 @@ class MistralClientWrapper:
                 tool_choice=tool_choice,
                 random_seed=random_seed,
             )
-        except MistralConnectionException:
-            raise APIConnectionError("Mistral") from None
-        choices = chat_response.choices
-        assert len(choices) == 1
-        mistral_chat_msg = choices[0].message
-        assert isinstance(mistral_chat_msg.content, str)
-
-        logger.info(format_var("mistral_chat_msg", mistral_chat_msg))
-
-        return ChatMessage(
-            mistral_chat_msg.role,
-            mistral_chat_msg.content,
-            tool_calls=mistral_chat_msg.tool_calls,
+        return convert_from_mistral_response(chat_response)
+
+    def answer_stream(
+        self,
+        model: Model,
+        messages: Sequence[ChatMessage],
+        *,
+        on_delta: Callable[[str], None],
+        tools: list[dict[str, Any]] | None = None,
+        tool_choice: str = "none",
+        random_seed: int | None = None,
+    ) -> ChatMessage:
+        """Like answer, but on_delta receives every piece of content as it arrives"""
+        assert model.platform == Platform.Mistral
+
+        mistral_messages = self._converted_messages.convert(messages)
+        logger.info(f"{tool_choice=}")
+        with translate_mistral_errors():
+            chunks = self._mistralai_client.chat_stream(
+                model=model.model_name,
+                messages=mistral_messages,
+                tools=tools,
+                tool_choice=tool_choice,
+                random_seed=random_seed,
+            )
+            return assemble_mistral_stream(chunks, on_delta)
+
+
+class AsyncMistralClientWrapper:
+    def __init__(self, api_key: str | None = None, endpoint: str = ENDPOINT):
+        self._mistralai_client = MistralAsyncClient(
+            api_key=api_key, endpoint=endpoint, max_retries=0
         )
+        self._converted_messages = ConvertedMessagesCache(convert_to_mistral_msg)
+
+    async def answer(
+        self,
+        model: Model,
+        messages: Sequence[ChatMessage],
+        *,
+        tools: list[dict[str, Any]] | None = None,
+        tool_choice: str = "none",
+        random_seed: int | None = None,
+    ) -> ChatMessage:
+        assert model.platform == Platform.Mistral
+
+        mistral_messages = self._converted_messages.convert(messages)
+        logger.info(f"{tool_choice=}")
+        with translate_mistral_errors():
+            chat_response = await self._mistralai_client.chat(
+                model=model.model_name,
+                messages=mistral_messages,
+                tools=tools,
+                tool_choice=tool_choice,
+                random_seed=random_seed,
+            )
+        return convert_from_mistral_response(chat_response)
+
+    async def close(self) -> None:
+        await self._mistralai_client.close()
+
+
+@contextmanager
+def translate_mistral_errors() -> Iterator[None]:
+    try:
+        yield
+    except MistralConnectionException:
+        raise APIConnectionError("Mistral") from None
+    except MistralAPIException as err:
+        if err.http_status not in RETRY_STATUS_CODES:
+            raise
+        retry_after = parse_retry_after(err.headers)
+        raise APIStatusError("Mistral", err.http_status, retry_after) from err
+
+
+def convert_to_mistral_msg(msg: ChatMessage) -> MistralChatMessage:
+    return MistralChatMessage(
+        role=msg.role,
+        content=msg.content,
+        name=msg.name,
+        tool_calls=cast(Any, msg.tool_calls),
+    )
+
+
+def convert_from_mistral_response(chat_response: ChatCompletionResponse) -> ChatMessage:
+    choices = chat_response.choices
+    assert len(choices) == 1
+    mistral_chat_msg = choices[0].message
+    assert isinstance(mistral_chat_msg.content, str)
+
+    logger.debug(format_var("mistral_chat_msg", mistral_chat_msg))
+
+    return ChatMessage(
+        mistral_chat_msg.role,
+        mistral_chat_msg.content,
+        tool_calls=mistral_chat_msg.tool_calls,
+    )
+
+
+def assemble_mistral_stream(
+    chunks: Iterable[ChatCompletionStreamResponse], on_delta: Callable[[str], None]
+) -> ChatMessage:
+    """Builds the complete message, the tool calls arrive complete in some chunk"""
+    role = "assistant"
+    content_parts: list[str] = []
+    tool_calls: list[ToolCall] = []
+    for chunk in chunks:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if delta.role:
+            role = delta.role
+        if delta.content:
+            content_parts.append(delta.content)
+            on_delta(delta.content)
+        tool_calls.extend(delta.tool_calls or [])
+    chat_msg = ChatMessage(role, "".join(content_parts), tool_calls=tool_calls or None)
+    logger.debug(format_var("mistral_chat_msg", chat_msg))
+    return chat_msg
@@ -1,18 +1,37 @@
-from collections.abc import Mapping
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
 from types import NoneType
 from typing import Any, Iterable, Sequence, cast
 
-from openai import OpenAI
+import openai
+from openai import AsyncOpenAI, OpenAI
+from openai.types.chat import (
+    ChatCompletion,
+    ChatCompletionChunk,
+    ChatCompletionMessageToolCall,
+)
+from openai.types.chat.chat_completion_message_tool_call import Function
 
 from src.domain import ChatMessage, Model
+from src.infrastructure.exceptions import APIConnectionError, APIStatusError
 from src.setup_logging import configure_logger, format_var
 
+from .http_transport import create_http_client
+from .message_conversion import ConvertedMessagesCache
+from .retry_policy import RETRY_STATUS_CODES, parse_retry_after
+
 logger = configure_logger(__name__)
 
 
 class OpenAIClientWrapper:
-    def __init__(self, api_key: str):
-        self._openai_client = OpenAI(api_key=api_key)
+    def __init__(self, api_key: str, base_url: str | None = None):
+        self._openai_client = OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,
+            http_client=create_http_client(),
+        )
+        self._converted_messages = ConvertedMessagesCache(convert_to_openai_msg)
 
     def answer(
         self,
@@ -22,25 +41,90 @@ class OpenAIClientWrapper:
         tools: list[dict[str, Any]] | None = None,
     ) -> ChatMessage:
         logger.info(f"{model=}")
-        logger.info(f"{tools=}")
+        logger.debug(format_var("tools", tools))
+
+        openai_messages = self._converted_messages.convert(messages)
 
-        openai_messages = [convert_to_openai_msg(msg) for msg in messages]
+        logger.debug(format_var("openai_messages", openai_messages))
 
-        logger.info(format_var("openai_messages", openai_messages))
+        with translate_openai_errors():
+            openai_chat_completion = self._openai_client.chat.completions.create(
+                messages=cast_openai_messages(openai_messages),
+                model=model.model_name,
+                tools=cast(Any, tools),
+            )
+        return convert_from_openai_completion(openai_chat_completion)
 
-        openai_chat_completion = self._openai_client.chat.completions.create(
-            messages=cast_openai_messages(openai_messages),
-            model=model.model_name,
-            tools=cast(Any, tools),
+    def answer_stream(
+        self,
+        model: Model,
+        messages: Sequence[ChatMessage],
+        *,
+        on_delta: Callable[[str], None],
+        tools: list[dict[str, Any]] | None = None,
+    ) -> ChatMessage:
+        """Like answer, but on_delta receives every piece of content as it arrives"""
+        logger.info(f"{model=}")
+        logger.debug(format_var("tools", tools))
+
+        openai_messages = self._converted_messages.convert(messages)
+
+        logger.debug(format_var("openai_messages", openai_messages))
+
+        with translate_openai_errors():
+            chunks = self._openai_client.chat.completions.create(
+                messages=cast_openai_messages(openai_messages),
+                model=model.model_name,
+                tools=cast(Any, tools),
+                stream=True,
+            )
+            return assemble_openai_stream(chunks, on_delta)
+
+
+class AsyncOpenAIClientWrapper:
+    def __init__(self, api_key: str, base_url: str | None = None):
+        self._openai_client = AsyncOpenAI(
+            api_key=api_key, base_url=base_url, max_retries=0
         )
-        openai_chat_msg = openai_chat_completion.choices[0].message
+        self._converted_messages = ConvertedMessagesCache(convert_to_openai_msg)
+
+    async def answer(
+        self,
+        model: Model,
+        messages: Sequence[ChatMessage],
+        *,
+        tools: list[dict[str, Any]] | None = None,
+    ) -> ChatMessage:
+        logger.info(f"{model=}")
+        logger.debug(format_var("tools", tools))
+
+        openai_messages = self._converted_messages.convert(messages)
+
+        logger.debug(format_var("openai_messages", openai_messages))
+
+        with translate_openai_errors():
+            openai_chat_completion = await self._openai_client.chat.completions.create(
+                messages=cast_openai_messages(openai_messages),
+                model=model.model_name,
+                tools=cast(Any, tools),
+            )
+        return convert_from_openai_completion(openai_chat_completion)
 
-        logger.info(format_var("openai_chat_msg", openai_chat_msg))
+    async def close(self) -> None:
+        await self._openai_client.close()
 
-        assert isinstance(openai_chat_msg.content, (str, NoneType))
-        content = openai_chat_msg.content
-        role = openai_chat_msg.role
-        return ChatMessage(role, content or "", tool_calls=openai_chat_msg.tool_calls)
+
+@contextmanager
+def translate_openai_errors() -> Iterator[None]:
+    try:
+        yield
+    except openai.APIConnectionError:
+        raise APIConnectionError("OpenAI") from None
+    except openai.APIStatusError as err:
+        if err.status_code not in RETRY_STATUS_CODES:
+            raise
+        retry_after = parse_retry_after(err.response.headers)
+        raise APIStatusError("OpenAI", err.status_code, retry_after) from err
 
 
 def convert_to_openai_msg(msg: ChatMessage) -> Mapping[str, object]:
@@ -57,5 +141,52 @@ def convert_to_openai_msg(msg: ChatMessage) -> Mapping[str, object]:
     return openai_msg
 
 
+def convert_from_openai_completion(
+    openai_chat_completion: ChatCompletion,
+) -> ChatMessage:
+    openai_chat_msg = openai_chat_completion.choices[0].message
+
+    logger.debug(format_var("openai_chat_msg", openai_chat_msg))
+
+    assert isinstance(openai_chat_msg.content, (str, NoneType))
+    content = openai_chat_msg.content
+    role = openai_chat_msg.role
+    return ChatMessage(role, content or "", tool_calls=openai_chat_msg.tool_calls)
+
+
+def assemble_openai_stream(
+    chunks: Iterable[ChatCompletionChunk], on_delta: Callable[[str], None]
+) -> ChatMessage:
+    """Builds the complete message, the tool calls are streamed in fragments"""
+    role = "assistant"
+    content_parts: list[str] = []
+    # tool call index -> [id, name, arguments]
+    tool_call_parts: dict[int, list[str]] = {}
+    for chunk in chunks:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if delta.role:
+            role = delta.role
+        if delta.content:
+            content_parts.append(delta.content)
+            on_delta(delta.content)
+        for tool_call_delta in delta.tool_calls or []:
+            parts = tool_call_parts.setdefault(tool_call_delta.index, ["", "", ""])
+            parts[0] += tool_call_delta.id or ""
+            if function := tool_call_delta.function:
+                parts[1] += function.name or ""
+                parts[2] += function.arguments or ""
+    tool_calls = [
+        ChatCompletionMessageToolCall(
+            id=id_, type="function", function=Function(name=name, arguments=arguments)
+        )
+        for _, (id_, name, arguments) in sorted(tool_call_parts.items())
+    ]
+    chat_msg = ChatMessage(role, "".join(content_parts), tool_calls=tool_calls or None)
+    logger.debug(format_var("openai_chat_msg", chat_msg))
+    return chat_msg
+
+
 def cast_openai_messages(openai_messages: list[Mapping[str, object]]) -> Iterable[Any]:
     return cast(Iterable[Any], openai_messages)
@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from dataclasses import dataclass
+
+from src.domain import ChatMessage, Platform
+from src.infrastructure.exceptions import TooManyRequests
+from src.models.context_window import estimate_message_tokens
+from src.setup_logging import configure_logger
+
+logger = configure_logger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimits:
+    requests_per_minute: float
+    tokens_per_minute: float
+
+
+class TokenBucket:
+    """
+    Holds up to capacity tokens, refilled continuously. Tokens can be taken in
+    advance: the bucket goes into debt and the next callers wait longer.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float, now: float):
+        self._capacity = capacity
+        self._refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Takes amount tokens and returns the seconds to wait until they are available"""
+        elapsed = now - self._updated
+        self._tokens = min(
+            self._capacity, self._tokens + elapsed * self._refill_per_second
+        )
+        self._updated = now
+        self._tokens -= amount
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self._refill_per_second
+
+
+class RateLimiter:
+    """
+    Paces the requests sent to each platform with a bucket of requests and a
+    bucket of tokens per minute. The callers wait instead of failing, and they are
+    served in the order they arrive: every caller reserves its share before
+    waiting, so a later caller never overtakes an earlier one.
+    Platforms without limits are not paced.
+    """
+
+    def __init__(
+        self,
+        limits: Mapping[Platform, RateLimits],
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        async_sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self._limits = dict(limits)
+        self._clock = clock
+        self._sleep = sleep
+        self._async_sleep = async_sleep
+        self._lock = threading.Lock()
+        now = clock()
+        self._buckets = {
+            platform: (
+                TokenBucket(
+                    platform_limits.requests_per_minute,
+                    platform_limits.requests_per_minute / 60,
+                    now,
+                ),
+                TokenBucket(
+                    platform_limits.tokens_per_minute,
+                    platform_limits.tokens_per_minute / 60,
+                    now,
+                ),
+            )
+            for platform, platform_limits in limits.items()
+        }
+
+    def max_requests(self, period_seconds: float) -> float:
+        """Most requests let through in any period, including the initial burst"""
+        return sum(
+            platform_limits.requests_per_minute * (1 + period_seconds / 60)
+            for platform_limits in self._limits.values()
+        )
+
+    def reserve(self, platform: Platform | None, tokens: int) -> float:
+        """Returns the seconds to wait before sending the request"""
+        if platform not in self._buckets:
+            return 0.0
+        requests_bucket, tokens_bucket = self._buckets[platform]
+        with self._lock:
+            now = self._clock()
+            return max(
+                requests_bucket.reserve(1, now), tokens_bucket.reserve(tokens, now)
+            )
+
+    def acquire(self, platform: Platform | None, tokens: int) -> None:
+        if (seconds := self.reserve(platform, tokens)) > 0:
+            logger.info(f"Waiting {seconds:.2f} seconds for the {platform} rate limit")
+            self._sleep(seconds)
+
+    async def acquire_async(self, platform: Platform | None, tokens: int) -> None:
+        if (seconds := self.reserve(platform, tokens)) > 0:
+            logger.info(f"Waiting {seconds:.2f} seconds for the {platform} rate limit")
+            await self._async_sleep(seconds)
+
+
+class RunawayGuard:
+    """
+    Safety limit against sending queries to the API without control due to a bug:
+    unlike the rate limiter it does not wait, it fails when more than max_queries
+    are sent in period_seconds.
+    """
+
+    def __init__(
+        self,
+        max_queries: int,
+        period_seconds: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._max_queries = max_queries
+        self._period_seconds = period_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._times: deque[float] = deque(maxlen=max_queries)
+
+    def check(self) -> None:
+        with self._lock:
+            now = self._clock()
+            if len(self._times) == self._max_queries:
+                if (seconds := now - self._times[0]) < self._period_seconds:
+                    raise TooManyRequests(self._max_queries, seconds)
+            self._times.append(now)
+
+
+def estimate_tokens(messages: Sequence[ChatMessage]) -> int:
+    return sum(estimate_message_tokens(message) for message in messages)
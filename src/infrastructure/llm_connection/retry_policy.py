@@ -0,0 +1,142 @@
+import asyncio
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TypeVar
+
+from src.infrastructure.exceptions import TransientAPIError
+from src.setup_logging import configure_logger
+
+logger = configure_logger(__name__)
+
+T = TypeVar("T")
+
+# statuses of the answers worth retrying: timeout, conflict, rate limit and
+# errors of the server
+RETRY_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 5
+    base_delay_seconds: float = 1.0
+    max_delay_seconds: float = 30.0
+    # no retry is started after this time since the first attempt
+    deadline_seconds: float = 120.0
+
+
+class Retrier:
+    """
+    Repeats the calls that fail with a TransientAPIError, waiting a random time
+    between 0 and an exponentially growing limit (full jitter), or the time asked
+    by the Retry-After header of the API. Only idempotent calls must be retried.
+    The counters accumulate the attempts and waits of all the calls.
+    """
+
+    def __init__(
+        self,
+        policy: RetryPolicy = RetryPolicy(),
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        get_random: Callable[[], float] = random.random,
+    ):
+        self._policy = policy
+        self._clock = clock
+        self._sleep = sleep
+        self._get_random = get_random
+        self._lock = threading.Lock()
+        self._attempts = 0
+        self._backoff_seconds = 0.0
+
+    @property
+    def attempts(self) -> int:
+        return self._attempts
+
+    @property
+    def backoff_seconds(self) -> float:
+        return self._backoff_seconds
+
+    def call(
+        self,
+        function: Callable[[], T],
+        *,
+        can_retry: Callable[[], bool] = lambda: True,
+    ) -> T:
+        """can_retry is checked after every failure, e.g. to not repeat a stream"""
+        start = self._clock()
+        attempt = 1
+        while True:
+            self._count_attempt()
+            try:
+                return function()
+            except TransientAPIError as err:
+                delay = self._get_delay(err, attempt, start)
+                if delay is None or not can_retry():
+                    raise
+            self._sleep(delay)
+            attempt += 1
+
+    async def call_async(self, function: Callable[[], Awaitable[T]]) -> T:
+        start = self._clock()
+        attempt = 1
+        while True:
+            self._count_attempt()
+            try:
+                return await function()
+            except TransientAPIError as err:
+                delay = self._get_delay(err, attempt, start)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _count_attempt(self) -> None:
+        with self._lock:
+            self._attempts += 1
+
+    def _get_delay(
+        self, err: TransientAPIError, attempt: int, start: float
+    ) -> float | None:
+        """Returns None when no attempts or time are left"""
+        if attempt >= self._policy.max_attempts:
+            return None
+        if err.retry_after is not None:
+            delay = err.retry_after
+        else:
+            limit = min(
+                self._policy.max_delay_seconds,
+                self._policy.base_delay_seconds * 2 ** (attempt - 1),
+            )
+            delay = self._get_random() * limit
+        if self._clock() + delay - start > self._policy.deadline_seconds:
+            return None
+        logger.info(f"Retrying in {delay:.2f} seconds after: {err}")
+        with self._lock:
+            self._backoff_seconds += delay
+        return delay
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> float | None:
+    """Seconds to wait asked by the API, the header can also contain a date"""
+    headers = {key.lower(): value for key, value in headers.items()}
+    if (milliseconds := headers.get("retry-after-ms")) is not None:
+        try:
+            return max(0.0, float(milliseconds) / 1000)
+        except ValueError:
+            pass
+    if (value := headers.get("retry-after")) is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
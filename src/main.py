@@ -1,14 +1,20 @@
 import os
 from typing import Sequence
 
-from dotenv import load_dotenv
-
 from src.command_handler import ExitException
 from src.domain import Model
+from src.infrastructure.exceptions import DeferredWriteError
 from src.infrastructure.llm_connection import ClientWrapper
 from src.models_data import get_models
-from src.setup_engine import setup_engine
-from src.view import Raw, SimpleView, display_neutral_msg
+from src.settings import LOG_LEVEL
+from src.setup_engine import (
+    build_rate_limiter,
+    build_retrier,
+    build_runaway_guard,
+    setup_engine,
+)
+from src.setup_logging import set_log_level
+from src.view import Raw, SimpleView, display_neutral_msg, show_error_msg
 
 PROGRAM_PROMPT = Raw(
     (
@@ -19,29 +25,52 @@ PROGRAM_PROMPT = Raw(
 
 class Main:
     def __init__(self, models: Sequence[Model]) -> None:
+        set_log_level(LOG_LEVEL)
         self._view = SimpleView()
+        from dotenv import load_dotenv
+
         load_dotenv()
         mistral_api_key = os.environ.get("MISTRAL_API_KEY")
         openai_api_key = os.environ.get("OPENAI_API_KEY")
+        # optional, to use compatible servers like `python -m benchmarks.stub_server`
+        mistral_base_url = os.environ.get("MISTRAL_BASE_URL")
+        openai_base_url = os.environ.get("OPENAI_BASE_URL")
+        rate_limiter = build_rate_limiter()
         self._engine = setup_engine(
             models,
             ClientWrapper(
-                mistral_api_key=mistral_api_key, openai_api_key=openai_api_key
+                mistral_api_key=mistral_api_key,
+                openai_api_key=openai_api_key,
+                mistral_base_url=mistral_base_url,
+                openai_base_url=openai_base_url,
+                rate_limiter=rate_limiter,
+                runaway_guard=build_runaway_guard(rate_limiter),
+                retrier=build_retrier(),
             ),
         )
 
     def execute(self) -> None:
         """Runs the text interface to Mistral models"""
 
-        self._engine.initiate()
+        try:
+            self._engine.initiate()
+
+            while True:
+                raw_query = self._view.get_input(PROGRAM_PROMPT)
 
-        while True:
-            raw_query = self._view.get_input(PROGRAM_PROMPT)
+                if not raw_query:
+                    continue
 
-            if not raw_query:
-                continue
+                self._engine.process_raw_query(raw_query)
+        finally:
+            # also on ExitException, the conversations may still be being saved
+            self._close_engine()
 
-            self._engine.process_raw_query(raw_query)
+    def _close_engine(self) -> None:
+        try:
+            self._engine.close()
+        except DeferredWriteError as err:
+            show_error_msg(Raw(str(err)))
 
 
 def main() -> None:
@@ -1,6 +1,9 @@
+from collections.abc import Callable
+from dataclasses import replace
 from typing import Final
 
 from src.domain import CompleteMessage, QueryResult
+from src.models.context_window import ContextManager
 from src.models.messages_ops import add_user_query_in_place
 from src.models.model_wrapper import ModelWrapper
 from src.models.placeholders import QueryText
@@ -13,9 +16,15 @@ class ModelManager:
     change the model.
     """
 
-    def __init__(self, client_wrapper: ClientWrapperProtocol):
+    def __init__(
+        self,
+        client_wrapper: ClientWrapperProtocol,
+        context_manager: ContextManager | None = None,
+    ):
+        """Without context_manager the whole conversation is sent every time"""
         self.model_wrapper: Final = ModelWrapper()
         self.client_wrapper: Final = client_wrapper
+        self._context_manager = context_manager
 
     def get_simple_response(
         self,
@@ -23,9 +32,26 @@ class ModelManager:
         complete_messages: list[CompleteMessage],
         *,
         debug: bool = False,
+        on_delta: Callable[[str], None] | None = None,
+        use_cache: bool = True,
     ) -> QueryResult:
-        assert self.model_wrapper.model
+        model = self.model_wrapper.model
+        assert model
         add_user_query_in_place(complete_messages, query)
-        return self.client_wrapper.get_simple_response(
-            self.model_wrapper.model, complete_messages, debug=debug
+        if self._context_manager:
+            context = self._context_manager.select_messages(
+                model.model_name, complete_messages
+            )
+        else:
+            context = list(complete_messages)
+        sent_messages_number = len(context)
+        query_result = self.client_wrapper.get_simple_response(
+            model,
+            context,
+            debug=debug,
+            on_delta=on_delta,
+            use_cache=use_cache,
         )
+        # the answer is added to the complete conversation, not to the context
+        complete_messages.extend(query_result.messages[sent_messages_number:])
+        return replace(query_result, messages=complete_messages)
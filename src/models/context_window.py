@@ -0,0 +1,169 @@
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+from typing import Final, Protocol
+
+from src.domain import ChatMessage, CompleteMessage, ModelName
+from src.setup_logging import configure_logger
+
+logger = configure_logger(__name__)
+
+# rough estimation, the providers do not expose their tokenizers
+CHARS_PER_TOKEN: Final = 4  # pragma: no mutate
+# role and separators added by the providers to every message
+MESSAGE_OVERHEAD_TOKENS: Final = 4  # pragma: no mutate
+TOKENS_CACHE_SIZE: Final = 4096  # pragma: no mutate
+DEFAULT_CONTEXT_TOKEN_BUDGET: Final = 8_000  # pragma: no mutate
+OMITTED_TOOL_OUTPUT: Final = "[resultado omitido]"
+
+
+@lru_cache(maxsize=TOKENS_CACHE_SIZE)
+def estimate_text_tokens(text: str) -> int:
+    """Cached, the same messages are counted again in every turn"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_message_tokens(chat_msg: ChatMessage) -> int:
+    tokens = MESSAGE_OVERHEAD_TOKENS + estimate_text_tokens(chat_msg.content or "")
+    if chat_msg.tool_calls:
+        tokens += estimate_text_tokens(str(chat_msg.tool_calls))
+    return tokens
+
+
+def estimate_messages_tokens(messages: Sequence[CompleteMessage]) -> int:
+    return sum(estimate_message_tokens(message.chat_msg) for message in messages)
+
+
+class ContextStrategy(Protocol):
+    def __call__(
+        self, messages: Sequence[CompleteMessage], budget: int
+    ) -> list[CompleteMessage]:
+        """Returns the messages to send, trying to not exceed the budget"""
+        ...
+
+
+def drop_tool_outputs(
+    messages: Sequence[CompleteMessage], budget: int
+) -> list[CompleteMessage]:
+    """
+    Replaces the outputs of the tools before the last user message, the calls
+    are kept because the APIs reject calls without their outputs
+    """
+    turn_starts = find_turn_starts(messages)
+    last_turn_start = turn_starts[-1] if turn_starts else len(messages)
+    return [
+        (
+            CompleteMessage(
+                ChatMessage(
+                    "tool",
+                    OMITTED_TOOL_OUTPUT,
+                    name=message.chat_msg.name,
+                    tool_call_id=message.chat_msg.tool_call_id,
+                ),
+                message.model,
+            )
+            if message.chat_msg.role == "tool" and i < last_turn_start
+            else message
+        )
+        for i, message in enumerate(messages)
+    ]
+
+
+def keep_recent_turns(
+    messages: Sequence[CompleteMessage], budget: int
+) -> list[CompleteMessage]:
+    """
+    Sliding window: the most recent turns that fit in the budget. Whole turns
+    are dropped, so the messages sent always start with a user message, and
+    the last turn is kept even if it does not fit.
+    """
+    return _keep_recent_turns(messages, budget)
+
+
+def keep_system_prompt_and_recent_turns(
+    messages: Sequence[CompleteMessage], budget: int
+) -> list[CompleteMessage]:
+    """Like keep_recent_turns, but the initial system prompt is always kept"""
+    system_prompt = list(messages[:1])
+    if not system_prompt or system_prompt[0].chat_msg.role != "system":
+        return _keep_recent_turns(messages, budget)
+    remaining_budget = budget - estimate_messages_tokens(system_prompt)
+    return system_prompt + _keep_recent_turns(messages[1:], remaining_budget)
+
+
+def _keep_recent_turns(
+    messages: Sequence[CompleteMessage], budget: int
+) -> list[CompleteMessage]:
+    turn_starts = find_turn_starts(messages)
+    if not turn_starts:
+        return list(messages)
+    tokens = estimate_messages_tokens(messages[turn_starts[-1] :])
+    start = turn_starts[-1]
+    for turn_start, next_turn_start in zip(
+        reversed(turn_starts[:-1]), reversed(turn_starts[1:])
+    ):
+        tokens += estimate_messages_tokens(messages[turn_start:next_turn_start])
+        if tokens > budget:
+            break
+        start = turn_start
+    return list(messages[start:])
+
+
+def find_turn_starts(messages: Sequence[CompleteMessage]) -> list[int]:
+    return [i for i, message in enumerate(messages) if message.chat_msg.role == "user"]
+
+
+CONTEXT_STRATEGIES: Final[Mapping[str, ContextStrategy]] = {
+    "drop_tool_outputs": drop_tool_outputs,
+    "sliding_window": keep_recent_turns,
+    "system_prompt_and_recent": keep_system_prompt_and_recent_turns,
+}
+
+
+class ContextManager:
+    """
+    Chooses the messages sent to the model, so the requests do not grow without
+    limit in long conversations. The strategies are applied in order while the
+    messages exceed the token budget of the model. The conversation is still
+    saved complete.
+    """
+
+    def __init__(
+        self,
+        strategies: Sequence[ContextStrategy],
+        budgets: Mapping[ModelName, int],
+        default_budget: int = DEFAULT_CONTEXT_TOKEN_BUDGET,
+    ):
+        self._strategies = strategies
+        self._budgets = budgets
+        self._default_budget = default_budget
+
+    def select_messages(
+        self, model_name: ModelName, messages: Sequence[CompleteMessage]
+    ) -> list[CompleteMessage]:
+        budget = self._budgets.get(model_name, self._default_budget)
+        selected = list(messages)
+        initial_tokens = tokens = estimate_messages_tokens(selected)
+        for strategy in self._strategies:
+            if tokens <= budget:
+                break
+            selected = strategy(selected, budget)
+            tokens = estimate_messages_tokens(selected)
+        if len(selected) < len(messages) or tokens < initial_tokens:
+            logger.info(
+                f"Context of {model_name} trimmed from {len(messages)} messages"
+                f" ({initial_tokens} tokens) to {len(selected)} ({tokens} tokens)"
+            )
+        return selected
+
+
+def build_context_manager(
+    strategy_names: Sequence[str],
+    budgets: Mapping[ModelName, int],
+    default_budget: int = DEFAULT_CONTEXT_TOKEN_BUDGET,
+) -> ContextManager:
+    strategies = []
+    for name in strategy_names:
+        if name not in CONTEXT_STRATEGIES:
+            raise ValueError(f"Unknown context strategy: {name}")
+        strategies.append(CONTEXT_STRATEGIES[name])
+    return ContextManager(strategies, budgets, default_budget)
@@ -1,9 +1,23 @@
+import csv
+import json
+import math
 import re
-from typing import Final, Mapping, NewType
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import PurePath
+from typing import Final, Mapping, NewType, Protocol, TypeVar
+
+from src.python_modules.FileSystemWrapper.file_manager_protocol import (
+    FileManagerProtocol,
+)
 
 from src.utils import remove_duplicates
 
-__all__ = ["build_queries", "find_unique_placeholders"]
+__all__ = [
+    "CompiledTemplate",
+    "QueryExpansion",
+    "build_queries",
+    "find_unique_placeholders",
+]
 
 Placeholder = NewType("Placeholder", str)
 
@@ -14,110 +28,340 @@ Substitutions = Mapping[Placeholder, str]
 QueryText = NewType("QueryText", str)
 
 FOR_COMMAND_PREFFIX = "/for"
+ZIP_COMMAND_PREFFIX = "/zip"
+
+
+def compile_placeholder_pattern(placeholder_pattern: str) -> re.Pattern[str]:
+    """
+    Same rules as find_unique_placeholders, for any placeholder format. The
+    characters around a placeholder are part of the match, so they are not used
+    again by the next one.
+    """
+    return re.compile(
+        r"(?:[^|^a-zA-Z0-9])"  # not alphanumeric before
+        + "("
+        + placeholder_pattern  # the placeholder to find
+        + ")"
+        + r"(?:[^a-zA-Z0-9]|$)"  # the end of the string or a not alphanumeric character after
+    )
+
+
+PLACEHOLDER_PATTERN = compile_placeholder_pattern(r"\$0[a-zA-Z_]+[0-9]*")
+
+# `/for @file.csv:column`, `/for @file.jsonl:field` or `/for @file.txt`
+FILE_SOURCE_PREFFIX = "@"
+# `/for range(1,1000)`, like the builtin range
+RANGE_SOURCE_PATTERN = re.compile(r"range\((-?\d+)\s*,\s*(-?\d+)(?:\s*,\s*(-?\d+))?\)")
+
+T_co = TypeVar("T_co", covariant=True)
+
+
+class SizedIterable(Protocol[T_co]):
+    """Values known in number before iterating them, maybe more than once"""
+
+    def __len__(self) -> int: ...
+
+    def __iter__(self) -> Iterator[T_co]: ...
+
+
+# Placeholders replaced at the same time and the replacements of each query
+Axis = tuple[tuple[Placeholder, ...], SizedIterable[tuple[str, ...]]]
 
 
 class QueryBuildException(Exception): ...
 
 
-class MultipleForNotSupported(QueryBuildException):
+class ZipLengthMismatch(QueryBuildException):
     def __init__(self) -> None:
         super().__init__(
-            f"El uso de varios '{FOR_COMMAND_PREFFIX}' con los placeholders no esta soportado"
+            f"Los placeholders con '{ZIP_COMMAND_PREFFIX}' deben tener el mismo numero de valores"
         )
 
 
-def build_queries(raw_query: str, substitutions: Substitutions) -> list[QueryText]:
+class ValueSourceError(QueryBuildException): ...
+
+
+class FileValues:
+    """
+    The values of a `/for` read from a file line by line every time they are
+    iterated, so they are never held in memory at once. CSV files need the name
+    of the column and JSON Lines files the name of the field, any other file
+    gives one value per line. The file is read once at creation to count and
+    validate the values.
     """
-    Constructs a list of queries by replacing placeholders in the raw query with user-provided substitutions.
-    If a 'for' command is detected, it generates multiple queries by iterating over the specified range.
+
+    def __init__(
+        self, file_manager: FileManagerProtocol, path: PurePath, field: str | None
+    ):
+        self._file_manager = file_manager
+        self._path = path
+        self._field = field
+        self._format = path.suffix.lower()
+        if not file_manager.path_exists(path):
+            raise ValueSourceError(f"No se encuentra el fichero {path}")
+        if self._format in (".csv", ".jsonl") and not field:
+            raise ValueSourceError(
+                f"Indica la columna o el campo a usar: {FILE_SOURCE_PREFFIX}{path}:<nombre>"
+            )
+        self._length = sum(1 for _ in self)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[str]:
+        lines = self._file_manager.read_file_lines(self._path)
+        if self._format == ".csv":
+            return self._read_csv(lines)
+        if self._format == ".jsonl":
+            return self._read_jsonl(lines)
+        return (line.rstrip("\r\n") for line in lines if line.strip())
+
+    def _read_csv(self, lines: Iterator[str]) -> Iterator[str]:
+        reader = csv.DictReader(lines)
+        if self._field not in (reader.fieldnames or []):
+            raise ValueSourceError(
+                f"El fichero {self._path} no tiene la columna {self._field!r}"
+            )
+        for row in reader:
+            yield row[self._field] or ""
+
+    def _read_jsonl(self, lines: Iterator[str]) -> Iterator[str]:
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                value = json.loads(line)[self._field]
+            except (ValueError, TypeError, KeyError):
+                raise ValueSourceError(
+                    f"La linea {number} de {self._path} no tiene el campo {self._field!r}"
+                ) from None
+            yield value if isinstance(value, str) else json.dumps(value)
+
+
+class RangeValues:
+    def __init__(self, start: int, stop: int, step: int = 1):
+        if step == 0:
+            raise ValueSourceError("El paso de range no puede ser 0")
+        self._range = range(start, stop, step)
+
+    def __len__(self) -> int:
+        return len(self._range)
+
+    def __iter__(self) -> Iterator[str]:
+        return map(str, self._range)
+
+
+class SingleValueRows:
+    """The values of a `/for` placeholder as rows of one replacement"""
+
+    def __init__(self, values: SizedIterable[str]):
+        self._values = values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __iter__(self) -> Iterator[tuple[str]]:
+        return ((value,) for value in self._values)
+
+
+class ZippedRows:
+    """The values of the `/zip` placeholders, taken at the same time"""
+
+    def __init__(self, values: Sequence[SizedIterable[str]]):
+        if len({len(placeholder_values) for placeholder_values in values}) > 1:
+            raise ZipLengthMismatch()
+        self._values = values
+
+    def __len__(self) -> int:
+        return len(self._values[0]) if self._values else 0
+
+    def __iter__(self) -> Iterator[tuple[str, ...]]:
+        return zip(*self._values)
+
+
+class CompiledTemplate:
+    """
+    A query split once at the positions of its placeholders, so every substitution
+    only joins the pieces, instead of searching the whole text again for every
+    placeholder. Without placeholders, all the `$0` placeholders are found.
+    """
+
+    def __init__(self, text: str, placeholders: Iterable[Placeholder] | None = None):
+        if placeholders is None:
+            pattern: re.Pattern[str] | None = PLACEHOLDER_PATTERN
+        elif alternatives := sorted(set(placeholders), key=len, reverse=True):
+            pattern = compile_placeholder_pattern(
+                "|".join(map(re.escape, alternatives))
+            )
+        else:
+            pattern = None
+        # the text between the placeholders, one more than the placeholders
+        self._segments: list[str] = []
+        self._placeholders: list[Placeholder] = []
+        start = 0
+        for match in pattern.finditer(text) if pattern else ():
+            self._segments.append(text[start : match.start(1)])
+            self._placeholders.append(Placeholder(match.group(1)))
+            start = match.end(1)
+        self._segments.append(text[start:])
+
+    @property
+    def placeholders(self) -> list[Placeholder]:
+        return remove_duplicates(self._placeholders)
+
+    def render(self, substitutions: Substitutions) -> QueryText:
+        """The placeholders without substitution are kept"""
+        parts = [self._segments[0]]
+        for placeholder, segment in zip(self._placeholders, self._segments[1:]):
+            parts.append(substitutions.get(placeholder, placeholder))
+            parts.append(segment)
+        return QueryText("".join(parts))
+
+    def bind(self, substitutions: Substitutions) -> "CompiledTemplate":
+        """
+        The template with some placeholders already replaced, the replacements
+        are not searched for placeholders
+        """
+        bound = CompiledTemplate("", ())
+        bound._segments = [self._segments[0]]
+        for placeholder, segment in zip(self._placeholders, self._segments[1:]):
+            if placeholder in substitutions:
+                bound._segments[-1] += substitutions[placeholder] + segment
+            else:
+                bound._placeholders.append(placeholder)
+                bound._segments.append(segment)
+        return bound
+
+
+class QueryExpansion:
+    """
+    The queries resulting from the substitutions, built one by one while they
+    are iterated, so the combinations are never held in memory at once. Their
+    number is known before building them.
+
+    Every `/for` placeholder multiplies the number of queries (cartesian
+    product, the last placeholder changes first). The `/zip` placeholders take
+    their values at the same time, like the builtin zip, and are combined with
+    the `/for` placeholders as one more of them.
+    """
+
+    def __init__(self, template: CompiledTemplate, axes: Sequence[Axis] = ()):
+        self._template: Final = template
+        self._axes: Final = axes
+        self._length: Final = math.prod(len(rows) for _, rows in axes)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[QueryText]:
+        placeholders = [placeholders for placeholders, _ in self._axes]
+        rows = [rows for _, rows in self._axes]
+        for combination in iterate_product(rows):
+            substitutions: dict[Placeholder, str] = {}
+            for axis_placeholders, row in zip(placeholders, combination):
+                substitutions.update(zip(axis_placeholders, row))
+            yield self._template.render(substitutions)
+
+    def __contains__(self, query: object) -> bool:
+        return any(query == built_query for built_query in self)
+
+
+def iterate_product(
+    rows: Sequence[SizedIterable[tuple[str, ...]]],
+) -> Iterator[tuple[tuple[str, ...], ...]]:
+    """
+    Like itertools.product, but the values are iterated again for every
+    combination of the previous ones instead of being copied to memory
+    """
+    if not rows:
+        yield ()
+        return
+    for row in rows[0]:
+        for combination in iterate_product(rows[1:]):
+            yield (row, *combination)
+
+
+def build_queries(
+    raw_query: str,
+    substitutions: Substitutions,
+    file_manager: FileManagerProtocol | None = None,
+) -> QueryExpansion:
+    """
+    Constructs the queries by replacing placeholders in the raw query with user-provided substitutions.
+    If 'for' or 'zip' commands are detected, it generates multiple queries by iterating over the specified values.
 
     Args:
         raw_query: The original query template containing placeholders.
         substitutions: See alias definition.
+        file_manager: Reads the values of `/for @file`.
 
     Returns:
-        A list of queries with all placeholders replaced.
-    """
-    if (placeholders := _get_placeholders_with_for(substitutions)) == []:
-        queries = [_replace_single_placeholders(raw_query, substitutions)]
-    elif len(placeholders) == 1:
-        placeholder = placeholders[0]
-        replacer = OneForReplacer(substitutions, placeholder)
-        queries = replacer.replace_placeholders_with_one_for(raw_query)
-    else:
-        raise MultipleForNotSupported()
-    return queries
+        The queries with all placeholders replaced, see QueryExpansion.
+    """
+    single_substitutions = {
+        placeholder: replacement
+        for placeholder, replacement in substitutions.items()
+        if not _is_multiple(replacement)
+    }
+    template = CompiledTemplate(raw_query, substitutions).bind(single_substitutions)
+    axes: list[Axis] = [
+        ((placeholder,), SingleValueRows(_get_values(replacement, file_manager)))
+        for placeholder, replacement in substitutions.items()
+        if replacement.startswith(FOR_COMMAND_PREFFIX)
+    ]
+    if zip_placeholders := _get_placeholders_with_zip(substitutions):
+        values = [_get_values(substitutions[p], file_manager) for p in zip_placeholders]
+        axes.append((tuple(zip_placeholders), ZippedRows(values)))
+    return QueryExpansion(template, axes)
 
 
 def find_unique_placeholders(s: str) -> list[Placeholder]:
     """
     Finds all unique placeholders in a given string.
     """
-    pattern = re.compile(
-        r"""
-        (?:[^|^a-zA-Z0-9])      # not alphanumeric before
-        (\$0[a-zA-Z_]+[0-9]*)   # the placeholder to find
-        (?:[^a-zA-Z0-9]|$)      # the end of the string or a not alphanumeric character after
-        """,
-        re.VERBOSE,
-    )
-    return remove_duplicates(pattern.findall(s))
+    return remove_duplicates(PLACEHOLDER_PATTERN.findall(s))
 
 
-def _get_placeholders_with_for(substitutions: Substitutions) -> list[Placeholder]:
+def _get_placeholders_with_zip(substitutions: Substitutions) -> list[Placeholder]:
     """
-    Returns a list of placeholders that are associated with a 'for' command in the substitutions.
+    Returns a list of placeholders that are associated with a 'zip' command in the substitutions.
     """
     return [
         placeholder
         for placeholder, subs in substitutions.items()
-        if subs.startswith(FOR_COMMAND_PREFFIX)
+        if subs.startswith(ZIP_COMMAND_PREFFIX)
     ]
 
 
-class OneForReplacer:
-    def __init__(self, substitutions: Substitutions, placeholder_with_for: Placeholder):
-        self._substitutions: Final = substitutions
-        self._placeholder_with_for: Final = placeholder_with_for
+def _is_multiple(replacement: str) -> bool:
+    return replacement.startswith((FOR_COMMAND_PREFFIX, ZIP_COMMAND_PREFFIX))
 
-    def replace_placeholders_with_one_for(self, query: str) -> list[QueryText]:
-        """
-        Replace placeholders when there is only one for-style replacement.
 
-        Args:
-            query (str): The initial query containing placeholders.
-            substitutions (Substitutions): See alias definition.
-            placeholder_with_for (Placeholder): Placeholder to be replaced with 'for' values.
+def _get_values(
+    replacement: str, file_manager: FileManagerProtocol | None
+) -> SizedIterable[str]:
+    """Extract the individual replacements, inline or from a source"""
+    for command in (FOR_COMMAND_PREFFIX, ZIP_COMMAND_PREFFIX):
+        if replacement.startswith(command):
+            values = replacement.removeprefix(command).strip()
+            break
+    else:
+        raise ValueError(
+            f"{replacement!r} no empieza por un comando de valores multiples"
+        )
+    if values.startswith(FILE_SOURCE_PREFFIX):
+        if file_manager is None:
+            raise ValueSourceError("No se pueden leer los valores de ficheros")
+        return _get_file_values(values.removeprefix(FILE_SOURCE_PREFFIX), file_manager)
+    if match := RANGE_SOURCE_PATTERN.fullmatch(values):
+        start, stop, step = match.groups()
+        return RangeValues(int(start), int(stop), int(step or 1))
+    return values.split(",")
 
-        Returns:
-            list[str]: List of new queries after replacing placeholders.
-        """
-        substitutions_dict = dict(self._substitutions)
-        del substitutions_dict[self._placeholder_with_for]
-
-        # Create a query for each 'for' value
-        queries = [
-            query.replace(self._placeholder_with_for, replacement)
-            for replacement in self._get_for_replacements()
-        ]
-
-        # Replace the remaining placeholders in the queries
-        return [
-            _replace_single_placeholders(query, substitutions_dict) for query in queries
-        ]
-
-    def _get_for_replacements(self) -> list[str]:
-        """Extract the list of individual replacements"""
-        for_values_str = self._substitutions[self._placeholder_with_for]
-        return self._remove_for_command(for_values_str).split(",")
-
-    def _remove_for_command(self, raw_string: str) -> str:
-        if not raw_string.startswith(command := FOR_COMMAND_PREFFIX):
-            raise ValueError(f"{raw_string!r} no empieza por el comando {command}")
-        return raw_string.removeprefix(command).strip()
-
-
-def _replace_single_placeholders(query: str, substitutions: Substitutions) -> QueryText:
-    for placeholder, replacement in substitutions.items():
-        query = query.replace(placeholder, replacement)
-    return QueryText(query)
+
+def _get_file_values(source: str, file_manager: FileManagerProtocol) -> FileValues:
+    """The field is after the last colon, if the file name has an extension"""
+    path, colon, field = source.rpartition(":")
+    if not colon or not PurePath(path).suffix:
+        path, field = source, ""
+    return FileValues(file_manager, PurePath(path), field or None)
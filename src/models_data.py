@@ -13,6 +13,17 @@ models_data: Final[Mapping[Platform, Sequence[str]]] = {
 }
 
 
+# tokens of the conversation sent to each model, leaving room for the answer
+context_token_budgets: Final[Mapping[ModelName, int]] = {
+    ModelName("mistral-tiny"): 28_000,
+    ModelName("mistral-small-latest"): 28_000,
+    ModelName("mistral-medium"): 28_000,
+    ModelName("mistral-large-2402"): 28_000,
+    ModelName("gpt-3.5-turbo"): 12_000,
+    ModelName("gpt-4-1106-preview"): 100_000,
+}
+
+
 def get_models() -> Sequence[Model]:
     return [
         Model(platform, ModelName(model_name_str))
@@ -1,4 +1,4 @@
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence
 from typing import Any, Mapping, Protocol, Sequence
 
 from src.domain import (
@@ -9,8 +9,10 @@ from src.domain import (
     Model,
     ModelName,
     QueryResult,
+    SearchResult,
 )
 from src.models.placeholders import Placeholder
+from src.serde.shared import ConversationHeader
 from src.view.io_helpers import SimpleView
 from src.view.string_types import EscapedStr, Raw
 
@@ -25,8 +27,27 @@ class ClientWrapperProtocol(Protocol):
         tools: list[dict[str, Any]] | None = None,
         tool_choice: str = "none",
         random_seed: int | None = None,
+        on_delta: Callable[[str], None] | None = None,
+        use_cache: bool = True,
     ) -> QueryResult: ...
 
+    def warm_up(self) -> None: ...
+
+
+class AsyncClientWrapperProtocol(Protocol):
+    async def get_simple_response(
+        self,
+        model: Model,
+        complete_messages: list[CompleteMessage],
+        *,
+        debug: bool = False,
+        tools: list[dict[str, Any]] | None = None,
+        tool_choice: str = "none",
+        random_seed: int | None = None,
+    ) -> QueryResult: ...
+
+    async def close(self) -> None: ...
+
 
 class ChatRepositoryProtocol(Protocol):
 
@@ -42,6 +63,14 @@ class ChatRepositoryProtocol(Protocol):
         self, conversation_id: ConversationId
     ) -> ConversationText: ...
 
+    def read_conversation_header(
+        self, conversation_id: ConversationId
+    ) -> ConversationHeader: ...
+
+    def search_conversations(self, query: str) -> list[SearchResult]: ...
+
+    def close(self) -> None: ...
+
 
 class TimeManagerProtocol(Protocol):
     def get_current_time(self) -> str: ...
@@ -56,6 +85,9 @@ class ViewProtocol(Protocol):
         query: Raw,
         content: Raw,
     ) -> None: ...
+    def start_streamed_interaction(self, model_name: ModelName, query: Raw) -> None: ...
+    def print_response_delta(self, delta: Raw) -> None: ...
+    def end_streamed_interaction(self, time_to_first_token: float | None) -> None: ...
     def get_raw_substitutions_from_user(
         self,
         unique_placeholders: Sequence[Placeholder],
@@ -74,4 +106,5 @@ class ViewProtocol(Protocol):
         prev_messages: Sequence[ChatMessage],
     ) -> None: ...
     def display_processing_query_text(self, *, current: int, total: int) -> None: ...
+    def display_search_results(self, results: Sequence[SearchResult]) -> None: ...
     def show_error_msg(self, text: EscapedStr | Raw) -> None: ...
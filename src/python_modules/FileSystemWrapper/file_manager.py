@@ -1,5 +1,8 @@
+from collections.abc import Generator
 from pathlib import Path, PurePath
 
+from .file_manager_protocol import FileStats
+
 
 class FileManager:
     """Manage all the file R/W operations"""
@@ -16,15 +19,51 @@ class FileManager:
     def path_is_dir(self, path: PurePath) -> bool:
         return Path(path).is_dir()
 
+    def get_file_stats(self, path: PurePath) -> FileStats:
+        stat_result = Path(path).stat()
+        return FileStats(stat_result.st_size, stat_result.st_mtime)
+
     def write_file(self, path: PurePath, text: str) -> None:
         with open(Path(path), "w", encoding="utf-8") as file:
             file.write(text)
 
+    def create_file_exclusively(self, path: PurePath) -> bool:
+        """Creates an empty file (O_EXCL), returns False if it already existed"""
+        try:
+            with open(Path(path), "x", encoding="utf-8"):
+                pass
+        except FileExistsError:
+            return False
+        return True
+
+    def append_file(self, path: PurePath, text: str) -> None:
+        with open(Path(path), "a", encoding="utf-8") as file:
+            file.write(text)
+
+    def patch_file(self, path: PurePath, offset: int, text: str) -> None:
+        """Overwrites the text found at the character offset without truncating"""
+        with open(Path(path), "r+", encoding="utf-8") as file:
+            file.read(offset)
+            file.seek(file.tell())
+            file.write(text)
+
     def read_file(self, path: PurePath) -> str:
         with open(Path(path), "r", encoding="utf-8") as file:
             text = file.read()
         return text
 
+    def read_file_chunks(
+        self, path: PurePath, chunk_size: int
+    ) -> Generator[str, None, None]:
+        with open(Path(path), "r", encoding="utf-8") as file:
+            while chunk := file.read(chunk_size):
+                yield chunk
+
+    def read_file_lines(self, path: PurePath) -> Generator[str, None, None]:
+        """The line endings are not translated, as the csv module expects"""
+        with open(Path(path), "r", encoding="utf-8", newline="") as file:
+            yield from file
+
     def rename_path(self, path: PurePath, new_path: PurePath) -> None:
         Path(path).rename(Path(new_path))
 
@@ -1,7 +1,15 @@
+from collections.abc import Generator
+from dataclasses import dataclass
 from pathlib import PurePath
 from typing import Protocol
 
 
+@dataclass(frozen=True)
+class FileStats:
+    size: int
+    mtime: float
+
+
 class FileManagerProtocol(Protocol):
     """Protocol to manage all the file R/W operations"""
 
@@ -13,10 +21,24 @@ class FileManagerProtocol(Protocol):
 
     def path_is_dir(self, path: PurePath) -> bool: ...
 
+    def get_file_stats(self, path: PurePath) -> FileStats: ...
+
     def write_file(self, path: PurePath, text: str) -> None: ...
 
+    def create_file_exclusively(self, path: PurePath) -> bool: ...
+
+    def append_file(self, path: PurePath, text: str) -> None: ...
+
+    def patch_file(self, path: PurePath, offset: int, text: str) -> None: ...
+
     def read_file(self, path: PurePath) -> str: ...
 
+    def read_file_chunks(
+        self, path: PurePath, chunk_size: int
+    ) -> Generator[str, None, None]: ...
+
+    def read_file_lines(self, path: PurePath) -> Generator[str, None, None]: ...
+
     def rename_path(self, path: PurePath, new_path: PurePath) -> None: ...
 
     def unlink_path(self, path: PurePath) -> None: ...
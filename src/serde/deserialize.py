@@ -1,7 +1,7 @@
 import re
 from dataclasses import dataclass
 from enum import Enum
-from typing import Final, Mapping
+from typing import Final, Iterable, Iterator, Mapping
 
 from src.domain import (
     ChatMessage,
@@ -13,7 +13,7 @@ from src.domain import (
 )
 from src.models_data import get_models
 
-from .shared import SCHEMA_VERSION, Conversation
+from .shared import SCHEMA_VERSION, Conversation, ConversationHeader
 
 
 class TagType(Enum):
@@ -90,11 +90,239 @@ class ParsedLine:
         return RoleInfo(role, model_name)
 
 
+class ParserEngine(Enum):
+    """Implementation used to deserialize a conversation text"""
+
+    TOKENIZER = "TOKENIZER"
+    LEGACY = "LEGACY"
+
+
+DEFAULT_PARSER_ENGINE: Final = ParserEngine.TOKENIZER
+
+# Precompiled patterns used by the tokenizer, equivalent to the ones that
+# ParsedLine compiles for every line
+TAG_PATTERN: Final = re.compile(r"^\[(META|ROLE) .*\]$")
+META_TAG_PATTERN: Final = re.compile(r"^\[META( [A-Z]+)? (.*)\]$")
+PROPERTY_PATTERN: Final = re.compile(r"([a-z_]+)=([ .\-:_a-z0-9]+)")
+ROLE_TAG_PATTERN: Final = re.compile(r"^\[ROLE ([A-Z]+)(.*)\]$")
+MODEL_PATTERN: Final = re.compile(r"model=([.-_a-z0-9]+)")
+
+# Upper bound of characters read while looking for the end of the header
+MAX_HEADER_LENGTH: Final = 8192
+
+
 def deserialize_into_conversation_object(
     conversation_text: ConversationText,
     *,
     preserve_model: bool = False,
     check_model_exists: bool = True,
+    engine: ParserEngine = DEFAULT_PARSER_ENGINE,
+) -> Conversation:
+    """Builds a Conversation (header and messages) from its serialized text"""
+    if engine is ParserEngine.LEGACY:
+        return _legacy_deserialize_into_conversation_object(
+            conversation_text,
+            preserve_model=preserve_model,
+            check_model_exists=check_model_exists,
+        )
+    tokenizer = ConversationTokenizer(
+        preserve_model=preserve_model, check_model_exists=check_model_exists
+    )
+    tokenizer.scan(conversation_text)
+    return tokenizer.build_conversation()
+
+
+def deserialize_conversation_text_into_messages(
+    conversation_text: ConversationText,
+    *,
+    preserve_model: bool = False,
+    check_model_exists: bool = True,
+    engine: ParserEngine = DEFAULT_PARSER_ENGINE,
+) -> list[CompleteMessage]:
+    """Builds the list of messages from a serialized conversation"""
+    if engine is ParserEngine.LEGACY:
+        return _legacy_deserialize_conversation_text_into_messages(
+            conversation_text,
+            preserve_model=preserve_model,
+            check_model_exists=check_model_exists,
+        )
+    tokenizer = ConversationTokenizer(
+        preserve_model=preserve_model, check_model_exists=check_model_exists
+    )
+    tokenizer.scan(conversation_text, parse_header=False)
+    return tokenizer.messages
+
+
+def deserialize_conversation_header(
+    chunks: Iterable[str], *, max_length: int = MAX_HEADER_LENGTH
+) -> ConversationHeader:
+    """
+    Parses only the leading META block of a conversation text received in chunks,
+    stopping at the first ROLE tag.
+    """
+    header = ConversationHeaderBuilder()
+    for line in _iter_header_lines(chunks, max_length):
+        if line.startswith("[") and TAG_PATTERN.match(line):
+            if line.startswith("[ROLE"):
+                break
+            header.add_property(*parse_meta_tag(line))
+    return header.build_header()
+
+
+def _iter_header_lines(chunks: Iterable[str], max_length: int) -> Iterator[str]:
+    pending = ""
+    read_length = 0
+    for chunk in chunks:
+        lines = (pending + chunk).split("\n")
+        pending = lines.pop()
+        yield from lines
+        read_length += len(chunk)
+        if read_length > max_length:
+            raise ValueError(f"Header longer than {max_length} characters")
+    yield pending
+
+
+class ConversationHeaderBuilder:
+    """Accumulates the META properties of a conversation, validating them"""
+
+    def __init__(self) -> None:
+        self.conversation_id: ConversationId | None = None
+        self.number_of_messages: int | None = None
+        self.current_time: str | None = None
+
+    def add_property(self, key: str, value: str) -> None:
+        if key == "id":
+            assert not self.conversation_id
+            self.conversation_id = ConversationId(value)
+        elif key == "schema_version":
+            assert value == SCHEMA_VERSION
+        elif key == "number_of_messages":
+            assert self.number_of_messages is None
+            assert value.isdigit()
+            self.number_of_messages = int(value)
+        elif key == "current_time":
+            assert self.current_time is None
+            self.current_time = value
+        else:
+            raise ValueError(f"Key {key} not recognized")
+
+    def build_header(self) -> ConversationHeader:
+        assert self.conversation_id
+        assert self.number_of_messages is not None
+        assert self.current_time
+        return ConversationHeader(
+            self.conversation_id,
+            SCHEMA_VERSION,
+            self.number_of_messages,
+            self.current_time,
+        )
+
+
+class ConversationTokenizer:
+    """
+    Deserializes a conversation text in a single scan of its lines, building
+    the header and the messages at the same time.
+    """
+
+    def __init__(
+        self, *, preserve_model: bool = False, check_model_exists: bool = True
+    ) -> None:
+        self._preserve_model = preserve_model
+        self._check_model_exists = check_model_exists
+        self._models_by_name: dict[ModelName, Model] | None = None
+        self.header = ConversationHeaderBuilder()
+        self.messages: list[CompleteMessage] = []
+
+    def scan(
+        self, conversation_text: ConversationText, *, parse_header: bool = True
+    ) -> None:
+        assert conversation_text.schema_version == SCHEMA_VERSION
+        role_info: RoleInfo | None = None
+        content_lines: list[str] = []
+        for line in conversation_text.text.split("\n"):
+            # cheap check first: most lines are message content
+            if line.startswith("[") and TAG_PATTERN.match(line):
+                if line.startswith("[ROLE"):
+                    if role_info:
+                        self._add_message(role_info, content_lines)
+                    role_info = parse_role_tag(line)
+                    content_lines = []
+                    continue
+                if parse_header:
+                    self.header.add_property(*parse_meta_tag(line))
+            if role_info:
+                content_lines.append(line)
+        if role_info:
+            self._add_message(role_info, content_lines)
+
+    def build_conversation(self) -> Conversation:
+        header = self.header
+        assert header.conversation_id
+        assert header.number_of_messages
+        assert header.current_time
+        return Conversation(
+            header.conversation_id,
+            SCHEMA_VERSION,
+            header.number_of_messages,
+            header.current_time,
+            self.messages,
+        )
+
+    def _add_message(self, role_info: RoleInfo, content_lines: list[str]) -> None:
+        chat_message = ChatMessage(
+            role=role_info.role,
+            content="\n".join(content_lines).strip(),
+        )
+        model = None
+        if self._preserve_model and role_info.model_name:
+            model = self._determine_model(role_info.model_name)
+        self.messages.append(CompleteMessage(chat_msg=chat_message, model=model))
+
+    def _determine_model(self, model_name: ModelName) -> Model:
+        if self._models_by_name is None:
+            self._models_by_name = {}
+            for model in get_models():
+                self._models_by_name.setdefault(model.model_name, model)
+        if found_model := self._models_by_name.get(model_name):
+            return found_model
+        if self._check_model_exists:
+            raise ValueError(f"Model not found: {model_name}")
+        return Model(None, model_name)
+
+
+def parse_meta_tag(line: str) -> tuple[str, str]:
+    """Returns the (key, value) property of a META tag line"""
+    match = META_TAG_PATTERN.match(line)
+    if not match:
+        raise ValueError(line)
+    property_match = PROPERTY_PATTERN.match(match.group(2).strip())
+    if not property_match:
+        raise ValueError(line)
+    return (property_match.group(1), property_match.group(2))
+
+
+def parse_role_tag(line: str) -> RoleInfo:
+    """Returns the role and the optional model name of a ROLE tag line"""
+    match = ROLE_TAG_PATTERN.match(line)
+    if not match:
+        raise ValueError(ROLE_TAG_PATTERN)
+    first = match.group(1)
+    if (role := first.lower()) not in possible_roles:
+        raise ValueError("Role unknown: " + first)
+    second = match.group(2).strip()
+    if not second:
+        return RoleInfo(role)
+    model_match = MODEL_PATTERN.match(second)
+    if not model_match:
+        raise ValueError(second)
+    return RoleInfo(role, ModelName(model_match.group(1)))
+
+
+def _legacy_deserialize_into_conversation_object(
+    conversation_text: ConversationText,
+    *,
+    preserve_model: bool = False,
+    check_model_exists: bool = True,
 ) -> Conversation:
     conversation_id = None
     number_of_messages = None
@@ -131,7 +359,7 @@ def deserialize_into_conversation_object(
         SCHEMA_VERSION,
         number_of_messages,
         current_time,
-        deserialize_conversation_text_into_messages(
+        _legacy_deserialize_conversation_text_into_messages(
             conversation_text,
             preserve_model=preserve_model,
             check_model_exists=check_model_exists,
@@ -139,7 +367,7 @@ def deserialize_into_conversation_object(
     )
 
 
-def deserialize_conversation_text_into_messages(
+def _legacy_deserialize_conversation_text_into_messages(
     conversation_text: ConversationText,
     *,
     preserve_model: bool = False,
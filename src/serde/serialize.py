@@ -6,6 +6,11 @@ from .deserialize import TagType
 from .shared import SCHEMA_VERSION
 
 NUMBER_OF_DIGITS = 4
+# Digits of the ids used by the sharded storage layout
+WIDE_NUMBER_OF_DIGITS = 8
+# Width of the zero-padded message count, so it can be patched in place
+NUMBER_OF_MESSAGES_WIDTH = 6
+NUMBER_OF_MESSAGES_KEY = "number_of_messages"
 
 
 class SerializedConversationBuilder:
@@ -32,27 +37,68 @@ def serialize_conversation(
     complete_messages: Sequence[CompleteMessage],
     conversation_id: ConversationId,
     current_time: str,
+    *,
+    fixed_width_count: bool = False,
 ) -> str:
     number_of_messages = len(complete_messages)
     builder = SerializedConversationBuilder()
     builder.add_meta_tag("id", conversation_id)
     builder.add_line_break()
     builder.add_meta_tag("schema_version", SCHEMA_VERSION)
-    builder.add_meta_tag("number_of_messages", number_of_messages)
+    builder.add_meta_tag(
+        NUMBER_OF_MESSAGES_KEY,
+        (
+            format_number_of_messages(number_of_messages)
+            if fixed_width_count
+            else number_of_messages
+        ),
+    )
     builder.add_meta_tag("current_time", current_time)
+    add_messages(builder, complete_messages)
+    return builder.build()
+
+
+def serialize_messages(complete_messages: Sequence[CompleteMessage]) -> str:
+    """Serializes messages to be appended to an already serialized conversation"""
+    builder = SerializedConversationBuilder()
+    add_messages(builder, complete_messages)
+    return "\n" + builder.build() if complete_messages else ""
+
+
+def add_messages(
+    builder: SerializedConversationBuilder,
+    complete_messages: Sequence[CompleteMessage],
+) -> None:
     for complete_message in complete_messages:
         builder.add_line_break()
         builder.add_role_tag(complete_message)
         message = complete_message.chat_msg
         assert isinstance(message.content, str)
         builder.add_text(message.content)
-    return builder.build()
 
 
-def convert_digits_to_conversation_id(string: str) -> ConversationId:
-    if not string.isdigit() or len(string) > NUMBER_OF_DIGITS:
+def format_number_of_messages(number_of_messages: int) -> str:
+    formatted = str(number_of_messages).zfill(NUMBER_OF_MESSAGES_WIDTH)
+    assert len(formatted) == NUMBER_OF_MESSAGES_WIDTH, number_of_messages
+    return formatted
+
+
+def find_number_of_messages_offset(conversation_as_text: str) -> int:
+    """Returns the position of the message count value in a serialized conversation"""
+    tag_start = create_meta_tag(NUMBER_OF_MESSAGES_KEY, "")[:-1]
+    return conversation_as_text.index(tag_start) + len(tag_start)
+
+
+def convert_digits_to_conversation_id(
+    string: str, *, number_of_digits: int = NUMBER_OF_DIGITS, max_digits: int = 0
+) -> ConversationId:
+    """
+    Pads the digits to number_of_digits. Longer strings are only accepted up to
+    max_digits (when greater than number_of_digits).
+    """
+    if not string.isdigit() or len(string) > max(number_of_digits, max_digits):
         raise ValueError(f'"{string} "no pudo convertirse en un ConversationId')
-    return cast(ConversationId, string.zfill(NUMBER_OF_DIGITS))
+    return cast(ConversationId, string.zfill(number_of_digits))
 
 
 def create_role_tag(complete_message: CompleteMessage) -> str:
@@ -13,3 +13,13 @@ class Conversation:
     number_of_messages: int
     current_time: str
     messages: Sequence[CompleteMessage]
+
+
+@dataclass(frozen=True)
+class ConversationHeader:
+    """Metadata stored in the META tags at the top of a conversation file"""
+
+    id: ConversationId
+    schema_version: SchemaVersionId
+    number_of_messages: int
+    current_time: str
@@ -1,2 +1,51 @@
 # settings
 QUERY_NUMBER_LIMIT_WARNING = 5
+# maximum number of queries of a `/for` sent to the model at the same time
+# (1 to send them one after another)
+CONCURRENT_QUERIES_LIMIT = 4
+# show the answers of a `/for` as they arrive instead of in the original order
+SHOW_ANSWERS_AS_COMPLETED = False
+# print the answers while they are generated (not used for the queries of a
+# `/for` answered concurrently)
+STREAM_RESPONSES = False
+# reuse the stored answer when the same messages are sent again to the same model
+# with the same options (`/nocache` skips it for one query)
+USE_COMPLETION_CACHE = False
+COMPLETION_CACHE_TTL_SECONDS = 7 * 24 * 3600
+COMPLETION_CACHE_MAX_SIZE = 50 * 1024 * 1024
+# requests and tokens per minute sent to each platform, the queries wait when
+# they are exceeded
+MISTRAL_REQUESTS_PER_MINUTE = 60
+MISTRAL_TOKENS_PER_MINUTE = 500_000
+OPENAI_REQUESTS_PER_MINUTE = 90
+OPENAI_TOKENS_PER_MINUTE = 30_000
+# safety limit against queries sent without control due to a bug: more queries
+# than this in the period fail instead of waiting (it is raised to what the rate
+# limits let through, so the paced queries of a long `/for` never reach it)
+RUNAWAY_GUARD_MAX_QUERIES = 100
+RUNAWAY_GUARD_PERIOD_SECONDS = 60
+# transient failures of the APIs (connection errors, rate limits and errors of
+# the servers) are retried with exponential backoff while attempts and time are left
+RETRY_MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY_SECONDS = 1
+RETRY_MAX_DELAY_SECONDS = 30
+REQUEST_DEADLINE_SECONDS = 120
+# open the connection to OpenAI while the model is being chosen, so the first
+# query does not wait for the handshakes (the Mistral SDK has its own pool)
+WARM_UP_CONNECTIONS = True
+# strategies applied in order to the conversation sent to the model when it
+# exceeds the token budget of the model (see `src/models/context_window.py`),
+# the conversation is saved complete; empty to always send it complete
+CONTEXT_STRATEGIES = ("drop_tool_outputs", "system_prompt_and_recent")
+# level of the logs written in `logs/`, "DEBUG" also writes the messages sent to
+# and received from the APIs (formatted in the background, long values are cut)
+LOG_LEVEL = "INFO"
+# store chats in subdirectories with 8 digits ids (migrate existing chats with
+# `python -m src.infrastructure.chat_repository.migration` before enabling it)
+USE_SHARDED_CHATS_STORAGE = False
+# store chats in a SQLite database in the data directory (import existing chats
+# with `python -m src.infrastructure.chat_repository.sqlite_import`)
+USE_SQLITE_CHATS_STORAGE = False
+# save the conversations in a background thread, the prompt does not wait for
+# the disk (pending saves are written before exiting)
+USE_WRITE_BEHIND_SAVES = True
@@ -1,3 +1,4 @@
+import math
 from collections.abc import Sequence
 
 from src.python_modules.FileSystemWrapper.file_manager import FileManager
@@ -5,14 +6,55 @@ from src.python_modules.FileSystemWrapper.file_manager import FileManager
 from src.command_handler import CommandHandler
 from src.controllers.command_interpreter import CommandInterpreter
 from src.controllers.select_model import SelectModelController
-from src.domain import Model
+from src.domain import Model, Platform
 from src.engine import MainEngine
+from src.infrastructure.chat_repository.conversation_log import SaveMode
+from src.infrastructure.chat_repository.implementer import DataLocation
+from src.infrastructure.chat_repository.layout import StorageLayout
 from src.infrastructure.chat_repository.repository import ChatRepository
+from src.infrastructure.chat_repository.sqlite_repository import (
+    SqliteChatRepository,
+)
+from src.infrastructure.chat_repository.write_behind import (
+    WriteBehindChatRepository,
+)
+from src.infrastructure.llm_connection.completion_cache import (
+    CachingClientWrapper,
+    CompletionCache,
+)
+from src.infrastructure.llm_connection.rate_limiter import (
+    RateLimiter,
+    RateLimits,
+    RunawayGuard,
+)
+from src.infrastructure.llm_connection.retry_policy import Retrier, RetryPolicy
 from src.infrastructure.main_path_provider import get_main_directory
 from src.infrastructure.now import TimeManager
 from src.llm_manager import LLM_Manager
 from src.model_manager import ModelManager
-from src.protocols import ClientWrapperProtocol
+from src.models.context_window import build_context_manager
+from src.models_data import context_token_budgets
+from src.protocols import ChatRepositoryProtocol, ClientWrapperProtocol
+from src.settings import (
+    COMPLETION_CACHE_MAX_SIZE,
+    COMPLETION_CACHE_TTL_SECONDS,
+    CONTEXT_STRATEGIES,
+    MISTRAL_REQUESTS_PER_MINUTE,
+    MISTRAL_TOKENS_PER_MINUTE,
+    OPENAI_REQUESTS_PER_MINUTE,
+    OPENAI_TOKENS_PER_MINUTE,
+    REQUEST_DEADLINE_SECONDS,
+    RETRY_BASE_DELAY_SECONDS,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_MAX_DELAY_SECONDS,
+    RUNAWAY_GUARD_MAX_QUERIES,
+    RUNAWAY_GUARD_PERIOD_SECONDS,
+    USE_COMPLETION_CACHE,
+    USE_SHARDED_CHATS_STORAGE,
+    USE_SQLITE_CHATS_STORAGE,
+    USE_WRITE_BEHIND_SAVES,
+    WARM_UP_CONNECTIONS,
+)
 from src.view.view import View
 
 
@@ -20,15 +62,18 @@ def setup_engine(
     models: Sequence[Model], client_wrapper: ClientWrapperProtocol
 ) -> MainEngine:
     """Returns a default MainEngine"""
-    select_model_controler = SelectModelController(models)
-    chat_repository = ChatRepository(
-        get_main_directory(),
-        file_manager=FileManager(),
-        time_manager=TimeManager(),
+    select_model_controler = SelectModelController(
+        models, warm_up=client_wrapper.warm_up if WARM_UP_CONNECTIONS else None
     )
+    chat_repository = build_chat_repository()
     view = View(TimeManager())
     command_interpreter = CommandInterpreter()
-    model_manager = ModelManager(client_wrapper)
+    if USE_COMPLETION_CACHE:
+        client_wrapper = build_caching_client_wrapper(client_wrapper)
+    model_manager = ModelManager(
+        client_wrapper,
+        build_context_manager(CONTEXT_STRATEGIES, context_token_budgets),
+    )
     llm_manager = LLM_Manager(chat_repository, model_manager)
     command_handler = CommandHandler(
         view=view,
@@ -36,3 +81,78 @@ def setup_engine(
         llm_manager=llm_manager,
     )
     return MainEngine(models, command_interpreter, command_handler, view)
+
+
+def build_caching_client_wrapper(
+    client_wrapper: ClientWrapperProtocol,
+) -> ClientWrapperProtocol:
+    file_manager = FileManager()
+    data_location = DataLocation(get_main_directory())
+    file_manager.mkdir_if_not_exists(data_location.data_dir)
+    cache = CompletionCache(
+        file_manager,
+        data_location.completion_cache_dir,
+        ttl_seconds=COMPLETION_CACHE_TTL_SECONDS,
+        max_size=COMPLETION_CACHE_MAX_SIZE,
+    )
+    return CachingClientWrapper(client_wrapper, cache)
+
+
+def build_rate_limiter() -> RateLimiter:
+    return RateLimiter(
+        {
+            Platform.Mistral: RateLimits(
+                MISTRAL_REQUESTS_PER_MINUTE, MISTRAL_TOKENS_PER_MINUTE
+            ),
+            Platform.OpenAI: RateLimits(
+                OPENAI_REQUESTS_PER_MINUTE, OPENAI_TOKENS_PER_MINUTE
+            ),
+        }
+    )
+
+
+def build_runaway_guard(rate_limiter: RateLimiter) -> RunawayGuard:
+    """The limit is raised to what the rate limiter lets through in the period"""
+    max_requests = rate_limiter.max_requests(RUNAWAY_GUARD_PERIOD_SECONDS)
+    return RunawayGuard(
+        max(RUNAWAY_GUARD_MAX_QUERIES, math.ceil(max_requests)),
+        RUNAWAY_GUARD_PERIOD_SECONDS,
+    )
+
+
+def build_retrier() -> Retrier:
+    return Retrier(
+        RetryPolicy(
+            max_attempts=RETRY_MAX_ATTEMPTS,
+            base_delay_seconds=RETRY_BASE_DELAY_SECONDS,
+            max_delay_seconds=RETRY_MAX_DELAY_SECONDS,
+            deadline_seconds=REQUEST_DEADLINE_SECONDS,
+        )
+    )
+
+
+def build_chat_repository() -> ChatRepositoryProtocol:
+    """Returns the chat repository selected in settings"""
+    repository = build_storage_repository()
+    if USE_WRITE_BEHIND_SAVES:
+        return WriteBehindChatRepository(repository)
+    return repository
+
+
+def build_storage_repository() -> ChatRepositoryProtocol:
+    if USE_SQLITE_CHATS_STORAGE:
+        return SqliteChatRepository(
+            get_main_directory(),
+            file_manager=FileManager(),
+            time_manager=TimeManager(),
+            save_mode=SaveMode.APPEND,
+        )
+    return ChatRepository(
+        get_main_directory(),
+        file_manager=FileManager(),
+        time_manager=TimeManager(),
+        save_mode=SaveMode.APPEND,
+        storage_layout=(
+            StorageLayout.SHARDED if USE_SHARDED_CHATS_STORAGE else StorageLayout.FLAT
+        ),
+    )
@@ -1,25 +1,39 @@
 # TODO: prevent this file to be mutated
+import atexit
 import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from pprint import pformat
 
 from src.infrastructure.main_path_provider import get_main_directory
 
+# los valores mayores se recortan al escribirse en el log
+MAX_LOGGED_CHARS = 5_000  # pragma: no mutate
+
+_configured_loggers: list[logging.Logger] = []
+# level of the loggers configured without one, set_log_level changes it
+_log_level: int | str = logging.DEBUG
+_queue_handler: "DeferredQueueHandler | None" = None
+_lock = threading.Lock()
+
 
 # Funcion para configurar un logger y enviar su salida a un archivo
-def configure_logger(name: str, level: int = logging.DEBUG) -> logging.Logger:
+def configure_logger(name: str, level: int | None = None) -> logging.Logger:
     log_file_name = f"{name}.log"
     # Crea un logger especifico
     logger = logging.getLogger(name)
     logger.propagate = False  # Evita la propagacion al logger raiz
-    logger.setLevel(level)  # Establece el nivel del logger
+    # Establece el nivel del logger, los modulos importados despues de
+    # set_log_level tambien usan el nivel elegido
+    logger.setLevel(_log_level if level is None else level)
 
     # Crea un FileHandler especifico para escribir en un archivo
     path = Path(get_main_directory()) / "logs"  # pragma: no mutate
     if not path.exists():
         path.mkdir()
     file_handler = logging.FileHandler(path / log_file_name, encoding="utf-8")
-    file_handler.setLevel(level)  # Establece el nivel del FileHandler
 
     # Crea un formateador y anadelo al FileHandler
     formatter = logging.Formatter(
@@ -27,13 +41,103 @@ def configure_logger(name: str, level: int = logging.DEBUG) -> logging.Logger:
     )
     file_handler.setFormatter(formatter)
 
-    # Anade el FileHandler al logger
-    logger.addHandler(file_handler)
+    # Los registros se escriben en un hilo en segundo plano
+    queue_handler = get_queue_handler()
+    queue_handler.file_handlers.add(name, file_handler)
+    logger.addHandler(queue_handler)
+    _configured_loggers.append(logger)
     logger.info("\n")
     logger.info("START")
 
     return logger
 
 
-def format_var(name: str, obj: object) -> str:
-    return name + "=" + pformat(obj, width=120)
+def set_log_level(level: int | str) -> None:
+    """Changes the level of the loggers configured and of the ones to come"""
+    global _log_level
+    _log_level = level
+    for logger in _configured_loggers:
+        logger.setLevel(level)
+
+
+class LazyVar:
+    """
+    Formats the variable only if the record is written, in the thread of the
+    logs. A list is copied (not its items), so appending to it later does not
+    change what is logged; other variables must not be modified after logging.
+    """
+
+    def __init__(self, name: str, obj: object, max_chars: int = MAX_LOGGED_CHARS):
+        self._name = name
+        self._obj = list(obj) if isinstance(obj, list) else obj
+        self._max_chars = max_chars
+
+    def __str__(self) -> str:
+        return (
+            self._name + "=" + truncate(pformat(self._obj, width=120), self._max_chars)
+        )
+
+
+def format_var(name: str, obj: object) -> LazyVar:
+    return LazyVar(name, obj)
+
+
+def truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}... ({len(text) - max_chars} caracteres omitidos)"
+
+
+class FileHandlersByLogger(logging.Handler):
+    """Sends every record to the file of its logger"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._file_handlers: dict[str, logging.Handler] = {}
+
+    def add(self, name: str, file_handler: logging.Handler) -> None:
+        self._file_handlers[name] = file_handler
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if file_handler := self._file_handlers.get(record.name):
+            file_handler.handle(record)
+
+    def close(self) -> None:
+        for file_handler in self._file_handlers.values():
+            file_handler.close()
+        super().close()
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Unlike QueueHandler, the message is not formatted before queuing the record,
+    so the formatting is also done by the thread of the logs
+    """
+
+    def __init__(self) -> None:
+        super().__init__(queue.SimpleQueue())
+        self.file_handlers = FileHandlersByLogger()
+        self.listener = QueueListener(self.queue, self.file_handlers)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def get_queue_handler() -> DeferredQueueHandler:
+    global _queue_handler
+    with _lock:
+        if _queue_handler is None:
+            _queue_handler = DeferredQueueHandler()
+            _queue_handler.listener.start()
+            # escribe los registros pendientes al salir
+            atexit.register(stop_logging)
+        return _queue_handler
+
+
+def stop_logging() -> None:
+    global _queue_handler
+    with _lock:
+        if _queue_handler is not None:
+            _queue_handler.listener.stop()
+            _queue_handler.file_handlers.close()
+            _queue_handler = None
@@ -3,7 +3,7 @@ from abc import ABC, abstractmethod
 from src.domain import CompleteMessage
 from src.models.model_wrapper import ModelWrapper
 from src.models.shared import define_system_prompt
-from src.protocols import ViewProtocol
+from src.protocols import ChatRepositoryProtocol, ViewProtocol
 from src.view import Raw
 
 
@@ -24,6 +24,19 @@ class EstablishSystemPromptAction(ActionStrategy):
         self._view.write_object("System prompt established")
 
 
+class SearchConversationsAction(ActionStrategy):
+    def __init__(self, view: ViewProtocol, repository: ChatRepositoryProtocol):
+        self._view = view
+        self._repository = repository
+
+    def execute(self, remaining_input: str) -> None:
+        if not remaining_input.strip():
+            self._view.show_error_msg(Raw("Indica el texto a buscar"))
+            return
+        results = self._repository.search_conversations(remaining_input)
+        self._view.display_search_results(results)
+
+
 class ShowModelAction(ActionStrategy):
     def __init__(self, view: ViewProtocol, model_wrapper: ModelWrapper):
         self._view = view
@@ -2,16 +2,28 @@ import time
 from typing import TYPE_CHECKING, Final, Mapping, Sequence
 
 from rich import print
-from rich.console import Console
-from rich.markdown import Markdown
 
-from src.domain import ChatMessage, ConversationId, ConversationText, ModelName
+from src.domain import (
+    ChatMessage,
+    ConversationId,
+    ConversationText,
+    ModelName,
+    SearchResult,
+)
 from src.models.placeholders import Placeholder
 from src.protocols import TimeManagerProtocol
 
-from .io_helpers import SimpleView, display_neutral_msg, show_error_msg
+from .io_helpers import (
+    SimpleView,
+    display_neutral_msg,
+    escape_for_rich,
+    show_error_msg,
+)
 from .string_types import EscapedStr, Raw
-from .views import get_interaction_styled_view
+from .views import (
+    get_interaction_styled_view,
+    get_streamed_interaction_styled_view,
+)
 
 HELP_TEXT = """
 ## Consultas
@@ -21,14 +33,20 @@ Ejemplo: `¿Quién fue $0persona y que hizo en el ámbito de $0tema?` El program
 
 Si empiezas el contenido de un placeholder con `/for` y pones las variantes separadas por comas, se generará una consulta con cada variante. Por ejemplo, si en la pregunta anterior introduces como valor de $0persona `/for Alexander Flemming,Albert Einstein` se generarán 2 consultas, una para cada nombre introducido.
 
+Si usas `/for` en varios placeholders se generará una consulta para cada combinación de sus valores. Con `/zip` en lugar de `/for`, los placeholders toman sus valores a la vez: `/zip Fleming,Einstein` en $0persona y `/zip medicina,física` en $0tema generan 2 consultas.
+
+Los valores también pueden leerse de un fichero, línea a línea: `/for @nombres.csv:columna`, `/for @datos.jsonl:campo` o `/for @lista.txt` (un valor por línea). `/for range(1,1000)` genera los números del 1 al 999.
+
 ### Comandos
 - Para empezar una nueva conversación en lugar de seguir con la actual, usa el comando `/new` al inicio de tu consulta.
 - Puedes iniciar tu consulta con `/d` o `/debug` para activar el modo depuración.
+- Inicia tu consulta con `/nocache` para pedir una nueva respuesta al modelo aunque haya una guardada en la caché de respuestas.
 - Usa `/show` para ver cuál es el modelo actual.
 - Usa `/change` para cambiar el modelo.
 - Usa `/sys <prompt>` o `/system <prompt>` para establecer un nuevo prompt de sistema. Esto iniciará una nueva conversación.
 - Usa `/load <id>` para cargar una conversación desde el directorio de datos.
 - Usa `/load_msgs <id>` para cargar una conversación desde el directorio de datos obteniendo una vista de los mensajes.
+- Usa `/search <texto>` para buscar entre las conversaciones guardadas. Se muestran sus ids con un fragmento del texto encontrado.
 - Usa `/h` o `/help` para mostrar esta ayuda.
 - Usa `/q`, `/quit` o `/exit` para salir del programa.
 """
@@ -60,6 +78,23 @@ class View:
             get_interaction_styled_view(self._time_manager, model_name, query, content)
         )
 
+    def start_streamed_interaction(self, model_name: ModelName, query: Raw) -> None:
+        """Prints the interaction up to the model label, the response follows"""
+        print(
+            get_streamed_interaction_styled_view(self._time_manager, model_name, query),
+            end="",
+        )
+
+    def print_response_delta(self, delta: Raw) -> None:
+        print(escape_for_rich(delta), end="", flush=True)
+
+    def end_streamed_interaction(self, time_to_first_token: float | None) -> None:
+        print()
+        if time_to_first_token is not None:
+            self.display_neutral_msg(
+                Raw(f"Primer token en {time_to_first_token:.2f} s")
+            )
+
     def input_extra_line(self) -> tuple[str, float]:
         prev_time = time.time()
         line = input()
@@ -67,6 +102,10 @@ class View:
         return line, elapsed
 
     def show_help(self) -> None:
+        # loaded here, rendering markdown is only needed for the help
+        from rich.console import Console
+        from rich.markdown import Markdown
+
         console = Console()
         markdown = Markdown(HELP_TEXT)
         console.print(markdown, width=60)
@@ -127,6 +166,15 @@ class View:
         text = define_processing_query_text(current=current, total=total)
         self.write_object(text)
 
+    def display_search_results(self, results: Sequence[SearchResult]) -> None:
+        if not results:
+            self.display_neutral_msg(Raw("No se han encontrado conversaciones"))
+            return
+        for result in results:
+            self.simple_view.print(
+                escape_for_rich(Raw(f"{result.conversation_id}: {result.snippet}"))
+            )
+
     def show_error_msg(self, text: EscapedStr | Raw) -> None:
         show_error_msg(text)
 
@@ -15,6 +15,13 @@ def get_interaction_styled_view(
     return "\n".join("\n" + text for text in [time_repr, user_repr, model_repr])
 
 
+def get_streamed_interaction_styled_view(
+    time_manager: TimeManagerProtocol, model: ModelName, query: Raw
+) -> str:
+    """Same as get_interaction_styled_view, without the content of the response"""
+    return get_interaction_styled_view(time_manager, model, query, Raw(""))
+
+
 def _get_model_repr(model: ModelName, content: Raw) -> str:
     role_model_repr = highlight_role(Raw(model.upper() + ": "))
     return role_model_repr + escape_for_rich(content)
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from collections.abc import Iterator
+
+import pytest
+
+from benchmarks.stub_server import StubConfig, StubServer
+from src.domain import CompleteMessage, Model, ModelName, Platform, QueryResult
+from src.infrastructure.exceptions import ClientNotDefined, LLMChatException
+from src.infrastructure.llm_connection import AsyncClientWrapper
+from src.models.messages_ops import add_user_query_in_place
+from tests.objects import COMPLETE_MESSAGES_1
+
+MISTRAL_MODEL = Model(Platform.Mistral, ModelName("mistral-small"))
+OPENAI_MODEL = Model(Platform.OpenAI, ModelName("gpt-4o"))
+
+
+class RecordsHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # formats the lazy variables, as the thread of the logs does
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def stub_server() -> Iterator[StubServer]:
+    with StubServer(StubConfig(seed=0)) as stub_server:
+        yield stub_server
+
+
+def create_client_wrapper(stub_server: StubServer) -> AsyncClientWrapper:
+    return AsyncClientWrapper(
+        mistral_api_key="key",
+        openai_api_key="key",
+        mistral_base_url=stub_server.mistral_base_url,
+        openai_base_url=stub_server.openai_base_url,
+    )
+
+
+def create_messages(query: str) -> list[CompleteMessage]:
+    messages: list[CompleteMessage] = []
+    add_user_query_in_place(messages, query)
+    return messages
+
+
+async def answer_queries(
+    client_wrapper: AsyncClientWrapper, model: Model, queries: list[str]
+) -> list[QueryResult]:
+    try:
+        return await asyncio.gather(
+            *(
+                client_wrapper.get_simple_response(model, create_messages(query))
+                for query in queries
+            )
+        )
+    finally:
+        await client_wrapper.close()
+
+
+def test_missing_clients_are_reported() -> None:
+    client_wrapper = AsyncClientWrapper(mistral_api_key="key")
+    openai_model = Model(Platform.OpenAI, ModelName("gpt-4o"))
+
+    with pytest.raises(ClientNotDefined):
+        asyncio.run(
+            client_wrapper.get_simple_response(openai_model, list(COMPLETE_MESSAGES_1))
+        )
+    with pytest.raises(LLMChatException, match="random_seed"):
+        asyncio.run(
+            client_wrapper.get_simple_response(
+                openai_model, list(COMPLETE_MESSAGES_1), random_seed=1
+            )
+        )
+    asyncio.run(client_wrapper.close())
+
+
+@pytest.mark.parametrize("model", [MISTRAL_MODEL, OPENAI_MODEL])
+def test_completions_are_gathered(stub_server: StubServer, model: Model) -> None:
+    client_wrapper = create_client_wrapper(stub_server)
+    queries = ["Hola", "¿Qué tal?", "Adiós"]
+
+    query_results = asyncio.run(answer_queries(client_wrapper, model, queries))
+
+    assert [query_result.content for query_result in query_results] == [
+        f"Respuesta a: {query}" for query in queries
+    ]
+    for query, query_result in zip(queries, query_results):
+        user_msg, assistant_msg = query_result.messages
+        assert user_msg.chat_msg.content == query
+        assert assistant_msg.chat_msg.role == "assistant"
+        assert assistant_msg.chat_msg.content == query_result.content
+    assert stub_server.requests == len(queries)
+
+
+@pytest.mark.parametrize(
+    ("model", "logger_name", "logged_var"),
+    [
+        (
+            MISTRAL_MODEL,
+            "src.infrastructure.llm_connection.mistral_client_wrapper",
+            "mistral_chat_msg",
+        ),
+        (
+            OPENAI_MODEL,
+            "src.infrastructure.llm_connection.openai_client_wrapper",
+            "openai_messages",
+        ),
+    ],
+)
+def test_converted_messages_are_logged(
+    stub_server: StubServer, model: Model, logger_name: str, logged_var: str
+) -> None:
+    client_wrapper = create_client_wrapper(stub_server)
+    logger = logging.getLogger(logger_name)
+    handler = RecordsHandler()
+    level = logger.level
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    try:
+        asyncio.run(answer_queries(client_wrapper, model, ["Hola"]))
+    finally:
+        logger.removeHandler(handler)
+        logger.setLevel(level)
+
+    assert any(
+        message.startswith(f"{logged_var}=") and "Hola" in message
+        for message in handler.messages
+    )
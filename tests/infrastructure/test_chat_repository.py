@@ -1,13 +1,16 @@
-from pathlib import PurePath
+from pathlib import Path, PurePath
 from typing import Any
 from unittest.mock import MagicMock, Mock
 
+from src.python_modules.FileSystemWrapper.file_manager import FileManager
 from src.python_modules.FileSystemWrapper.file_manager_protocol import (
     FileManagerProtocol,
 )
 
+from src.domain import ConversationId
 from src.infrastructure.chat_repository.repository import ChatRepository
 from src.infrastructure.now import TimeManager
+from tests.objects import COMPLETE_MESSAGES_1
 
 
 def test_create_chat_repository_trigger_filesystem_setup() -> None:
@@ -34,3 +37,18 @@ def test_create_chat_repository_trigger_filesystem_setup() -> None:
     calls = file_manager_mock.mkdir_if_not_exists.mock_calls
     assert calls[0].args[0].name == "data"
     assert calls[1].args[0].name == "chats"
+
+
+def test_read_conversation_header(tmp_path: Path) -> None:
+    time_manager_mock = Mock(spec=TimeManager)
+    time_manager_mock.get_current_time.return_value = "2024-03-16 14:50:15"
+    repository = ChatRepository(
+        PurePath(tmp_path), file_manager=FileManager(), time_manager=time_manager_mock
+    )
+    repository.save_messages(COMPLETE_MESSAGES_1)
+
+    header = repository.read_conversation_header(ConversationId("0000"))
+
+    assert header.id == "0000"
+    assert header.number_of_messages == len(COMPLETE_MESSAGES_1)
+    assert header.current_time == "2024-03-16 14:50:15"
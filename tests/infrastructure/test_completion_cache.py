@@ -0,0 +1,131 @@
+import os
+from pathlib import Path, PurePath
+from unittest.mock import Mock
+
+from src.python_modules.FileSystemWrapper.file_manager import FileManager
+
+from src.domain import ChatMessage, CompleteMessage, Model, ModelName, Platform
+from src.infrastructure.llm_connection import ClientWrapper
+from src.infrastructure.llm_connection.client_wrapper import build_query_result
+from src.infrastructure.llm_connection.completion_cache import (
+    CachingClientWrapper,
+    CompletionCache,
+    build_cache_key,
+)
+
+MODEL = Model(Platform.Mistral, ModelName("mistral-small"))
+MESSAGES = [ChatMessage("user", "Hola")]
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def create_client_wrapper_mock() -> Mock:
+    def answer(
+        model: Model, complete_messages: list[CompleteMessage], **kwargs: object
+    ) -> object:
+        chat_msg = ChatMessage("assistant", f"Respuesta {len(mock.mock_calls)}")
+        return build_query_result(model, complete_messages, chat_msg)
+
+    mock = Mock(spec=ClientWrapper)
+    mock.get_simple_response.side_effect = answer
+    return mock
+
+
+def create_complete_messages() -> list[CompleteMessage]:
+    return [CompleteMessage(msg) for msg in MESSAGES]
+
+
+def test_repeated_query_is_answered_from_cache(tmp_path: Path) -> None:
+    inner = create_client_wrapper_mock()
+    cache = CompletionCache(FileManager(), PurePath(tmp_path))
+    client_wrapper = CachingClientWrapper(inner, cache)
+    deltas: list[str] = []
+
+    first = client_wrapper.get_simple_response(MODEL, create_complete_messages())
+    second = client_wrapper.get_simple_response(
+        MODEL, create_complete_messages(), on_delta=deltas.append
+    )
+
+    assert inner.get_simple_response.call_count == 1
+    assert not first.from_cache
+    assert second.from_cache
+    assert second.content == first.content
+    assert deltas == [first.content]
+    assert second.messages[-1].chat_msg == first.messages[-1].chat_msg
+
+
+def test_bypass_asks_the_model_and_refreshes_the_entry(tmp_path: Path) -> None:
+    inner = create_client_wrapper_mock()
+    client_wrapper = CachingClientWrapper(
+        inner, CompletionCache(FileManager(), PurePath(tmp_path))
+    )
+
+    client_wrapper.get_simple_response(MODEL, create_complete_messages())
+    fresh = client_wrapper.get_simple_response(
+        MODEL, create_complete_messages(), use_cache=False
+    )
+    cached = client_wrapper.get_simple_response(MODEL, create_complete_messages())
+
+    assert inner.get_simple_response.call_count == 2
+    assert not fresh.from_cache
+    assert cached.content == fresh.content
+
+
+def test_entries_expire(tmp_path: Path) -> None:
+    clock = FakeClock()
+    cache = CompletionCache(
+        FileManager(), PurePath(tmp_path), ttl_seconds=60, clock=clock
+    )
+    cache.put("key", ChatMessage("assistant", "Hola"))
+
+    clock.now += 59
+    assert cache.get("key") == ChatMessage("assistant", "Hola")
+    clock.now += 2
+    assert cache.get("key") is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_oldest_entries_are_evicted(tmp_path: Path) -> None:
+    # every entry takes 175 bytes, there is room for three
+    content = "x" * 100
+    cache = CompletionCache(
+        FileManager(), PurePath(tmp_path), max_size=600, clock=FakeClock()
+    )
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, ChatMessage("assistant", content))
+        os.utime(tmp_path / f"{key}.json", (i, i))
+
+    cache.put("d", ChatMessage("assistant", content))
+
+    assert cache.get("a") is None
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "b.json",
+        "c.json",
+        "d.json",
+    ]
+
+
+def test_cache_key_depends_on_every_option() -> None:
+    def key(**changes: object) -> str:
+        options: dict[str, object] = {
+            "model": MODEL,
+            "messages": MESSAGES,
+            "tools": None,
+            "tool_choice": "none",
+            "random_seed": None,
+        }
+        options.update(changes)
+        return build_cache_key(**options)  # type: ignore[arg-type]
+
+    assert key() == key()
+    assert key() != key(model=Model(Platform.OpenAI, ModelName("mistral-small")))
+    assert key() != key(messages=[ChatMessage("user", "Adiós")])
+    assert key() != key(tools=[{"type": "function"}])
+    assert key() != key(tool_choice="auto")
+    assert key() != key(random_seed=1)
@@ -0,0 +1,106 @@
+import os
+from pathlib import Path, PurePath
+from unittest.mock import Mock
+
+from src.python_modules.FileSystemWrapper.file_manager import FileManager
+from src.python_modules.FileSystemWrapper.file_manager_protocol import FileStats
+
+from src.domain import ConversationId, ConversationText
+from src.infrastructure.chat_repository.conversation_cache import (
+    CachedConversation,
+    ConversationCache,
+)
+from src.infrastructure.chat_repository.conversation_log import SaveMode
+from src.infrastructure.chat_repository.implementer import DataLocation
+from src.infrastructure.chat_repository.repository import ChatRepository
+from src.infrastructure.now import TimeManager
+from src.models.shared import extract_chat_messages
+from src.serde.shared import SCHEMA_VERSION
+from tests.objects import COMPLETE_MESSAGES_1, COMPLETE_MESSAGES_2
+
+
+def create_repository(
+    main_directory: Path, save_mode: SaveMode = SaveMode.NEW_FILE_PER_TURN
+) -> ChatRepository:
+    time_manager_mock = Mock(spec=TimeManager)
+    time_manager_mock.get_current_time.return_value = "2024-03-16 14:50:15"
+    return ChatRepository(
+        PurePath(main_directory),
+        file_manager=FileManager(),
+        time_manager=time_manager_mock,
+        save_mode=save_mode,
+    )
+
+
+def create_entry(text: str, mtime: float = 1.0) -> CachedConversation:
+    return CachedConversation(
+        FileStats(len(text), mtime), ConversationText(text, SCHEMA_VERSION)
+    )
+
+
+def test_cache_evicts_least_recently_used_by_size() -> None:
+    cache = ConversationCache(max_size=10)
+    first, second, third = (ConversationId(id_) for id_ in ["0000", "0001", "0002"])
+    cache.put(first, create_entry("aaaa"))
+    cache.put(second, create_entry("bbbb"))
+    assert cache.get(first, create_entry("aaaa").stats)
+    cache.put(third, create_entry("cccc"))
+
+    assert cache.size == 8
+    assert cache.get(second, create_entry("bbbb").stats) is None
+    assert cache.get(first, create_entry("aaaa").stats)
+    cache.put(second, create_entry("b" * 11))
+    assert cache.get(second, create_entry("b" * 11).stats) is None
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_cache_entry_is_invalid_when_stats_change() -> None:
+    cache = ConversationCache()
+    conversation_id = ConversationId("0000")
+    cache.put(conversation_id, create_entry("text"))
+
+    assert cache.get(conversation_id, FileStats(4, 2.0)) is None
+    assert cache.get(conversation_id, FileStats(4, 1.0)) is None
+    assert cache.size == 0
+
+
+def test_repository_reuses_parsed_conversation(tmp_path: Path) -> None:
+    repository = create_repository(tmp_path)
+    repository.save_messages(COMPLETE_MESSAGES_1)
+    conversation_id = ConversationId("0000")
+
+    first = repository.load_conversation(conversation_id)
+    second = repository.load_conversation(conversation_id)
+    text = repository.load_conversation_as_conversation_text(conversation_id)
+
+    assert first == second
+    assert extract_chat_messages(first) == extract_chat_messages(COMPLETE_MESSAGES_1)
+    assert first is not second
+    assert "How are you?" in text.text
+    assert (repository.cache.hits, repository.cache.misses) == (2, 1)
+
+
+def test_repository_reloads_changed_files(tmp_path: Path) -> None:
+    repository = create_repository(tmp_path, SaveMode.APPEND)
+    messages = list(COMPLETE_MESSAGES_1[:2])
+    repository.save_messages(messages)
+    conversation_id = ConversationId("0000")
+    loaded = repository.load_conversation(conversation_id)
+    assert extract_chat_messages(loaded) == extract_chat_messages(messages)
+
+    messages.extend(COMPLETE_MESSAGES_1[2:])
+    repository.save_messages(messages)
+    loaded = repository.load_conversation(conversation_id)
+    assert extract_chat_messages(loaded) == extract_chat_messages(COMPLETE_MESSAGES_1)
+
+    chat_path = Path(DataLocation(PurePath(tmp_path)).chats_dir) / "0000.chat"
+    stat_result = chat_path.stat()
+    chat_path.write_text(chat_path.read_text().replace("Hello", "Hallo"))
+    os.utime(chat_path, (stat_result.st_atime, stat_result.st_mtime + 10))
+    [first_message, *_] = repository.load_conversation(conversation_id)
+    assert first_message.chat_msg.content == "Hallo"
+    assert repository.cache.hits == 0
+
+    repository.save_messages(COMPLETE_MESSAGES_2)
+    loaded = repository.load_conversation(ConversationId("0001"))
+    assert extract_chat_messages(loaded) == extract_chat_messages(COMPLETE_MESSAGES_2)
@@ -0,0 +1,99 @@
+from collections.abc import Callable
+from pathlib import Path, PurePath
+from unittest.mock import Mock
+
+import pytest
+
+from src.python_modules.FileSystemWrapper.file_manager import FileManager
+
+from src.infrastructure.chat_repository.conversation_log import SaveMode
+from src.infrastructure.chat_repository.implementer import (
+    ChatRepositoryImplementer,
+    DataLocation,
+)
+from src.infrastructure.chat_repository.repository import ChatRepository
+from src.infrastructure.now import TimeManager
+from tests.objects import COMPLETE_MESSAGES_1
+
+
+def create_implementer(
+    main_directory: Path, file_manager: FileManager | None = None
+) -> ChatRepositoryImplementer:
+    data_location = DataLocation(PurePath(main_directory))
+    Path(data_location.chats_dir).mkdir(parents=True, exist_ok=True)
+    implementer = ChatRepositoryImplementer()
+    implementer.init(data_location, file_manager or FileManager())
+    return implementer
+
+
+def test_ids_are_claimed_and_persisted(tmp_path: Path) -> None:
+    implementer = create_implementer(tmp_path)
+
+    ids = [implementer.get_new_conversation_id() for _ in range(3)]
+
+    assert ids == ["0000", "0001", "0002"]
+    assert sorted(implementer.get_conversation_ids()) == ids
+    high_water_mark = DataLocation(PurePath(tmp_path)).last_conversation_id_path
+    assert Path(high_water_mark).read_text() == "2"
+
+
+def test_directory_is_only_scanned_on_first_use(tmp_path: Path) -> None:
+    file_manager = Mock(wraps=FileManager())
+    implementer = create_implementer(tmp_path, file_manager)
+
+    for _ in range(5):
+        implementer.get_new_conversation_id()
+
+    assert file_manager.get_children.call_count == 1
+
+
+def test_concurrent_allocators_never_share_ids(tmp_path: Path) -> None:
+    first = create_implementer(tmp_path)
+    second = create_implementer(tmp_path)
+
+    ids = []
+    for _ in range(3):
+        ids.append(first.get_new_conversation_id())
+        ids.append(second.get_new_conversation_id())
+
+    assert len(set(ids)) == len(ids)
+
+
+def test_high_water_mark_prevents_reusing_deleted_ids(tmp_path: Path) -> None:
+    implementer = create_implementer(tmp_path)
+    implementer.get_new_conversation_id()
+    last_id = implementer.get_new_conversation_id()
+    Path(implementer.build_chat_path(last_id)).unlink()
+
+    assert create_implementer(tmp_path).get_new_conversation_id() == "0002"
+
+
+def fail_writing(name: str) -> Callable[[PurePath, str], None]:
+    def write_file(path: PurePath, text: str) -> None:
+        if path.name == name:
+            raise OSError("disk full")
+        FileManager().write_file(path, text)
+
+    return write_file
+
+
+# the conversation or the high-water mark written after claiming the id
+@pytest.mark.parametrize("failed_name", ["0000.chat", "last_conversation_id"])
+@pytest.mark.parametrize("save_mode", [SaveMode.NEW_FILE_PER_TURN, SaveMode.APPEND])
+def test_claimed_file_is_removed_when_the_save_fails(
+    tmp_path: Path, save_mode: SaveMode, failed_name: str
+) -> None:
+    file_manager = Mock(wraps=FileManager())
+    file_manager.write_file.side_effect = fail_writing(failed_name)
+    repository = ChatRepository(
+        PurePath(tmp_path),
+        file_manager=file_manager,
+        time_manager=TimeManager(),
+        save_mode=save_mode,
+    )
+
+    with pytest.raises(OSError, match="disk full"):
+        repository.save_messages(COMPLETE_MESSAGES_1)
+
+    chats_dir = Path(DataLocation(PurePath(tmp_path)).chats_dir)
+    assert list(chats_dir.iterdir()) == []
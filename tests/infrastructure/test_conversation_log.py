@@ -0,0 +1,58 @@
+from pathlib import Path, PurePath
+from unittest.mock import Mock
+
+from src.python_modules.FileSystemWrapper.file_manager import FileManager
+
+from src.domain import ChatMessage, CompleteMessage, ConversationId
+from src.infrastructure.chat_repository.conversation_log import SaveMode
+from src.infrastructure.chat_repository.repository import ChatRepository
+from src.infrastructure.now import TimeManager
+from src.serde.serialize import serialize_conversation
+from tests.objects import COMPLETE_MESSAGES_1
+
+CURRENT_TIME = "2024-03-16 14:50:15"
+
+
+def create_repository(main_directory: Path) -> ChatRepository:
+    time_manager_mock = Mock(spec=TimeManager)
+    time_manager_mock.get_current_time.return_value = CURRENT_TIME
+    return ChatRepository(
+        PurePath(main_directory),
+        file_manager=FileManager(),
+        time_manager=time_manager_mock,
+        save_mode=SaveMode.APPEND,
+    )
+
+
+def test_append_mode_extends_the_same_file(tmp_path: Path) -> None:
+    repository = create_repository(tmp_path)
+    messages = list(COMPLETE_MESSAGES_1[:2])
+
+    repository.save_messages(messages)
+    messages.extend(COMPLETE_MESSAGES_1[2:])
+    repository.save_messages(messages)
+
+    conversation_id = ConversationId("0000")
+    assert repository.get_conversation_ids() == [conversation_id]
+    text = repository.load_conversation_as_conversation_text(conversation_id).text
+    assert text == serialize_conversation(
+        messages, conversation_id, CURRENT_TIME, fixed_width_count=True
+    )
+    header = repository.read_conversation_header(conversation_id)
+    assert header.number_of_messages == len(COMPLETE_MESSAGES_1)
+    assert [m.chat_msg for m in repository.load_conversation(conversation_id)] == [
+        m.chat_msg for m in COMPLETE_MESSAGES_1
+    ]
+
+
+def test_append_mode_starts_new_log_when_history_diverges(tmp_path: Path) -> None:
+    repository = create_repository(tmp_path)
+    repository.save_messages(COMPLETE_MESSAGES_1)
+
+    new_conversation = [CompleteMessage(ChatMessage("user", "Something else"))]
+    repository.save_messages(new_conversation)
+
+    assert sorted(repository.get_conversation_ids()) == ["0000", "0001"]
+    header = repository.read_conversation_header(ConversationId("0001"))
+    assert header.number_of_messages == 1
+    assert len(repository.load_conversation(ConversationId("0001"))) == 1
@@ -0,0 +1,47 @@
+import threading
+from unittest.mock import patch
+
+from src.infrastructure.llm_connection import ClientWrapper
+from src.infrastructure.llm_connection.http_transport import (
+    create_http_client,
+    get_shared_transport,
+    open_connections,
+)
+
+
+def test_clients_share_the_connection_pool() -> None:
+    first = create_http_client()
+    first.close()
+    second = create_http_client()
+
+    assert first._transport is second._transport is get_shared_transport()
+    second.close()
+
+
+def test_failed_warm_up_is_ignored() -> None:
+    open_connections(["http://127.0.0.1:9"])
+
+
+def test_only_configured_apis_are_warmed_up() -> None:
+    client_wrapper = ClientWrapper(openai_api_key="key")
+
+    with patch(
+        "src.infrastructure.llm_connection.client_wrapper.warm_up_connections"
+    ) as warm_up_connections_mock:
+        client_wrapper.warm_up()
+        for thread in threading.enumerate():
+            if thread.name == "warm-up":
+                thread.join()
+
+    warm_up_connections_mock.assert_called_once_with(["https://api.openai.com/v1"])
+
+
+def test_mistral_is_not_warmed_up() -> None:
+    client_wrapper = ClientWrapper(mistral_api_key="key")
+
+    with patch(
+        "src.infrastructure.llm_connection.client_wrapper.warm_up_connections"
+    ) as warm_up_connections_mock:
+        client_wrapper.warm_up()
+
+    warm_up_connections_mock.assert_not_called()
@@ -0,0 +1,95 @@
+from src.domain import ChatMessage
+from src.infrastructure.llm_connection.message_conversion import (
+    ConvertedMessagesCache,
+)
+from src.infrastructure.llm_connection.openai_client_wrapper import (
+    convert_to_openai_msg,
+)
+
+
+def test_only_new_messages_are_converted() -> None:
+    cache = ConvertedMessagesCache(convert_to_openai_msg)
+    messages = [ChatMessage("user", "hola"), ChatMessage("assistant", "hola")]
+
+    first = cache.convert(messages)
+    messages.append(ChatMessage("user", "adiós"))
+    second = cache.convert(messages)
+
+    assert cache.conversions == 3
+    assert second[:2] == first
+    assert second[0] is first[0]
+    assert second == [convert_to_openai_msg(msg) for msg in messages]
+
+
+def test_returned_list_is_not_changed_later() -> None:
+    cache = ConvertedMessagesCache(convert_to_openai_msg)
+    messages = [ChatMessage("user", "hola")]
+
+    first = cache.convert(messages)
+    first.append(convert_to_openai_msg(ChatMessage("user", "otro")))
+    messages.append(ChatMessage("assistant", "hola"))
+    second = cache.convert(messages)
+
+    assert len(first) == 2
+    assert second == [convert_to_openai_msg(msg) for msg in messages]
+    assert second is not first
+
+
+def test_message_replaced_in_the_middle_is_converted_again() -> None:
+    cache = ConvertedMessagesCache(convert_to_openai_msg)
+    messages = [
+        ChatMessage("user", "hola"),
+        ChatMessage("tool", "salida enorme", tool_call_id="1", name="f"),
+        ChatMessage("assistant", "hecho"),
+    ]
+    cache.convert(messages)
+    messages[1] = ChatMessage("tool", "[resultado omitido]", tool_call_id="1", name="f")
+    messages.append(ChatMessage("user", "gracias"))
+
+    converted = cache.convert(messages)
+
+    assert converted == [convert_to_openai_msg(msg) for msg in messages]
+    assert cache.conversions == 5
+
+
+def test_equal_messages_are_converted_separately() -> None:
+    cache = ConvertedMessagesCache(convert_to_openai_msg)
+
+    cache.convert([ChatMessage("user", "hola")])
+    cache.convert([ChatMessage("user", "hola")])
+
+    assert cache.conversions == 2
+
+
+def test_least_recently_used_messages_are_discarded() -> None:
+    cache = ConvertedMessagesCache(convert_to_openai_msg, max_messages=2)
+    first, second, third = [ChatMessage("user", str(i)) for i in range(3)]
+
+    cache.convert([first, second])
+    cache.convert([first])
+    cache.convert([third])
+    cache.convert([first, second])
+
+    assert cache.conversions == 4
+
+
+def test_trimmed_history_is_not_converted_again() -> None:
+    cache = ConvertedMessagesCache(convert_to_openai_msg)
+    messages = [ChatMessage("user", str(i)) for i in range(4)]
+
+    cache.convert(messages)
+    cache.convert(messages[2:])
+
+    assert cache.conversions == 4
+
+
+def test_changed_conversation_is_built_again() -> None:
+    cache = ConvertedMessagesCache(convert_to_openai_msg)
+    first, second = [ChatMessage("user", str(i)) for i in range(2)]
+
+    converted = cache.convert([first, second])
+    other_converted = cache.convert([ChatMessage("system", "prompt"), second])
+
+    assert other_converted is not converted
+    assert len(converted) == 2
+    assert cache.conversions == 3
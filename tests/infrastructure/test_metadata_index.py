@@ -0,0 +1,109 @@
+import os
+from pathlib import Path, PurePath
+from unittest.mock import Mock
+
+import pytest
+
+from src.python_modules.FileSystemWrapper.file_manager import FileManager
+
+from src.domain import ConversationId, ModelName
+from src.infrastructure.chat_repository import metadata_index
+from src.infrastructure.chat_repository.conversation_log import SaveMode
+from src.infrastructure.chat_repository.implementer import DataLocation
+from src.infrastructure.chat_repository.repository import ChatRepository
+from src.infrastructure.now import TimeManager
+from tests.objects import COMPLETE_MESSAGES_1, COMPLETE_MESSAGES_2
+
+TIMES = ["2024-01-01 10:00:00", "2024-02-01 10:00:00", "2024-03-01 10:00:00"]
+
+
+def create_repository(
+    main_directory: Path, save_mode: SaveMode = SaveMode.NEW_FILE_PER_TURN
+) -> ChatRepository:
+    time_manager_mock = Mock(spec=TimeManager)
+    time_manager_mock.get_current_time.side_effect = TIMES
+    return ChatRepository(
+        PurePath(main_directory),
+        file_manager=FileManager(),
+        time_manager=time_manager_mock,
+        save_mode=save_mode,
+    )
+
+
+def test_index_is_updated_on_save(tmp_path: Path) -> None:
+    repository = create_repository(tmp_path)
+    repository.save_messages(COMPLETE_MESSAGES_1)
+    repository.save_messages(COMPLETE_MESSAGES_2)
+    repository.save_messages(COMPLETE_MESSAGES_2[:1])
+
+    in_february = repository.find_conversations_by_time_range(
+        "2024-01-15 00:00:00", "2024-02-15 00:00:00"
+    )
+    assert [metadata.id for metadata in in_february] == ["0001"]
+    with_model_2 = repository.find_conversations_by_model(ModelName("model_2"))
+    assert [metadata.id for metadata in with_model_2] == ["0000"]
+    first = with_model_2[0]
+    assert first.number_of_messages == 4
+    assert first.models == ("model_1", "model_2")
+    chat_path = DataLocation(PurePath(tmp_path)).chats_dir / "0000.chat"
+    assert first.size == os.path.getsize(chat_path)
+
+
+def test_index_follows_append_mode(tmp_path: Path) -> None:
+    repository = create_repository(tmp_path, SaveMode.APPEND)
+    messages = list(COMPLETE_MESSAGES_1[:2])
+    repository.save_messages(messages)
+    messages.extend(COMPLETE_MESSAGES_1[2:])
+    repository.save_messages(messages)
+
+    [metadata] = create_repository(tmp_path).find_conversations_by_model(
+        ModelName("model_2")
+    )
+    assert metadata.number_of_messages == 4
+    assert metadata.current_time == TIMES[0]
+
+
+def test_rebuild_repairs_drift(tmp_path: Path) -> None:
+    repository = create_repository(tmp_path)
+    repository.save_messages(COMPLETE_MESSAGES_1)
+    repository.save_messages(COMPLETE_MESSAGES_2)
+    chats_dir = Path(DataLocation(PurePath(tmp_path)).chats_dir)
+    edited = chats_dir / "0001.chat"
+    edited.write_text(edited.read_text().replace("model_1", "model_3"))
+    (chats_dir / "0000.chat").rename(chats_dir / "0005.chat")
+
+    fresh_repository = create_repository(tmp_path)
+    assert fresh_repository.rebuild_metadata_index() == 3
+    assert fresh_repository.rebuild_metadata_index() == 0
+
+    with_model_3 = fresh_repository.find_conversations_by_model(ModelName("model_3"))
+    assert [metadata.id for metadata in with_model_3] == ["0001"]
+    assert fresh_repository.find_conversations_by_model(ModelName("model_2"))[0].id == (
+        "0005"
+    )
+
+
+def test_superseded_lines_are_compacted(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(metadata_index, "COMPACTION_THRESHOLD", 1)
+    index_path = DataLocation(PurePath(tmp_path)).metadata_index_path
+    repository = create_repository(tmp_path, SaveMode.APPEND)
+    messages = list(COMPLETE_MESSAGES_1[:1])
+    for complete_message in COMPLETE_MESSAGES_1[1:]:
+        repository.save_messages(messages)
+        messages.append(complete_message)
+    # not loaded yet, every save appends a line
+    assert len(Path(index_path).read_text().splitlines()) == 3
+
+    assert len(repository.find_conversations_by_time_range(TIMES[0], TIMES[-1])) == 1
+    assert len(Path(index_path).read_text().splitlines()) == 1
+
+    for _ in range(3):
+        repository.save_messages(messages)
+    # rewritten on the second save, when two lines were superseded
+    assert len(Path(index_path).read_text().splitlines()) == 2
+    [metadata] = create_repository(tmp_path).find_conversations_by_model(
+        ModelName("model_2")
+    )
+    assert metadata.number_of_messages == len(COMPLETE_MESSAGES_1)
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from src.domain import ChatMessage, Platform
+from src.infrastructure.exceptions import TooManyRequests
+from src.infrastructure.llm_connection.rate_limiter import (
+    RateLimiter,
+    RateLimits,
+    RunawayGuard,
+    estimate_tokens,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_requests_wait_in_arrival_order() -> None:
+    clock = FakeClock()
+    rate_limiter = RateLimiter(
+        {Platform.Mistral: RateLimits(requests_per_minute=2, tokens_per_minute=1000)},
+        clock=clock,
+    )
+
+    waits = [rate_limiter.reserve(Platform.Mistral, 1) for _ in range(4)]
+
+    assert waits == [0, 0, 30, 60]
+    assert rate_limiter.reserve(Platform.OpenAI, 1) == 0
+    clock.now = 90
+    assert rate_limiter.reserve(Platform.Mistral, 1) == 0
+
+
+def test_tokens_per_minute_are_limited() -> None:
+    clock = FakeClock()
+    rate_limiter = RateLimiter(
+        {Platform.OpenAI: RateLimits(requests_per_minute=100, tokens_per_minute=600)},
+        clock=clock,
+        sleep=clock.sleep,
+    )
+
+    rate_limiter.acquire(Platform.OpenAI, 500)
+    assert clock.now == 0
+    rate_limiter.acquire(Platform.OpenAI, 200)
+    assert clock.now == pytest.approx(10)
+
+
+def test_async_acquire_waits() -> None:
+    waits: list[float] = []
+
+    async def sleep(seconds: float) -> None:
+        waits.append(seconds)
+
+    rate_limiter = RateLimiter(
+        {Platform.Mistral: RateLimits(requests_per_minute=600, tokens_per_minute=1e6)},
+        clock=FakeClock(),
+        async_sleep=sleep,
+    )
+
+    async def acquire_many() -> None:
+        await asyncio.gather(
+            *(rate_limiter.acquire_async(Platform.Mistral, 1) for _ in range(602))
+        )
+
+    asyncio.run(acquire_many())
+    # the burst is not paced, the next requests wait 0.1 seconds more each
+    assert waits == pytest.approx([0.1, 0.2])
+
+
+def test_max_requests_matches_the_paced_requests() -> None:
+    rate_limiter = RateLimiter(
+        {
+            Platform.Mistral: RateLimits(requests_per_minute=60, tokens_per_minute=1e6),
+            Platform.OpenAI: RateLimits(requests_per_minute=90, tokens_per_minute=1e6),
+        },
+        clock=FakeClock(),
+    )
+
+    sent_in_a_minute = sum(
+        rate_limiter.reserve(platform, 1) <= 60
+        for platform in [Platform.Mistral, Platform.OpenAI]
+        for _ in range(500)
+    )
+
+    assert sent_in_a_minute == rate_limiter.max_requests(60) == 300
+
+
+def test_runaway_guard_fails_instead_of_waiting() -> None:
+    clock = FakeClock()
+    runaway_guard = RunawayGuard(3, 10, clock=clock)
+    for _ in range(3):
+        runaway_guard.check()
+
+    with pytest.raises(TooManyRequests):
+        runaway_guard.check()
+    clock.now = 11
+    runaway_guard.check()
+
+
+def test_estimate_tokens() -> None:
+    messages = [ChatMessage("user", "x" * 40), ChatMessage("assistant", "y" * 40)]
+    # 10 tokens of content and 4 of overhead per message
+    assert estimate_tokens(messages) == 28
@@ -0,0 +1,92 @@
+from typing import Any
+
+from mistralai.models.chat_completion import ChatCompletionStreamResponse
+from openai.types.chat import ChatCompletionChunk
+
+from src.infrastructure.llm_connection.mistral_client_wrapper import (
+    assemble_mistral_stream,
+)
+from src.infrastructure.llm_connection.openai_client_wrapper import (
+    assemble_openai_stream,
+)
+
+
+def create_openai_chunk(delta: dict[str, Any]) -> ChatCompletionChunk:
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "chunk",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+        }
+    )
+
+
+def create_tool_call_delta(
+    index: int, name: str = "", arguments: str = "", id_: str | None = None
+) -> dict[str, Any]:
+    return {
+        "index": index,
+        "id": id_,
+        "function": {"name": name, "arguments": arguments},
+    }
+
+
+def test_openai_stream_is_assembled() -> None:
+    deltas: list[str] = []
+    chunks = [
+        create_openai_chunk({"role": "assistant", "content": "Hel"}),
+        create_openai_chunk({"content": "lo"}),
+        create_openai_chunk(
+            {"tool_calls": [create_tool_call_delta(0, "get_", '{"ci', "call_1")]}
+        ),
+        create_openai_chunk(
+            {
+                "tool_calls": [
+                    create_tool_call_delta(0, "weather", 'ty": "Madrid"}'),
+                    create_tool_call_delta(1, "get_time", "{}", "call_2"),
+                ]
+            }
+        ),
+    ]
+
+    chat_msg = assemble_openai_stream(chunks, deltas.append)
+
+    assert deltas == ["Hel", "lo"]
+    assert chat_msg.role == "assistant"
+    assert chat_msg.content == "Hello"
+    assert isinstance(chat_msg.tool_calls, list)
+    first, second = chat_msg.tool_calls
+    assert first.id == "call_1"
+    assert first.function.name == "get_weather"
+    assert first.function.arguments == '{"city": "Madrid"}'
+    assert second.function.name == "get_time"
+
+
+def test_mistral_stream_is_assembled() -> None:
+    deltas: list[str] = []
+    tool_call = {"id": "call_1", "function": {"name": "get_time", "arguments": "{}"}}
+    chunks = [
+        ChatCompletionStreamResponse.model_validate(
+            {
+                "id": "chunk",
+                "model": "mistral-small",
+                "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+            }
+        )
+        for delta in [
+            {"role": "assistant", "content": ""},
+            {"content": "Hi"},
+            {"content": " there", "tool_calls": [tool_call]},
+        ]
+    ]
+
+    chat_msg = assemble_mistral_stream(chunks, deltas.append)
+
+    assert deltas == ["Hi", " there"]
+    assert chat_msg.content == "Hi there"
+    assert isinstance(chat_msg.tool_calls, list)
+    [assembled_tool_call] = chat_msg.tool_calls
+    assert assembled_tool_call.function.name == "get_time"
+    assert assemble_mistral_stream([], deltas.append).tool_calls is None
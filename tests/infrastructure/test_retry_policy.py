@@ -0,0 +1,104 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import Mock
+
+import pytest
+
+from src.infrastructure.exceptions import (
+    APIConnectionError,
+    APIStatusError,
+    LLMChatException,
+)
+from src.infrastructure.llm_connection.retry_policy import (
+    Retrier,
+    RetryPolicy,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def create_retrier(clock: FakeClock, policy: RetryPolicy = RetryPolicy()) -> Retrier:
+    return Retrier(policy, clock=clock, sleep=clock.sleep, get_random=lambda: 0.5)
+
+
+def test_transient_failures_are_retried_with_backoff() -> None:
+    clock = FakeClock()
+    retrier = create_retrier(clock)
+    function = Mock(
+        side_effect=[APIConnectionError("Mistral"), APIConnectionError("Mistral"), "ok"]
+    )
+
+    assert retrier.call(function) == "ok"
+    assert retrier.attempts == 3
+    # half of the limits 1 and 2 seconds
+    assert retrier.backoff_seconds == 1.5
+    assert clock.now == 1.5
+
+
+def test_retry_after_is_honored() -> None:
+    clock = FakeClock()
+    retrier = create_retrier(clock)
+    function = Mock(side_effect=[APIStatusError("OpenAI", 429, 7), "ok"])
+
+    assert retrier.call(function) == "ok"
+    assert clock.now == 7
+
+
+def test_attempts_and_deadline_are_limited() -> None:
+    clock = FakeClock()
+    retrier = create_retrier(clock, RetryPolicy(max_attempts=3))
+    function = Mock(side_effect=APIConnectionError("Mistral"))
+    with pytest.raises(APIConnectionError):
+        retrier.call(function)
+    assert function.call_count == 3
+
+    retrier = create_retrier(clock, RetryPolicy(deadline_seconds=10))
+    function = Mock(side_effect=APIStatusError("OpenAI", 503, 11))
+    with pytest.raises(APIStatusError):
+        retrier.call(function)
+    assert function.call_count == 1
+
+
+def test_other_failures_are_not_retried() -> None:
+    retrier = create_retrier(FakeClock())
+    function = Mock(side_effect=LLMChatException("fatal"))
+    with pytest.raises(LLMChatException):
+        retrier.call(function)
+    function = Mock(side_effect=APIConnectionError("Mistral"))
+    with pytest.raises(APIConnectionError):
+        retrier.call(function, can_retry=lambda: False)
+    assert retrier.attempts == 2
+
+
+def test_async_calls_are_retried() -> None:
+    retrier = Retrier(RetryPolicy(base_delay_seconds=0.01))
+    failures = [APIConnectionError("Mistral")]
+
+    async def function() -> str:
+        if failures:
+            raise failures.pop()
+        return "ok"
+
+    assert asyncio.run(retrier.call_async(function)) == "ok"
+    assert retrier.attempts == 2
+
+
+def test_parse_retry_after() -> None:
+    assert parse_retry_after({}) is None
+    assert parse_retry_after({"Retry-After": "3"}) == 3
+    assert parse_retry_after({"retry-after-ms": "1500", "retry-after": "3"}) == 1.5
+    assert parse_retry_after({"retry-after": "invalid"}) is None
+    date = datetime.now(timezone.utc) + timedelta(seconds=30)
+    seconds = parse_retry_after({"retry-after": format_datetime(date)})
+    assert seconds is not None and 25 < seconds <= 30
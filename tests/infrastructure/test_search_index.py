@@ -0,0 +1,127 @@
+from pathlib import Path, PurePath
+from unittest.mock import Mock
+
+from src.python_modules.FileSystemWrapper.file_manager import FileManager
+
+from src.domain import ChatMessage, CompleteMessage, ConversationId
+from src.infrastructure.chat_repository.conversation_log import SaveMode
+from src.infrastructure.chat_repository.implementer import DataLocation
+from src.infrastructure.chat_repository.repository import ChatRepository
+from src.infrastructure.chat_repository.search_index import (
+    LOG_FILENAME,
+    SNIPPET_RADIUS,
+    SearchIndex,
+    create_snippet,
+)
+from src.infrastructure.now import TimeManager
+from tests.objects import COMPLETE_MESSAGES_1, COMPLETE_MESSAGES_2
+
+
+def create_repository(
+    main_directory: Path, save_mode: SaveMode = SaveMode.NEW_FILE_PER_TURN
+) -> ChatRepository:
+    time_manager_mock = Mock(spec=TimeManager)
+    time_manager_mock.get_current_time.return_value = "2024-03-16 14:50:15"
+    return ChatRepository(
+        PurePath(main_directory),
+        file_manager=FileManager(),
+        time_manager=time_manager_mock,
+        save_mode=save_mode,
+    )
+
+
+def create_messages(*contents: str) -> list[CompleteMessage]:
+    return [CompleteMessage(ChatMessage("user", content)) for content in contents]
+
+
+def test_search_returns_ranked_ids_with_snippets(tmp_path: Path) -> None:
+    repository = create_repository(tmp_path)
+    repository.save_messages(COMPLETE_MESSAGES_1)
+    repository.save_messages(COMPLETE_MESSAGES_2)
+    repository.save_messages(create_messages("plus plus PLUS"))
+
+    results = repository.search_conversations("Plus")
+    assert [result.conversation_id for result in results] == ["0002", "0001"]
+    assert results[1].snippet == "¿What is 2 plus 2?"
+    assert results[0].score > results[1].score
+
+    [result] = repository.search_conversations("are you")
+    assert result.conversation_id == "0000"
+    assert result.snippet == "How are you?"
+    assert repository.search_conversations("unknown") == []
+
+
+def test_search_follows_saves_after_the_snapshot(tmp_path: Path) -> None:
+    repository = create_repository(tmp_path, SaveMode.APPEND)
+    messages = list(COMPLETE_MESSAGES_1[:2])
+    repository.save_messages(messages)
+    assert repository.search_conversations("fine") == []
+
+    messages.extend(COMPLETE_MESSAGES_1[2:])
+    repository.save_messages(messages)
+    repository.save_messages(COMPLETE_MESSAGES_2)
+
+    for current_repository in [repository, create_repository(tmp_path)]:
+        [result] = current_repository.search_conversations("fine hello")
+        assert result.conversation_id == "0000"
+        assert result.snippet == "Hello"
+        [result] = current_repository.search_conversations("2")
+        assert result.conversation_id == "0001"
+
+
+def test_rebuild_indexes_existing_chats(tmp_path: Path) -> None:
+    repository = create_repository(tmp_path)
+    repository.save_messages(COMPLETE_MESSAGES_1)
+    repository.search_conversations("hello")
+    chat_path = Path(DataLocation(PurePath(tmp_path)).chats_dir) / "0000.chat"
+    chat_path.write_text(chat_path.read_text().replace("Hello", "Goodbye"))
+
+    fresh_repository = create_repository(tmp_path)
+    assert len(fresh_repository.search_conversations("hello")) == 1
+    fresh_repository.rebuild_search_index()
+    assert fresh_repository.search_conversations("hello") == []
+    assert len(fresh_repository.search_conversations("goodbye")) == 1
+
+
+def test_replaced_conversation_loses_its_terms(tmp_path: Path) -> None:
+    search_index = SearchIndex(FileManager(), PurePath(tmp_path))
+    conversation_id = ConversationId("0000")
+    search_index.add_messages(
+        conversation_id, create_messages("old text"), replace=True
+    )
+    search_index.add_messages(conversation_id, create_messages("more"), replace=False)
+    assert search_index.search("old more") != []
+
+    search_index.add_messages(conversation_id, create_messages("new"), replace=True)
+    assert search_index.search("old more") == []
+    assert [id_ for id_, _ in search_index.search("new")] == [conversation_id]
+
+
+def test_invalid_log_entries_are_skipped(tmp_path: Path) -> None:
+    search_index = SearchIndex(FileManager(), PurePath(tmp_path))
+    search_index.replace_all([(ConversationId("0000"), create_messages("hola"))])
+    search_index.add_messages(
+        ConversationId("0001"), create_messages("adiós"), replace=True
+    )
+    with open(tmp_path / LOG_FILENAME, "a", encoding="utf-8") as log_file:
+        log_file.write('{"id": "0002", "replace": true}\n[1]\n{"id": "0003", "te\n')
+    search_index.add_messages(
+        ConversationId("0004"), create_messages("final"), replace=True
+    )
+
+    loaded_index = SearchIndex(FileManager(), PurePath(tmp_path))
+    assert [
+        conversation_id
+        for query in ["hola", "adiós", "final"]
+        for conversation_id, _ in loaded_index.search(query)
+    ] == ["0000", "0001", "0004"]
+
+
+def test_snippet_is_cut_around_the_first_match() -> None:
+    content = "a" * 100 + " Target\n" + "b" * 100
+    snippet = create_snippet(create_messages("nothing", content), "target")
+    assert snippet.startswith("...")
+    assert snippet.endswith("...")
+    assert "Target" in snippet
+    assert len(snippet) == len("Target") + 2 * SNIPPET_RADIUS + 2 * len("...")
+    assert create_snippet(create_messages("nothing"), "target") == ""
@@ -0,0 +1,83 @@
+from pathlib import Path, PurePath
+from unittest.mock import Mock
+
+from src.python_modules.FileSystemWrapper.file_manager import FileManager
+
+from src.domain import ConversationId, ModelName
+from src.infrastructure.chat_repository.layout import (
+    ShardedChatsLayout,
+    StorageLayout,
+)
+from src.infrastructure.chat_repository.migration import (
+    migrate_to_sharded_layout,
+)
+from src.infrastructure.chat_repository.repository import ChatRepository
+from src.infrastructure.now import TimeManager
+from tests.objects import COMPLETE_MESSAGES_1
+
+
+def create_repository(
+    main_directory: Path, storage_layout: StorageLayout
+) -> ChatRepository:
+    time_manager_mock = Mock(spec=TimeManager)
+    time_manager_mock.get_current_time.return_value = "2024-03-16 14:50:15"
+    return ChatRepository(
+        PurePath(main_directory),
+        file_manager=FileManager(),
+        time_manager=time_manager_mock,
+        storage_layout=storage_layout,
+    )
+
+
+def test_sharded_path_is_derived_from_the_id() -> None:
+    layout = ShardedChatsLayout(PurePath("chats"))
+    expected = PurePath("chats/00012/00012345.chat")
+    assert layout.build_chat_path(ConversationId("00012345")) == expected
+    assert layout.build_chat_path(ConversationId("12345")) == expected
+
+
+def test_sharded_repository_saves_and_loads(tmp_path: Path) -> None:
+    repository = create_repository(tmp_path, StorageLayout.SHARDED)
+
+    repository.save_messages(COMPLETE_MESSAGES_1)
+    repository.save_messages(COMPLETE_MESSAGES_1)
+
+    assert repository.get_conversation_ids() == ["00000000", "00000001"]
+    assert len(repository.load_conversation(ConversationId("0001"))) == 4
+
+
+def test_migration_moves_flat_chats(tmp_path: Path) -> None:
+    flat_repository = create_repository(tmp_path, StorageLayout.FLAT)
+    for _ in range(3):
+        flat_repository.save_messages(COMPLETE_MESSAGES_1)
+
+    moved = migrate_to_sharded_layout(PurePath(tmp_path), FileManager())
+
+    assert moved == 3
+    assert flat_repository.get_conversation_ids() == []
+    sharded_repository = create_repository(tmp_path, StorageLayout.SHARDED)
+    assert sorted(sharded_repository.get_conversation_ids()) == [
+        "00000000",
+        "00000001",
+        "00000002",
+    ]
+    sharded_repository.save_messages(COMPLETE_MESSAGES_1)
+    assert "00000003" in sharded_repository.get_conversation_ids()
+
+
+def test_migration_rebuilds_the_indexes(tmp_path: Path) -> None:
+    flat_repository = create_repository(tmp_path, StorageLayout.FLAT)
+    for _ in range(2):
+        flat_repository.save_messages(COMPLETE_MESSAGES_1)
+    flat_repository.rebuild_search_index()
+
+    migrate_to_sharded_layout(PurePath(tmp_path), FileManager())
+
+    sharded_repository = create_repository(tmp_path, StorageLayout.SHARDED)
+    metadata = sharded_repository.find_conversations_by_model(ModelName("model_1"))
+    assert [entry.id for entry in metadata] == ["00000000", "00000001"]
+    results = sharded_repository.search_conversations("fine")
+    assert sorted(result.conversation_id for result in results) == [
+        "00000000",
+        "00000001",
+    ]
@@ -0,0 +1,102 @@
+from pathlib import Path, PurePath
+from unittest.mock import Mock
+
+import pytest
+
+from src.python_modules.FileSystemWrapper.file_manager import FileManager
+
+from src.domain import ConversationId
+from src.infrastructure.chat_repository.conversation_log import SaveMode
+from src.infrastructure.chat_repository.repository import ChatRepository
+from src.infrastructure.chat_repository.sqlite_import import import_chat_files
+from src.infrastructure.chat_repository.sqlite_repository import (
+    SqliteChatRepository,
+)
+from src.infrastructure.exceptions import ConversationNotFound
+from src.infrastructure.now import TimeManager
+from src.serde import serialize_conversation
+from tests.objects import COMPLETE_MESSAGES_1, COMPLETE_MESSAGES_2
+
+CURRENT_TIME = "2024-03-16 14:50:15"
+
+
+def create_time_manager() -> Mock:
+    time_manager_mock = Mock(spec=TimeManager)
+    time_manager_mock.get_current_time.return_value = CURRENT_TIME
+    return time_manager_mock
+
+
+def create_repository(
+    main_directory: Path, save_mode: SaveMode = SaveMode.NEW_FILE_PER_TURN
+) -> SqliteChatRepository:
+    return SqliteChatRepository(
+        PurePath(main_directory),
+        file_manager=FileManager(),
+        time_manager=create_time_manager(),
+        save_mode=save_mode,
+    )
+
+
+def test_save_and_load(tmp_path: Path) -> None:
+    repository = create_repository(tmp_path)
+
+    repository.save_messages(COMPLETE_MESSAGES_1)
+    repository.save_messages(COMPLETE_MESSAGES_2)
+
+    assert repository.get_conversation_ids() == ["0001", "0002"]
+    assert repository.load_conversation(ConversationId("0002")) == (COMPLETE_MESSAGES_2)
+    text = repository.load_conversation_as_conversation_text(ConversationId("1"))
+    assert text.text == serialize_conversation(
+        COMPLETE_MESSAGES_1, ConversationId("0001"), CURRENT_TIME
+    )
+    with pytest.raises(ConversationNotFound):
+        repository.load_conversation(ConversationId("0003"))
+
+
+def test_append_mode_extends_the_conversation(tmp_path: Path) -> None:
+    repository = create_repository(tmp_path, SaveMode.APPEND)
+    messages = list(COMPLETE_MESSAGES_1[:2])
+
+    repository.save_messages(messages)
+    messages.extend(COMPLETE_MESSAGES_1[2:])
+    repository.save_messages(messages)
+
+    assert repository.get_conversation_ids() == ["0001"]
+    header = repository.read_conversation_header(ConversationId("0001"))
+    assert header.number_of_messages == len(COMPLETE_MESSAGES_1)
+    assert repository.load_conversation(header.id) == COMPLETE_MESSAGES_1
+
+
+def test_import_chat_files(tmp_path: Path) -> None:
+    chat_repository = ChatRepository(
+        PurePath(tmp_path),
+        file_manager=FileManager(),
+        time_manager=create_time_manager(),
+    )
+    for _ in range(5):
+        chat_repository.save_messages(COMPLETE_MESSAGES_1)
+    repository = create_repository(tmp_path)
+
+    imported = import_chat_files(chat_repository, repository, batch_size=2)
+
+    assert imported == 5
+    assert repository.get_conversation_ids() == sorted(
+        chat_repository.get_conversation_ids()
+    )
+    for conversation_id in chat_repository.get_conversation_ids():
+        assert repository.load_conversation_as_conversation_text(
+            conversation_id
+        ) == chat_repository.load_conversation_as_conversation_text(conversation_id)
+
+
+def test_search_conversations(tmp_path: Path) -> None:
+    repository = create_repository(tmp_path, SaveMode.APPEND)
+    messages = list(COMPLETE_MESSAGES_1[:2])
+    repository.save_messages(messages)
+    messages.extend(COMPLETE_MESSAGES_1[2:])
+    repository.save_messages(messages)
+    repository.save_messages(COMPLETE_MESSAGES_2)
+
+    [result] = repository.search_conversations("fine")
+    assert result.conversation_id == "0001"
+    assert result.snippet == "I'm fine."
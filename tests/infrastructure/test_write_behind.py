@@ -0,0 +1,106 @@
+import threading
+from pathlib import Path, PurePath
+from unittest.mock import Mock
+
+import pytest
+
+from src.python_modules.FileSystemWrapper.file_manager import FileManager
+
+from src.domain import CompleteMessage, ConversationId
+from src.infrastructure.chat_repository.repository import ChatRepository
+from src.infrastructure.chat_repository.write_behind import (
+    WriteBehindChatRepository,
+)
+from src.infrastructure.exceptions import DeferredWriteError
+from src.infrastructure.now import TimeManager
+from src.models.shared import extract_chat_messages
+from src.protocols import ChatRepositoryProtocol
+from tests.objects import COMPLETE_MESSAGES_1, COMPLETE_MESSAGES_2
+
+
+def test_reads_wait_for_pending_writes(tmp_path: Path) -> None:
+    time_manager_mock = Mock(spec=TimeManager)
+    time_manager_mock.get_current_time.return_value = "2024-03-16 14:50:15"
+    repository = WriteBehindChatRepository(
+        ChatRepository(
+            PurePath(tmp_path),
+            file_manager=FileManager(),
+            time_manager=time_manager_mock,
+        )
+    )
+    messages = list(COMPLETE_MESSAGES_1)
+    repository.save_messages(messages)
+    messages.clear()
+    repository.save_messages(COMPLETE_MESSAGES_2)
+
+    assert sorted(repository.get_conversation_ids()) == ["0000", "0001"]
+    loaded = repository.load_conversation(ConversationId("0000"))
+    assert extract_chat_messages(loaded) == extract_chat_messages(COMPLETE_MESSAGES_1)
+    repository.close()
+
+
+def test_failed_write_is_raised_by_the_next_call() -> None:
+    inner_repository = Mock(spec=ChatRepositoryProtocol)
+    inner_repository.save_messages.side_effect = [OSError("disk full"), None]
+    repository = WriteBehindChatRepository(inner_repository)
+
+    repository.save_messages(COMPLETE_MESSAGES_1)
+    with pytest.raises(DeferredWriteError, match="disk full"):
+        repository.flush()
+    repository.save_messages(COMPLETE_MESSAGES_2)
+    repository.close()
+
+    assert inner_repository.save_messages.call_count == 2
+    inner_repository.close.assert_called_once()
+
+
+def test_close_reports_failed_writes() -> None:
+    inner_repository = Mock(spec=ChatRepositoryProtocol)
+    inner_repository.save_messages.side_effect = OSError("disk full")
+    repository = WriteBehindChatRepository(inner_repository)
+
+    repository.save_messages(COMPLETE_MESSAGES_1)
+    with pytest.raises(DeferredWriteError):
+        repository.close()
+    inner_repository.close.assert_called_once()
+
+
+def test_save_waits_when_the_queue_is_full() -> None:
+    write_allowed = threading.Event()
+    inner_repository = Mock(spec=ChatRepositoryProtocol)
+
+    def save_messages(complete_messages: tuple[CompleteMessage, ...]) -> None:
+        write_allowed.wait()
+
+    inner_repository.save_messages.side_effect = save_messages
+    repository = WriteBehindChatRepository(inner_repository, max_pending_writes=1)
+    repository.save_messages(COMPLETE_MESSAGES_1)
+    repository.save_messages(COMPLETE_MESSAGES_2)
+
+    blocked_save = threading.Thread(
+        target=repository.save_messages, args=(COMPLETE_MESSAGES_2,)
+    )
+    blocked_save.start()
+    blocked_save.join(timeout=0.1)
+    assert blocked_save.is_alive()
+
+    write_allowed.set()
+    blocked_save.join()
+    repository.close()
+    assert inner_repository.save_messages.call_count == 3
+
+
+def test_save_after_failed_write_is_not_lost() -> None:
+    inner_repository = Mock(spec=ChatRepositoryProtocol)
+    inner_repository.save_messages.side_effect = [OSError("disk full"), None]
+    repository = WriteBehindChatRepository(inner_repository)
+
+    repository.save_messages(COMPLETE_MESSAGES_1)
+    repository._pending.join()
+    # saving does not report it, the error is raised by the next flush
+    repository.save_messages(COMPLETE_MESSAGES_2)
+    with pytest.raises(DeferredWriteError):
+        repository.flush()
+    repository.close()
+
+    assert inner_repository.save_messages.call_count == 2
@@ -0,0 +1,109 @@
+from unittest.mock import Mock
+
+from src.domain import (
+    ChatMessage,
+    CompleteMessage,
+    Model,
+    ModelName,
+    QueryResult,
+)
+from src.infrastructure.llm_connection import ClientWrapper
+from src.model_manager import ModelManager
+from src.models.context_window import (
+    OMITTED_TOOL_OUTPUT,
+    ContextManager,
+    build_context_manager,
+    drop_tool_outputs,
+    estimate_messages_tokens,
+    keep_recent_turns,
+    keep_system_prompt_and_recent_turns,
+)
+from src.models.placeholders import QueryText
+
+MODEL = Model(None, ModelName("model"))
+
+
+def create_message(role: str, length: int = 40) -> CompleteMessage:
+    # 10 tokens of content and 4 of overhead
+    return CompleteMessage(ChatMessage(role, "x" * length))
+
+
+def create_conversation(turns: int) -> list[CompleteMessage]:
+    messages = [create_message("system")]
+    for _ in range(turns):
+        messages += [create_message("user"), create_message("assistant")]
+    return messages
+
+
+def test_sliding_window_keeps_whole_recent_turns() -> None:
+    messages = create_conversation(3)
+
+    selected = keep_recent_turns(messages, budget=60)
+
+    assert selected == messages[3:]
+    assert keep_recent_turns(messages, budget=1) == messages[5:]
+
+
+def test_system_prompt_is_kept() -> None:
+    messages = create_conversation(3)
+
+    selected = keep_system_prompt_and_recent_turns(messages, budget=60)
+
+    assert selected == messages[:1] + messages[5:]
+    assert estimate_messages_tokens(selected) <= 60
+
+
+def test_old_tool_outputs_are_dropped() -> None:
+    tool_output = CompleteMessage(
+        ChatMessage("tool", "x" * 400, name="get_time", tool_call_id="call_1")
+    )
+    messages = [
+        create_message("user"),
+        create_message("assistant"),
+        tool_output,
+        create_message("assistant"),
+        create_message("user"),
+        create_message("assistant"),
+        tool_output,
+    ]
+
+    selected = drop_tool_outputs(messages, budget=0)
+
+    assert selected[2].chat_msg == ChatMessage(
+        "tool", OMITTED_TOOL_OUTPUT, name="get_time", tool_call_id="call_1"
+    )
+    assert selected[:2] + selected[3:] == messages[:2] + messages[3:]
+
+
+def test_strategies_are_applied_only_over_budget() -> None:
+    context_manager = build_context_manager(
+        ["sliding_window"], {ModelName("small"): 50}, default_budget=1000
+    )
+    messages = create_conversation(3)
+
+    assert context_manager.select_messages(ModelName("large"), messages) == messages
+    assert context_manager.select_messages(ModelName("small"), messages) == messages[5:]
+
+
+def test_complete_conversation_is_kept() -> None:
+    def answer(
+        model: Model, messages: list[CompleteMessage], **kwargs: object
+    ) -> QueryResult:
+        messages.append(CompleteMessage(ChatMessage("assistant", "ok"), model))
+        return QueryResult("ok", messages)
+
+    mock_client_wrapper = Mock(spec=ClientWrapper)
+    mock_client_wrapper.get_simple_response.side_effect = answer
+    model_manager = ModelManager(
+        mock_client_wrapper, ContextManager([keep_recent_turns], {}, default_budget=30)
+    )
+    model_manager.model_wrapper.change(MODEL)
+    messages = create_conversation(2)
+
+    query_result = model_manager.get_simple_response(QueryText("hola"), messages)
+
+    [sent_messages] = mock_client_wrapper.get_simple_response.call_args.args[1:]
+    assert [message.chat_msg.content for message in sent_messages] == ["hola", "ok"]
+    assert query_result.messages is messages
+    assert len(messages) == 7
+    assert messages[-1].chat_msg.content == "ok"
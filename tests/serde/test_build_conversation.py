@@ -23,6 +23,10 @@ class TestCreateConversationTexts(unittest.TestCase):
         with self.assertRaises(ValueError):
             convert_digits_to_conversation_id("11111")
 
+    def test_convert_digits_to_wide_conversation_id(self) -> None:
+        conversation_id = convert_digits_to_conversation_id("12345", max_digits=8)
+        self.assertEqual(ConversationId("12345"), conversation_id)
+
 
 if __name__ == "__main__":
     unittest.main()
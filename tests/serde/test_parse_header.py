@@ -0,0 +1,40 @@
+from collections.abc import Iterator
+
+import pytest
+
+from src.domain import ConversationId
+from src.serde import ConversationHeader, deserialize_conversation_header
+from src.serde.shared import SCHEMA_VERSION
+from tests.objects import TEXT_1
+
+
+def split_in_chunks(text: str, size: int) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def test_deserialize_header_with_any_chunk_size() -> None:
+    expected = ConversationHeader(
+        ConversationId("0001"), SCHEMA_VERSION, 4, "2024-03-16 14:50:15"
+    )
+    for size in (1, 7, 64, len(TEXT_1)):
+        assert (
+            deserialize_conversation_header(split_in_chunks(TEXT_1, size)) == expected
+        )
+
+
+def test_deserialize_header_stops_at_first_role_tag() -> None:
+    consumed: list[str] = []
+
+    def tracked_chunks() -> Iterator[str]:
+        for chunk in split_in_chunks(TEXT_1 + "\n" + "x" * 10_000, 16):
+            consumed.append(chunk)
+            yield chunk
+
+    deserialize_conversation_header(tracked_chunks(), max_length=200)
+    assert sum(len(chunk) for chunk in consumed) < 200
+
+
+def test_deserialize_header_too_long() -> None:
+    text = TEXT_1.replace("[ROLE USER]", "x" * 1000 + "\n[ROLE USER]", 1)
+    with pytest.raises(ValueError):
+        deserialize_conversation_header(split_in_chunks(text, 64), max_length=500)
@@ -0,0 +1,77 @@
+import pytest
+
+from src.domain import ConversationText
+from src.serde.deserialize import (
+    ParserEngine,
+    deserialize_conversation_text_into_messages,
+    deserialize_into_conversation_object,
+)
+from src.serde.shared import SCHEMA_VERSION
+from tests.objects import TEXT_1, TEXT_2
+
+TEXT_WITH_TRICKY_CONTENT = """\
+[META id=0003]
+
+[META schema_version=0.2]
+[META number_of_messages=2]
+[META current_time=2024-03-16 14:50:15]
+
+[ROLE SYSTEM]
+Answer [briefly]
+
+[ROLE USER]
+ [ROLE USER]
+[not a tag]
+
+last line
+"""
+
+TEXTS = [TEXT_1, TEXT_2, TEXT_WITH_TRICKY_CONTENT]
+
+
+def test_engines_return_the_same_messages() -> None:
+    for text in TEXTS:
+        for preserve_model in (False, True):
+            results = [
+                deserialize_conversation_text_into_messages(
+                    ConversationText(text, SCHEMA_VERSION),
+                    preserve_model=preserve_model,
+                    check_model_exists=False,
+                    engine=engine,
+                )
+                for engine in ParserEngine
+            ]
+            assert results[0] == results[1]
+
+
+def test_engines_return_the_same_conversation() -> None:
+    for text in TEXTS:
+        results = [
+            deserialize_into_conversation_object(
+                ConversationText(text, SCHEMA_VERSION),
+                preserve_model=True,
+                check_model_exists=False,
+                engine=engine,
+            )
+            for engine in ParserEngine
+        ]
+        assert results[0] == results[1]
+
+
+def test_engines_reject_unknown_roles() -> None:
+    text = TEXT_2.replace("[ROLE USER]", "[ROLE WIZARD]")
+    for engine in ParserEngine:
+        with pytest.raises(ValueError):
+            deserialize_conversation_text_into_messages(
+                ConversationText(text, SCHEMA_VERSION), engine=engine
+            )
+
+
+def test_engines_reject_unknown_models() -> None:
+    for engine in ParserEngine:
+        with pytest.raises(ValueError):
+            deserialize_conversation_text_into_messages(
+                ConversationText(TEXT_1, SCHEMA_VERSION),
+                preserve_model=True,
+                engine=engine,
+            )
@@ -33,7 +33,7 @@ class TestBuildqueries(unittest.TestCase):
         substitutions = as_substitutions({})
         expected = [WHAT_IS_THE_CAPITAL_OF_FRANCE_query]
         self.assertEqual(
-            build_queries(WHAT_IS_THE_CAPITAL_OF_FRANCE_query, substitutions),
+            list(build_queries(WHAT_IS_THE_CAPITAL_OF_FRANCE_query, substitutions)),
             expected,
         )
 
@@ -41,23 +41,54 @@ class TestBuildqueries(unittest.TestCase):
         raw_query = "What is the capital of {country}?"
         substitutions = as_substitutions({"{country}": "France"})
         expected = [WHAT_IS_THE_CAPITAL_OF_FRANCE_query]
-        self.assertEqual(build_queries(raw_query, substitutions), expected)
+        self.assertEqual(list(build_queries(raw_query, substitutions)), expected)
 
     def test_build_queries_with_for_command_with_one_element(self) -> None:
         substitutions = as_substitutions({"{start}": "/for 1", "{end}": "5"})
         expected = ["List numbers from 1 to 5"]
-        self.assertEqual(build_queries(START_TO_END_RAW_query, substitutions), expected)
+        self.assertEqual(
+            list(build_queries(START_TO_END_RAW_query, substitutions)), expected
+        )
 
     def test_build_queries_with_for_command_with_two_elements(self) -> None:
         substitutions = as_substitutions({"{start}": "/for 10,20", "{end}": "50"})
         expected = ["List numbers from 10 to 50", "List numbers from 20 to 50"]
-        self.assertEqual(build_queries(START_TO_END_RAW_query, substitutions), expected)
+        self.assertEqual(
+            list(build_queries(START_TO_END_RAW_query, substitutions)), expected
+        )
 
-    def test_build_queries_multiple_for_not_supported(self) -> None:
-        substitutions = as_substitutions({"{start}": "/for 1", "{end}": "/for 5"})
+    def test_build_queries_multiple_for_cartesian_product(self) -> None:
+        substitutions = as_substitutions({"{start}": "/for 1,2", "{end}": "/for 5,6"})
+        expected = [
+            "List numbers from 1 to 5",
+            "List numbers from 1 to 6",
+            "List numbers from 2 to 5",
+            "List numbers from 2 to 6",
+        ]
+        queries = build_queries(START_TO_END_RAW_query, substitutions)
+        self.assertEqual(len(queries), 4)
+        self.assertEqual(list(queries), expected)
+
+    def test_build_queries_zip(self) -> None:
+        substitutions = as_substitutions({"{start}": "/zip 1,2", "{end}": "/zip 5,6"})
+        expected = ["List numbers from 1 to 5", "List numbers from 2 to 6"]
+        self.assertEqual(
+            list(build_queries(START_TO_END_RAW_query, substitutions)), expected
+        )
+
+    def test_build_queries_zip_different_lengths(self) -> None:
+        substitutions = as_substitutions({"{start}": "/zip 1,2", "{end}": "/zip 5"})
         with self.assertRaises(QueryBuildException):
             build_queries(START_TO_END_RAW_query, substitutions)
 
+    def test_build_queries_is_lazy(self) -> None:
+        raw_query = "Query: {a}, {b}, {c}"
+        values = "/for " + ",".join(str(i) for i in range(100))
+        substitutions = as_substitutions({"{a}": values, "{b}": values, "{c}": values})
+        queries = build_queries(raw_query, substitutions)
+        self.assertEqual(len(queries), 1_000_000)
+        self.assertEqual(next(iter(queries)), "Query: 0, 0, 0")
+
 
 if __name__ == "__main__":
     unittest.main()
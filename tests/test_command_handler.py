@@ -1,4 +1,5 @@
-from typing import Any, cast
+import threading
+from typing import Any, Callable, cast
 from unittest.mock import Mock
 
 import pytest
@@ -8,12 +9,14 @@ from src.controllers.command_interpreter import Action, ActionType
 from src.controllers.final_query_extractor import DELIBERATE_INPUT_TIME
 from src.controllers.select_model import SelectModelController
 from src.domain import (
+    ChatMessage,
     CompleteMessage,
     ConversationId,
     ConversationText,
     Model,
     ModelName,
     QueryResult,
+    SearchResult,
 )
 from src.infrastructure.llm_connection import ClientWrapper
 from src.infrastructure.now import TimeManager
@@ -24,7 +27,7 @@ from src.protocols import ChatRepositoryProtocol
 from src.serde.shared import SCHEMA_VERSION
 from src.view import Raw
 from src.view.view import View
-from tests.objects import TEXT_1
+from tests.objects import COMPLETE_MESSAGES_1, TEXT_1
 
 
 class CommandHandlerFixture:
@@ -298,12 +301,15 @@ def test_load_conversation(advanced_fixture: AdvancedFixture) -> None:
     fixture.mock_repository.load_conversation_as_conversation_text.return_value = (
         ConversationText(TEXT_1, SCHEMA_VERSION)
     )
+    fixture.mock_repository.load_conversation.return_value = COMPLETE_MESSAGES_1
 
     fixture.command_handler.process_action(
         Action(ActionType.LOAD_CONVERSATION), remaining
     )
 
     fixture.mock_repository.load_conversation_as_conversation_text.assert_called_once()
+    fixture.mock_repository.load_conversation.assert_called_once()
+    assert fixture.prev_messages_stub == COMPLETE_MESSAGES_1
     fixture.mock_view.display_conversation.assert_called_once()
     calls = fixture.mock_view.display_conversation.mock_calls
     assert calls[0].args[0] == ConversationId("0042")
@@ -312,10 +318,104 @@ def test_load_conversation(advanced_fixture: AdvancedFixture) -> None:
     )
 
 
+def test_search_conversations(command_handler_fixture: CommandHandlerFixture) -> None:
+    fixture = command_handler_fixture
+    results = [SearchResult(ConversationId("0042"), 1.5, "hola que tal")]
+    fixture.mock_repository.search_conversations.return_value = results
+
+    fixture.command_handler.process_action(Action(ActionType.SEARCH), "hola")
+
+    fixture.mock_repository.search_conversations.assert_called_once_with("hola")
+    fixture.mock_view.display_search_results.assert_called_once_with(results)
+
+
+def test_search_without_text(command_handler_fixture: CommandHandlerFixture) -> None:
+    fixture = command_handler_fixture
+
+    fixture.command_handler.process_action(Action(ActionType.SEARCH), "  ")
+
+    fixture.mock_repository.search_conversations.assert_not_called()
+    fixture.mock_view.show_error_msg.assert_called_once()
+
+
+def create_fan_out_stub(
+    failing_query: str | None = None,
+) -> Callable[..., QueryResult]:
+    """The first query is only answered after the last one, as with concurrent calls"""
+    last_query_answered = threading.Event()
+
+    def get_simple_response(
+        _model: Model,
+        messages: list[CompleteMessage],
+        debug: bool = False,
+        on_delta: Callable[[str], None] | None = None,
+        use_cache: bool = True,
+    ) -> QueryResult:
+        query = messages[-1].chat_msg.content
+        if query.startswith("Hello a"):
+            assert last_query_answered.wait(timeout=5)
+        if failing_query and query.startswith(failing_query):
+            raise RuntimeError("API error")
+        if query.startswith("Hello c"):
+            last_query_answered.set()
+        return get_simple_response_stub(_model, messages, debug)
+
+    return get_simple_response
+
+
+def test_for_queries_are_answered_concurrently(
+    advanced_fixture: AdvancedFixture,
+) -> None:
+    fixture = advanced_fixture
+    fixture.prev_messages_stub.append(CompleteMessage(ChatMessage("system", "prompt")))
+    fixture.mock_view.input_extra_line.side_effect = fixture.user_prompt_lines
+    fixture.mock_view.get_raw_substitutions_from_user.return_value = {
+        "$0name": "/for a,b,c"
+    }
+    fixture.mock_client_wrapper.get_simple_response.side_effect = create_fan_out_stub()
+
+    fixture.command_handler.process_action(
+        Action(ActionType.CONTINUE_CONVERSATION), "Hello $0name"
+    )
+
+    queries = [
+        call.args[1].value for call in fixture.mock_view.print_interaction.mock_calls
+    ]
+    assert queries == [f"Hello {name}\nsomething more" for name in "abc"]
+    saved = [call.args[0] for call in fixture.mock_repository.save_messages.mock_calls]
+    assert [len(messages) for messages in saved] == [3, 3, 3]
+    assert saved[0][1].chat_msg.content.startswith("Hello a")
+    # the conversation ends after several queries, as when answered in sequence
+    assert fixture.prev_messages_stub == []
+
+
+def test_failed_for_query_does_not_stop_the_others(
+    advanced_fixture: AdvancedFixture,
+) -> None:
+    fixture = advanced_fixture
+    fixture.mock_view.input_extra_line.side_effect = fixture.user_prompt_lines
+    fixture.mock_view.get_raw_substitutions_from_user.return_value = {
+        "$0name": "/for a,b,c"
+    }
+    fixture.mock_client_wrapper.get_simple_response.side_effect = create_fan_out_stub(
+        failing_query="Hello b"
+    )
+
+    fixture.command_handler.process_action(
+        Action(ActionType.CONTINUE_CONVERSATION), "Hello $0name"
+    )
+
+    fixture.mock_view.show_error_msg.assert_called_once()
+    assert fixture.mock_view.print_interaction.call_count == 2
+    assert fixture.mock_repository.save_messages.call_count == 2
+
+
 def get_simple_response_stub(
     _model: Model,
     messages: list[CompleteMessage],
     debug: bool = False,
+    on_delta: Callable[[str], None] | None = None,
+    use_cache: bool = True,
 ) -> QueryResult:
     messages.append(Mock(spec=CompleteMessage))
     return QueryResult(
@@ -43,6 +43,8 @@ def test_command_interpreter_valid_command() -> None:
             ActionType.SYSTEM_PROMPT,
             "Eres un asistente experto.",
         ),
+        Case("/search hola que tal", ActionType.SEARCH, "hola que tal"),
+        Case("/nocache hola", ActionType.NO_CACHE, "hola"),
         Case("hola que tal", ActionType.CONTINUE_CONVERSATION, "hola que tal"),
         Case("", ActionType.CONTINUE_CONVERSATION, ""),
         Case("/q", ActionType.EXIT, ""),
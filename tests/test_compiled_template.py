@@ -0,0 +1,35 @@
+from src.models.placeholders import (
+    CompiledTemplate,
+    Placeholder,
+    find_unique_placeholders,
+)
+
+A = Placeholder("$0a")
+AB = Placeholder("$0ab")
+
+
+def test_only_whole_placeholders_are_replaced() -> None:
+    template = CompiledTemplate("Compara $0a y $0ab, no x$0a")
+
+    assert template.placeholders == [A, AB]
+    assert template.render({A: "uno", AB: "dos"}) == "Compara uno y dos, no x$0a"
+
+
+def test_replacements_are_not_searched_for_placeholders() -> None:
+    template = CompiledTemplate("Di $0a y $0ab")
+
+    assert template.render({A: "$0ab"}) == "Di $0ab y $0ab"
+    assert template.bind({A: "$0ab"}).render({AB: "dos"}) == "Di $0ab y dos"
+
+
+def test_same_rules_as_the_placeholders_finder() -> None:
+    # the characters around a placeholder are not used again by the next one
+    text = "$0a x|$0a Entre $0a,$0ab y $0ab $0a"
+
+    template = CompiledTemplate(text)
+
+    assert find_unique_placeholders(text) == [A, AB]
+    assert template.placeholders == [A, AB]
+    assert (
+        template.render({A: "uno", AB: "dos"}) == "$0a x|$0a Entre uno,$0ab y dos $0a"
+    )
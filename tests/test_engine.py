@@ -8,6 +8,7 @@ from src.controllers.command_interpreter import (
     CommandNoValid,
 )
 from src.engine import MainEngine
+from src.infrastructure.exceptions import DeferredWriteError
 from src.view import Raw
 from src.view.view import View
 
@@ -82,3 +83,19 @@ def test_process_raw_query_with_exception(engine_fixture: EngineFixture) -> None
     engine_fixture.mock_view.show_error_msg.assert_called_once_with(
         Raw("No valid command: bad")
     )
+
+
+def test_process_raw_query_with_failed_deferred_write(
+    engine_fixture: EngineFixture,
+) -> None:
+    """A failed background save is shown without stopping the program"""
+    engine_fixture.mock_command_interpreter.parse_user_input.return_value = (
+        "action",
+        "remaining",
+    )
+    error = DeferredWriteError(1, OSError("disk full"))
+    engine_fixture.mock_command_handler.process_action.side_effect = error
+
+    engine_fixture.engine.process_raw_query("query")
+
+    engine_fixture.mock_view.show_error_msg.assert_called_once_with(Raw(str(error)))
@@ -0,0 +1,30 @@
+from benchmarks.import_time import (
+    find_lazy_modules,
+    get_total_us,
+    measure_imports,
+    parse_importtime,
+)
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:        80 |        300 |     httpx
+import time:       500 |       1000 | src.main
+"""
+
+
+def test_parse_importtime() -> None:
+    import_times = parse_importtime(IMPORTTIME_OUTPUT)
+
+    assert [import_time.module for import_time in import_times] == [
+        "_io",
+        "httpx",
+        "src.main",
+    ]
+    assert [import_time.depth for import_time in import_times] == [1, 2, 0]
+    assert get_total_us(import_times, "src.main") == 1000
+    assert find_lazy_modules(import_times) == ["httpx"]
+
+
+def test_sdks_and_rich_components_are_not_imported_at_startup() -> None:
+    assert find_lazy_modules(measure_imports("src.main")) == []
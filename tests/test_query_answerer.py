@@ -0,0 +1,196 @@
+from collections.abc import Callable, Iterator
+from unittest.mock import Mock
+
+import pytest
+
+from src.controllers.query_answerer import QueryAnswerer
+from src.domain import (
+    ChatMessage,
+    CompleteMessage,
+    Model,
+    ModelName,
+    QueryResult,
+)
+from src.infrastructure.chat_repository.write_behind import (
+    WriteBehindChatRepository,
+)
+from src.infrastructure.exceptions import DeferredWriteError
+from src.infrastructure.llm_connection import ClientWrapper
+from src.llm_manager import LLM_Manager
+from src.model_manager import ModelManager
+from src.models.placeholders import QueryText
+from src.protocols import ChatRepositoryProtocol
+from src.view import Raw
+from src.view.view import View
+
+
+def streamed_response_stub(
+    model: Model,
+    messages: list[CompleteMessage],
+    debug: bool = False,
+    on_delta: Callable[[str], None] | None = None,
+    use_cache: bool = True,
+) -> QueryResult:
+    assert on_delta
+    for delta in ["Hola", ", ", "mundo"]:
+        on_delta(delta)
+    messages.append(CompleteMessage(ChatMessage("assistant", "Hola, mundo"), model))
+    return QueryResult("Hola, mundo", messages)
+
+
+def test_streamed_response_is_printed_incrementally() -> None:
+    mock_view = Mock(spec=View)
+    mock_repository = Mock(spec=ChatRepositoryProtocol)
+    mock_client_wrapper = Mock(spec=ClientWrapper)
+    mock_client_wrapper.get_simple_response.side_effect = streamed_response_stub
+    model_manager = ModelManager(mock_client_wrapper)
+    model_manager.model_wrapper.change(Model(None, ModelName("model")))
+    llm_manager = LLM_Manager(mock_repository, model_manager)
+    query_answerer = QueryAnswerer(
+        view=mock_view, llm_manager=llm_manager, stream_responses=True
+    )
+
+    query_answerer.answer_queries([QueryText("Saluda")])
+
+    mock_view.start_streamed_interaction.assert_called_once_with(
+        ModelName("model"), Raw("Saluda")
+    )
+    deltas = [call.args[0] for call in mock_view.print_response_delta.mock_calls]
+    assert deltas == [Raw("Hola"), Raw(", "), Raw("mundo")]
+    [end_call] = mock_view.end_streamed_interaction.mock_calls
+    assert end_call.args[0] >= 0
+    mock_view.print_interaction.assert_not_called()
+    [saved_call] = mock_repository.save_messages.mock_calls
+    assert saved_call.args[0][-1].chat_msg.content == "Hola, mundo"
+    assert llm_manager.prev_messages == saved_call.args[0]
+
+
+def test_queries_are_built_while_they_are_answered() -> None:
+    built: list[str] = []
+
+    class CountedQueries:
+        def __len__(self) -> int:
+            return 20
+
+        def __iter__(self) -> Iterator[QueryText]:
+            for i in range(20):
+                built.append(str(i))
+                yield QueryText(str(i))
+
+        def __contains__(self, query: object) -> bool:
+            return False
+
+    pending_when_answered: list[int] = []
+
+    def answer(
+        model: Model, messages: list[CompleteMessage], **kwargs: object
+    ) -> QueryResult:
+        query = messages[-1].chat_msg.content
+        pending_when_answered.append(len(built) - int(query))
+        return QueryResult(query, messages)
+
+    mock_view = Mock(spec=View)
+    mock_client_wrapper = Mock(spec=ClientWrapper)
+    mock_client_wrapper.get_simple_response.side_effect = answer
+    model_manager = ModelManager(mock_client_wrapper)
+    model_manager.model_wrapper.change(Model(None, ModelName("model")))
+    llm_manager = LLM_Manager(Mock(spec=ChatRepositoryProtocol), model_manager)
+    query_answerer = QueryAnswerer(
+        view=mock_view, llm_manager=llm_manager, concurrency_limit=2
+    )
+
+    query_answerer.answer_queries(CountedQueries())
+
+    assert mock_view.print_interaction.call_count == 20
+    assert max(pending_when_answered) <= 4
+
+
+def test_sequential_and_concurrent_queries_send_the_same_messages() -> None:
+    def send_queries(concurrency_limit: int) -> list[list[str]]:
+        sent: list[list[str]] = []
+
+        def answer(
+            model: Model, messages: list[CompleteMessage], **kwargs: object
+        ) -> QueryResult:
+            sent.append([message.chat_msg.content for message in messages])
+            messages.append(CompleteMessage(ChatMessage("assistant", "ok"), model))
+            return QueryResult("ok", messages)
+
+        mock_client_wrapper = Mock(spec=ClientWrapper)
+        mock_client_wrapper.get_simple_response.side_effect = answer
+        model_manager = ModelManager(mock_client_wrapper)
+        model_manager.model_wrapper.change(Model(None, ModelName("model")))
+        llm_manager = LLM_Manager(Mock(spec=ChatRepositoryProtocol), model_manager)
+        llm_manager.prev_messages.append(CompleteMessage(ChatMessage("user", "hola")))
+        query_answerer = QueryAnswerer(
+            view=Mock(spec=View),
+            llm_manager=llm_manager,
+            concurrency_limit=concurrency_limit,
+        )
+
+        query_answerer.answer_queries([QueryText("a"), QueryText("b")])
+
+        # the conversation ends after several queries
+        assert llm_manager.prev_messages == []
+        return sorted(sent)
+
+    expected = [["hola", "a"], ["hola", "b"]]
+    assert send_queries(concurrency_limit=1) == expected
+    assert send_queries(concurrency_limit=2) == expected
+
+
+def test_failed_background_save_does_not_lose_the_conversation() -> None:
+    def answer(
+        model: Model, messages: list[CompleteMessage], **kwargs: object
+    ) -> QueryResult:
+        messages.append(CompleteMessage(ChatMessage("assistant", "ok"), model))
+        return QueryResult("ok", messages)
+
+    inner_repository = Mock(spec=ChatRepositoryProtocol)
+    inner_repository.save_messages.side_effect = OSError("disk full")
+    repository = WriteBehindChatRepository(inner_repository)
+    mock_view = Mock(spec=View)
+    mock_client_wrapper = Mock(spec=ClientWrapper)
+    mock_client_wrapper.get_simple_response.side_effect = answer
+    model_manager = ModelManager(mock_client_wrapper)
+    model_manager.model_wrapper.change(Model(None, ModelName("model")))
+    llm_manager = LLM_Manager(repository, model_manager)
+    query_answerer = QueryAnswerer(view=mock_view, llm_manager=llm_manager)
+
+    query_answerer.answer_queries([QueryText("a")])
+    repository._pending.join()
+    query_answerer.answer_queries([QueryText("b")])
+
+    contents = [message.chat_msg.content for message in llm_manager.prev_messages]
+    assert contents == ["a", "ok", "b", "ok"]
+    assert mock_view.print_interaction.call_count == 2
+    # the failures are reported when the repository is closed
+    with pytest.raises(DeferredWriteError):
+        repository.close()
+    assert inner_repository.save_messages.call_count == 2
+
+
+def test_failed_save_does_not_stop_the_other_queries() -> None:
+    def answer(
+        model: Model, messages: list[CompleteMessage], **kwargs: object
+    ) -> QueryResult:
+        return QueryResult("ok", messages)
+
+    mock_view = Mock(spec=View)
+    mock_repository = Mock(spec=ChatRepositoryProtocol)
+    mock_repository.save_messages.side_effect = [None, OSError("disk full"), None]
+    mock_client_wrapper = Mock(spec=ClientWrapper)
+    mock_client_wrapper.get_simple_response.side_effect = answer
+    model_manager = ModelManager(mock_client_wrapper)
+    model_manager.model_wrapper.change(Model(None, ModelName("model")))
+    llm_manager = LLM_Manager(mock_repository, model_manager)
+    query_answerer = QueryAnswerer(
+        view=mock_view, llm_manager=llm_manager, concurrency_limit=2
+    )
+
+    query_answerer.answer_queries([QueryText("a"), QueryText("b"), QueryText("c")])
+
+    assert mock_view.print_interaction.call_count == 3
+    assert mock_repository.save_messages.call_count == 3
+    [error_call] = mock_view.show_error_msg.mock_calls
+    assert "2 de 3: disk full" in error_call.args[0].value
@@ -1,5 +1,8 @@
+from unittest.mock import patch
+
 from src.controllers.select_model import SelectModelController
 from src.models_data import get_models
+from src.view import Raw, SimpleView
 
 
 def test_default_model() -> None:
@@ -8,3 +11,20 @@ def test_default_model() -> None:
         select_model_controller._default_model.model_name  # pyright: ignore [reportPrivateUsage]
         == "mistral-tiny"
     )
+
+
+def test_warm_up_is_started_before_asking() -> None:
+    calls: list[str] = []
+
+    def get_input(prompt: Raw) -> str:
+        calls.append("input")
+        return ""
+
+    select_model_controller = SelectModelController(
+        get_models(), warm_up=lambda: calls.append("warm_up")
+    )
+    with patch.object(SimpleView, "get_input", side_effect=get_input):
+        model = select_model_controller.select_model()
+
+    assert calls == ["warm_up", "input"]
+    assert model.model_name == "mistral-tiny"
@@ -0,0 +1,58 @@
+import logging
+
+from src.setup_logging import (
+    LazyVar,
+    configure_logger,
+    format_var,
+    set_log_level,
+    truncate,
+)
+
+
+class Spy:
+    def __init__(self) -> None:
+        self.formatted = 0
+
+    def __repr__(self) -> str:
+        self.formatted += 1
+        return "Spy()"
+
+
+def test_variables_are_formatted_only_if_written() -> None:
+    logger = configure_logger("tests.lazy_logging", level=logging.INFO)
+    spy = Spy()
+
+    logger.debug(format_var("spy", spy))
+
+    assert spy.formatted == 0
+    assert str(format_var("spy", spy)) == "spy=Spy()"
+    assert spy.formatted == 1
+
+
+def test_long_values_are_truncated() -> None:
+    assert truncate("abcdef", 6) == "abcdef"
+    assert truncate("abcdef", 2) == "ab... (4 caracteres omitidos)"
+    assert (
+        str(LazyVar("text", "x" * 20, max_chars=5))
+        == "text='xxxx... (17 caracteres omitidos)"
+    )
+
+
+def test_level_applies_to_loggers_configured_later() -> None:
+    set_log_level(logging.INFO)
+    try:
+        logger = configure_logger("tests.later_logging")
+        assert not logger.isEnabledFor(logging.DEBUG)
+        assert logger.isEnabledFor(logging.INFO)
+    finally:
+        set_log_level(logging.DEBUG)
+    assert logger.isEnabledFor(logging.DEBUG)
+
+
+def test_logged_list_is_not_changed_by_later_appends() -> None:
+    messages = ["hola"]
+    lazy_var = format_var("messages", messages)
+
+    messages.append("adiós")
+
+    assert str(lazy_var) == "messages=['hola']"
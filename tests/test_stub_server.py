@@ -0,0 +1,100 @@
+import random
+from collections.abc import Iterator
+
+import pytest
+
+from benchmarks.stub_server import StubConfig, StubServer, parse_latency
+from src.domain import CompleteMessage, Model, ModelName, Platform
+from src.infrastructure.exceptions import APIStatusError, TooManyRequests
+from src.infrastructure.llm_connection import ClientWrapper
+from src.infrastructure.llm_connection.retry_policy import Retrier, RetryPolicy
+from src.models.messages_ops import add_user_query_in_place
+
+MISTRAL_MODEL = Model(Platform.Mistral, ModelName("mistral-small"))
+OPENAI_MODEL = Model(Platform.OpenAI, ModelName("gpt-4o"))
+TOOLS = [{"type": "function", "function": {"name": "get_time", "parameters": {}}}]
+
+
+@pytest.fixture
+def stub_server() -> Iterator[StubServer]:
+    with StubServer(StubConfig(seed=0)) as stub_server:
+        yield stub_server
+
+
+def create_client_wrapper(
+    stub_server: StubServer, retrier: Retrier | None = None
+) -> ClientWrapper:
+    return ClientWrapper(
+        mistral_api_key="key",
+        openai_api_key="key",
+        mistral_base_url=stub_server.mistral_base_url,
+        openai_base_url=stub_server.openai_base_url,
+        retrier=retrier,
+    )
+
+
+def create_messages(query: str) -> list[CompleteMessage]:
+    messages: list[CompleteMessage] = []
+    add_user_query_in_place(messages, query)
+    return messages
+
+
+@pytest.mark.parametrize("model", [MISTRAL_MODEL, OPENAI_MODEL])
+def test_both_sdks_talk_to_the_stub(stub_server: StubServer, model: Model) -> None:
+    client_wrapper = create_client_wrapper(stub_server)
+    deltas: list[str] = []
+
+    query_result = client_wrapper.get_simple_response(model, create_messages("Hola"))
+    streamed_result = client_wrapper.get_simple_response(
+        model, create_messages("Hola"), on_delta=deltas.append
+    )
+
+    assert query_result.content == "Respuesta a: Hola"
+    assert streamed_result.content == query_result.content
+    assert "".join(deltas) == query_result.content
+    assert stub_server.requests == 2
+
+
+@pytest.mark.parametrize("model", [MISTRAL_MODEL, OPENAI_MODEL])
+def test_tool_calls_are_answered(stub_server: StubServer, model: Model) -> None:
+    client_wrapper = create_client_wrapper(stub_server)
+
+    query_result = client_wrapper.get_simple_response(
+        model, create_messages("¿Qué hora es?"), tools=TOOLS, tool_choice="auto"
+    )
+
+    tool_calls = query_result.messages[-1].chat_msg.tool_calls
+    assert isinstance(tool_calls, list)
+    [tool_call] = tool_calls
+    assert tool_call.function.name == "get_time"
+
+
+def test_errors_are_retried(stub_server: StubServer) -> None:
+    stub_server.config.error_rate = 1
+    stub_server.config.retry_after = 0
+    retrier = Retrier(RetryPolicy(max_attempts=3))
+    client_wrapper = create_client_wrapper(stub_server, retrier)
+
+    with pytest.raises(APIStatusError):
+        client_wrapper.get_simple_response(OPENAI_MODEL, create_messages("Hola"))
+    assert stub_server.requests == retrier.attempts == 3
+
+
+def test_wrapper_without_guard_has_a_default_one(stub_server: StubServer) -> None:
+    client_wrapper = create_client_wrapper(stub_server)
+    for _ in range(10):
+        client_wrapper.get_simple_response(MISTRAL_MODEL, create_messages("Hola"))
+
+    with pytest.raises(TooManyRequests):
+        client_wrapper.get_simple_response(MISTRAL_MODEL, create_messages("Hola"))
+    assert stub_server.requests == 10
+
+
+def test_parse_latency() -> None:
+    rng = random.Random(0)
+    assert parse_latency("constant:0.5")(rng) == 0.5
+    assert 0.1 <= parse_latency("uniform:0.1,0.2")(rng) <= 0.2
+    assert parse_latency("exponential:0.1")(rng) >= 0
+    assert parse_latency("lognormal:0.1,0.5")(rng) > 0
+    with pytest.raises(ValueError):
+        parse_latency("normal:1")
@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import pytest
+
+from src.python_modules.FileSystemWrapper.file_manager import FileManager
+
+from src.models.placeholders import (
+    Placeholder,
+    QueryBuildException,
+    build_queries,
+)
+
+RAW_QUERY = "Describe $0name, $0value"
+NAME = Placeholder("$0name")
+VALUE = Placeholder("$0value")
+
+
+def test_values_from_range() -> None:
+    queries = build_queries(RAW_QUERY, {NAME: "/for range(1,1000)", VALUE: "x"})
+
+    assert len(queries) == 999
+    assert next(iter(queries)) == "Describe 1, x"
+
+
+def test_values_from_csv_column(tmp_path: Path) -> None:
+    path = tmp_path / "values.csv"
+    path.write_text('name,value\n"Fleming, A.",1\nEinstein,2\n', encoding="utf-8")
+
+    queries = build_queries(
+        RAW_QUERY,
+        {NAME: f"/zip @{path}:name", VALUE: f"/zip @{path}:value"},
+        FileManager(),
+    )
+
+    assert len(queries) == 2
+    assert list(queries) == ["Describe Fleming, A., 1", "Describe Einstein, 2"]
+
+
+def test_values_from_jsonl_field(tmp_path: Path) -> None:
+    path = tmp_path / "values.jsonl"
+    path.write_text('{"name": "Fleming"}\n\n{"name": 3}\n', encoding="utf-8")
+
+    queries = build_queries(
+        RAW_QUERY, {NAME: f"/for @{path}:name", VALUE: "/for a,b"}, FileManager()
+    )
+
+    assert len(queries) == 4
+    assert list(queries) == [
+        "Describe Fleming, a",
+        "Describe Fleming, b",
+        "Describe 3, a",
+        "Describe 3, b",
+    ]
+
+
+def test_values_from_lines(tmp_path: Path) -> None:
+    path = tmp_path / "values.txt"
+    path.write_text("Fleming\r\nEinstein\r\n", encoding="utf-8")
+
+    queries = build_queries(
+        RAW_QUERY, {NAME: f"/for @{path}", VALUE: "x"}, FileManager()
+    )
+
+    assert list(queries) == ["Describe Fleming, x", "Describe Einstein, x"]
+
+
+@pytest.mark.parametrize(
+    "file_name, content, source",
+    [
+        ("values.csv", "name\nFleming\n", "@{path}:value"),
+        ("values.csv", "name\nFleming\n", "@{path}"),
+        ("values.jsonl", '{"name": "Fleming"}\nnot json\n', "@{path}:name"),
+        ("values.txt", "", "@{path}.missing"),
+    ],
+)
+def test_invalid_sources(
+    tmp_path: Path, file_name: str, content: str, source: str
+) -> None:
+    path = tmp_path / file_name
+    path.write_text(content, encoding="utf-8")
+
+    with pytest.raises(QueryBuildException):
+        build_queries(
+            RAW_QUERY, {NAME: "/for " + source.format(path=path)}, FileManager()
+        )